@@ -0,0 +1,88 @@
+"""
+Batch audio analytics over call recordings.
+
+Decodes each recording, detects speech per channel and writes response gaps,
+talk-over and dead air into the matching transcript as "audio_analysis".
+Recordings are processed in parallel worker processes.
+
+Usage:
+  python analyze_recordings.py                      # every stored recording not yet analyzed
+  python analyze_recordings.py --force --workers 8  # re-analyze everything
+  python analyze_recordings.py data/recordings/CA123.mp3 --json report.json
+"""
+
+import argparse
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any
+
+from src.audio_analytics import analyze_recording
+from src.recording_store import RecordingStore
+from src.transcript_manager import TranscriptManager
+
+
+def _summary_row(name: str, analysis: dict[str, Any]) -> str:
+    """One table line; talk-over and agent latency need a dual-channel recording."""
+    talk_over = analysis.get("talk_over")
+    latency = analysis.get("agent_response_latency")
+    talk_over_text = f"{talk_over['count']} / {talk_over['total_s']:.1f}s" if talk_over else "n/a"
+    latency_text = f"{latency['p50_ms']:.0f}ms" if latency else "n/a"
+    return (
+        f"{name:<40} {analysis['channels']:>3} {analysis['duration_s']:>8.1f}s "
+        f"{analysis['dead_air']['total_s']:>8.1f}s {talk_over_text:>12} {latency_text:>9}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Response gaps, talk-over and dead air from call recordings")
+    parser.add_argument("recordings", nargs="*", help="Recordings to analyze (default: all stored recordings)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--force", action="store_true", help="Re-analyze recordings whose transcript already has results")
+    parser.add_argument("--json", help="Also write every analysis to this JSON file")
+    args = parser.parse_args()
+
+    transcript_manager = TranscriptManager()
+    if args.recordings:
+        recordings = {os.path.splitext(os.path.basename(p))[0]: p for p in args.recordings}
+    else:
+        recordings = RecordingStore().list_recordings()
+    if not args.force:
+        recordings = {
+            name: path for name, path in recordings.items()
+            if "audio_analysis" not in (transcript_manager.load_transcript(name) or {})
+        }
+    names = {path: name for name, path in recordings.items()}
+    paths = list(names)
+    if not paths:
+        print("[INFO] No recordings to analyze")
+        return
+
+    print(f"[INFO] Analyzing {len(paths)} recordings with {args.workers} workers")
+    print(f"\n{'Recording':<40} {'Ch':>3} {'Duration':>9} {'Dead air':>9} {'Talk-over':>12} {'Agent p50':>9}")
+    print("-" * 87)
+    report: dict[str, Any] = {}
+    failures = 0
+    chunksize = max(1, len(paths) // (args.workers * 4))
+    with ProcessPoolExecutor(max_workers=args.workers) as executor:
+        for result in executor.map(analyze_recording, paths, chunksize=chunksize):
+            name = names[result["path"]]
+            if "error" in result:
+                failures += 1
+                print(f"{name:<40} [ERROR] {result['error']}")
+                continue
+            report[name] = result["analysis"]
+            stored = transcript_manager.add_audio_analysis(name, result["analysis"])
+            print(_summary_row(name, result["analysis"]) + ("" if stored else "  (no transcript)"))
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\n[INFO] Report: {args.json}")
+    print(f"\n[INFO] {len(report)} analyzed, {failures} failed")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+"""
+Move old completed transcripts into the compressed archive tier.
+
+Archived transcripts stay readable through TranscriptManager (load_transcript,
+get_conversation_text, list_transcripts), so every report keeps working.
+
+Usage:
+  python archive_transcripts.py                 # older than TRANSCRIPT_ARCHIVE_DAYS (default 30)
+  python archive_transcripts.py --days 7 --dry-run
+"""
+
+import argparse
+
+from src.transcript_manager import ARCHIVE_AFTER_DAYS, TranscriptManager
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compress completed transcripts older than N days")
+    parser.add_argument("--days", type=float, default=ARCHIVE_AFTER_DAYS, help="Minimum age in days")
+    parser.add_argument("--dry-run", action="store_true", help="Only list what would be archived")
+    args = parser.parse_args()
+
+    transcript_manager = TranscriptManager()
+    result = transcript_manager.archive_transcripts(older_than_days=args.days, dry_run=args.dry_run)
+    for key in result["archived"]:
+        print(f"  {key}")
+    if args.dry_run:
+        print(f"\n[INFO] Would archive {len(result['archived'])} transcripts ({result['bytes_before']:,} bytes)")
+        return
+    before, after = result["bytes_before"], result["bytes_after"]
+    ratio = f" ({before / after:.1f}x smaller)" if after else ""
+    print(f"\n[INFO] Archived {len(result['archived'])} transcripts: {before:,} -> {after:,} bytes{ratio}")
+    print(f"[INFO] Kept {result['skipped']} in {transcript_manager.transcripts_dir} (recent or not completed)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,6 @@
+"""
+Benchmarks for startup and hot paths.
+
+Run individual benchmarks as modules from the project root, e.g.
+`python -m benchmarks.bench_import`.
+"""
@@ -0,0 +1,124 @@
+"""
+Disk usage and load latency of the hot and archive transcript tiers.
+
+Registers load benchmarks for both tiers with the suite (benchmarks.run), and
+when run directly archives a copy of a transcript set in a temp directory and
+reports bytes on disk and mean load time per tier.
+
+Usage:
+  python -m benchmarks.bench_archive                 # 200 synthetic 25-turn calls with Whisper segments
+  python -m benchmarks.bench_archive --source data/transcripts
+"""
+
+import argparse
+import atexit
+import glob
+import os
+import shutil
+import tempfile
+import time
+from typing import Any, Callable
+
+from benchmarks.bench_hot_paths import SCENARIO, _fake_transcript
+from benchmarks.harness import benchmark
+from src.transcript_manager import ARCHIVE_SUFFIX, TranscriptManager
+
+
+def _fake_call(turns: int = 25) -> dict[str, Any]:
+    """A completed call shaped like a saved transcript, Whisper segments included."""
+    transcript = _fake_transcript(turns)
+    offset = 0.0
+    segments = []
+    for i, turn in enumerate(transcript):
+        duration = 0.4 * len(turn["text"].split())
+        segments.append({
+            "id": i, "seek": 0, "start": round(offset, 2), "end": round(offset + duration, 2), "text": turn["text"],
+            "tokens": list(range(50364, 50364 + len(turn["text"].split()) * 2)),
+            "temperature": 0.0, "avg_logprob": -0.21, "compression_ratio": 1.4, "no_speech_prob": 0.01,
+        })
+        offset += duration + 1.2
+    return {
+        "scenario_name": SCENARIO,
+        "status": "completed",
+        "turn_count": turns,
+        "duration": round(offset),
+        "transcript": transcript,
+        "whisper_transcription": {
+            "full_text": " ".join(turn["text"] for turn in transcript),
+            "duration": round(offset, 2),
+            "segments": segments,
+            "language": "english",
+        },
+    }
+
+
+def _temp_manager() -> TranscriptManager:
+    manager = TranscriptManager()
+    manager.transcripts_dir = tempfile.mkdtemp(prefix="pgai-bench-")
+    atexit.register(shutil.rmtree, manager.transcripts_dir, True)
+    return manager
+
+
+def _register_load(tier: str) -> None:
+    @benchmark(f"transcript_manager.load_transcript[{tier}]")
+    def bench_load() -> Callable[[], Any]:
+        manager = _temp_manager()
+        manager.save_transcript("CABENCH", _fake_call())
+        if tier == "archive":
+            manager.archive_transcripts(older_than_days=-1)
+        return lambda: manager.load_transcript("CABENCH")
+
+
+for _tier in ("hot", "archive"):
+    _register_load(_tier)
+
+
+def _tier_bytes(directory: str, suffix: str) -> int:
+    return sum(os.path.getsize(p) for p in glob.glob(os.path.join(directory, f"*{suffix}")))
+
+
+def _mean_load_us(manager: TranscriptManager, keys: list[str], rounds: int = 5) -> float:
+    started = time.perf_counter()
+    for _ in range(rounds):
+        for key in keys:
+            manager.load_transcript(key)
+    return (time.perf_counter() - started) / (rounds * len(keys)) * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Transcript tier disk usage and load latency")
+    parser.add_argument("--source", help="Copy transcripts from this directory instead of generating them")
+    parser.add_argument("--calls", type=int, default=200, help="Synthetic calls to generate")
+    args = parser.parse_args()
+
+    manager = _temp_manager()
+    if args.source:
+        for path in glob.glob(os.path.join(args.source, "*.json")):
+            shutil.copy(path, manager.transcripts_dir)
+    else:
+        call = _fake_call()
+        for i in range(args.calls):
+            manager.save_transcript(f"CABENCH{i:05d}", call)
+    keys = manager.list_transcripts()
+    if not keys:
+        print("[INFO] No transcripts to measure")
+        return
+
+    hot_bytes = _tier_bytes(manager.transcripts_dir, ".json")
+    hot_us = _mean_load_us(manager, keys)
+    result = manager.archive_transcripts(older_than_days=-1)
+    archived = result["archived"]
+    archive_bytes = _tier_bytes(manager.archive_dir, ARCHIVE_SUFFIX)
+    archive_us = _mean_load_us(manager, archived) if archived else 0.0
+
+    print(f"{len(keys)} transcripts, {len(archived)} archived (completed only)\n")
+    print(f"{'Tier':<10} {'Bytes':>12} {'Per call':>10} {'Load (mean)':>12}")
+    print("-" * 47)
+    print(f"{'hot':<10} {hot_bytes:>12,} {hot_bytes // len(keys):>10,} {hot_us:>10.1f}us")
+    if archived:
+        print(f"{'archive':<10} {archive_bytes:>12,} {archive_bytes // len(archived):>10,} {archive_us:>10.1f}us")
+        print(f"\nArchived calls take {result['bytes_before'] / result['bytes_after']:.1f}x less disk")
+
+
+if __name__ == "__main__":
+    main()
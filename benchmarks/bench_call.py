@@ -0,0 +1,80 @@
+"""
+Macro benchmark: a full simulated call through the Flask webhooks.
+
+Drives /voice, /handle-agent-response until the 25-turn safety cap ends the
+call, and the final /call-status, with the LLM replaced by an instant stub.
+The timing is therefore everything the server does per call except waiting
+on OpenAI: scenario loading, phrase checks, TwiML and transcript writes.
+Opening-turn pre-warm is off (its drafts would outlive the stub), and
+transcripts and call queue outcomes go to a temporary directory. The stubs
+are applied per simulated call, so later benchmarks see the real modules.
+"""
+
+import atexit
+import itertools
+import os
+import shutil
+import tempfile
+from contextlib import ExitStack
+from typing import Any, Callable
+from unittest import mock
+
+import src.call_queue as call_queue
+import src.phone_system as phone_system
+from benchmarks.harness import benchmark
+from src.scenario_loader import prepare_scenarios
+
+SCENARIO = "appointment"
+STUB_REPLY = "I'd like to schedule an appointment for my knee."
+
+# Agent lines that never trigger the closing/goal checks, so the call runs to the turn cap
+AGENT_SCRIPT = [
+    "Thanks for your patience, one moment while I pull that up.",
+    "Can you tell me a little more about the knee pain?",
+    "How long has that been going on?",
+    "Do you have a preference for which doctor you see?",
+    "Would mornings or afternoons be better for you?",
+    "Let me check what we have available next week.",
+]
+
+
+def _stub_patient_reply(messages: list[dict[str, Any]], call_key: str = "default", model: str | None = None) -> str:
+    return STUB_REPLY
+
+
+@benchmark("call.simulated_25_turns", group="macro")
+def bench_simulated_call() -> Callable[[], Any]:
+    prepare_scenarios()
+    work_dir = tempfile.mkdtemp(prefix="pgai-bench-")
+    atexit.register(shutil.rmtree, work_dir, True)
+    queue = call_queue.CallQueue(os.path.join(work_dir, "call_queue.db"))
+    client = phone_system.app.test_client()
+    call_ids = itertools.count()
+
+    def isolated() -> ExitStack:
+        """Stub the LLM, keep transcripts and queue outcomes out of data/ (undone after each call)."""
+        stack = ExitStack()
+        stack.enter_context(mock.patch("src.conversation.generate_patient_reply", _stub_patient_reply))
+        # Pre-warm drafts run on background threads that could outlive the stub
+        stack.enter_context(mock.patch.object(phone_system, "PREWARM_OPENING_TURNS", False))
+        stack.enter_context(mock.patch.object(phone_system.transcript_manager, "transcripts_dir", work_dir))
+        stack.enter_context(mock.patch.object(call_queue, "_queue", queue))
+        return stack
+
+    def run() -> int:
+        call_sid = f"CABENCH{next(call_ids):026d}"
+        with isolated():
+            client.post("/voice", data={"CallSid": call_sid, "scenario": SCENARIO})
+            turns = 0
+            while call_sid in phone_system.active_calls:
+                agent_text = AGENT_SCRIPT[turns % len(AGENT_SCRIPT)]
+                twiml = client.post(
+                    "/handle-agent-response",
+                    data={"CallSid": call_sid, "SpeechResult": agent_text, "Confidence": "0.92"},
+                ).get_data(as_text=True)
+                turns += 1
+                if "<Gather" not in twiml:
+                    break
+            client.post("/call-status", data={"CallSid": call_sid, "CallStatus": "completed", "CallDuration": "120"})
+        return turns
+    return run
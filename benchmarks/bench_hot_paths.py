@@ -0,0 +1,150 @@
+"""
+Micro benchmarks for the per-turn and per-call hot paths.
+
+Covers system prompt generation, scenario loading, every phrase-detection
+check run on an agent turn, transcript persistence at increasing call
+lengths, and the TwiML built for each patient reply.
+"""
+
+import atexit
+import os
+import shutil
+import tempfile
+from datetime import datetime
+from typing import Any, Callable
+
+import yaml
+from twilio.twiml.voice_response import VoiceResponse
+
+from benchmarks.harness import benchmark
+from src.conversation import ConversationManager
+from src.endpointing import looks_cut_off
+from src.phone_system import CallSession, _build_gather, is_closing_utterance
+from src.scenario_loader import _build_behavior_from_stages, get_scenario_by_name, load_scenario, prepare_scenarios
+from src.transcript_manager import TranscriptManager
+from src.utils import get_project_root
+
+SCENARIO = "appointment"
+
+AGENT_TURNS = [
+    "This call may be recorded. Thanks for calling Pivot Point Orthopedics. Am I speaking with Lucas?",
+    "Can you confirm your date of birth for me?",
+    "Thanks. What can I help you with today?",
+    "What time works best for you next week?",
+    "I have Tuesday at 9 AM with Dr. Patel, does that work?",
+    "Your appointment is scheduled. Is there anything else I can help you with?",
+    "Alright, have a great day. Goodbye.",
+]
+
+
+def _fake_transcript(turns: int) -> list[dict[str, Any]]:
+    """Alternating agent/patient turns shaped like CallSession.transcript."""
+    return [
+        {
+            "speaker": "agent" if i % 2 == 0 else "patient",
+            "text": AGENT_TURNS[i % len(AGENT_TURNS)] if i % 2 == 0 else "I'd like to schedule an appointment for my knee.",
+            "turn": i,
+            "timestamp": datetime.now().isoformat(),
+            "confidence": 0.93,
+            "speech_timeout": 3,
+        }
+        for i in range(turns)
+    ]
+
+
+@benchmark("conversation.generate_system_prompt")
+def bench_system_prompt() -> Callable[[], Any]:
+    manager = ConversationManager(get_scenario_by_name(SCENARIO))
+    return manager.generate_system_prompt
+
+
+@benchmark("scenario_loader.build_behavior_from_stages")
+def bench_build_behavior() -> Callable[[], Any]:
+    with open(os.path.join(get_project_root(), "scenarios", f"{SCENARIO}.yaml")) as f:
+        patient_context = yaml.safe_load(f)["patient_context"]
+    return lambda: _build_behavior_from_stages(patient_context)
+
+
+@benchmark("scenario_loader.load_scenario")
+def bench_load_scenario() -> Callable[[], Any]:
+    # Always the server's path: the compiled bundle, recompiled here if a scenario file changed
+    prepare_scenarios()
+    return lambda: load_scenario(SCENARIO)
+
+
+@benchmark("phrases.is_closing_utterance")
+def bench_is_closing_utterance() -> Callable[[], Any]:
+    return lambda: [is_closing_utterance(text) for text in AGENT_TURNS]
+
+
+@benchmark("phrases.should_end_call")
+def bench_should_end_call() -> Callable[[], Any]:
+    session = CallSession("CABENCH", SCENARIO)
+    session.turn_count = 10
+
+    def run() -> None:
+        for text in AGENT_TURNS:
+            session.goal_achieved = False
+            session.should_end_call(text)
+    return run
+
+
+@benchmark("phrases.end_reason")
+def bench_end_reason() -> Callable[[], Any]:
+    session = CallSession("CABENCH", SCENARIO)
+    session.turn_count = 10
+
+    def run() -> None:
+        for text in AGENT_TURNS:
+            session.goal_achieved = False
+            session.end_reason(text)
+    return run
+
+
+@benchmark("phrases.is_goal_completed")
+def bench_is_goal_completed() -> Callable[[], Any]:
+    manager = ConversationManager(get_scenario_by_name(SCENARIO))
+    history = " ".join(AGENT_TURNS * 4)
+    return lambda: manager._is_goal_completed(history)
+
+
+@benchmark("phrases.draft_reply_fast_paths")
+def bench_draft_reply_fast_paths() -> Callable[[], Any]:
+    # Verification and completion checks answered without the LLM
+    manager = ConversationManager(get_scenario_by_name(SCENARIO))
+    manager.record_turn("Let me check that for you.", "Your appointment is scheduled.")
+    turns = [AGENT_TURNS[0], AGENT_TURNS[1], AGENT_TURNS[5]]
+    return lambda: [manager.draft_reply(text, 0.95) for text in turns]
+
+
+@benchmark("phrases.looks_cut_off")
+def bench_looks_cut_off() -> Callable[[], Any]:
+    return lambda: [looks_cut_off(text, 0.8) for text in AGENT_TURNS]
+
+
+def _register_save_transcript(turns: int) -> None:
+    @benchmark(f"transcript_manager.save_transcript[{turns}_turns]")
+    def bench_save_transcript() -> Callable[[], Any]:
+        manager = TranscriptManager()
+        manager.transcripts_dir = tempfile.mkdtemp(prefix="pgai-bench-")
+        atexit.register(shutil.rmtree, manager.transcripts_dir, True)
+        data = {"scenario_name": SCENARIO, "transcript": _fake_transcript(turns), "turn_count": turns}
+        return lambda: manager.save_transcript("CABENCH", data)
+
+
+for _turns in (5, 25, 100):
+    _register_save_transcript(_turns)
+
+
+@benchmark("phone_system.reply_twiml")
+def bench_reply_twiml() -> Callable[[], Any]:
+    # The TwiML handle_agent_response returns for a normal patient turn
+    session = CallSession("CABENCH", SCENARIO)
+
+    def run() -> str:
+        response = VoiceResponse()
+        response.pause(length=1.5)
+        response.say("I'd like to schedule an appointment for my knee.", voice="Polly.Matthew-Neural")
+        response.append(_build_gather(session))
+        return str(response)
+    return run
@@ -0,0 +1,81 @@
+"""
+Import-time benchmark for the CLI entry points.
+
+Each entry module is imported in a fresh interpreter several times; the
+median import time must stay under the target, and the server stack (Flask,
+Twilio, OpenAI, NumPy) must not be imported at all.
+
+Usage:
+  python -m benchmarks.bench_import
+  python -m benchmarks.bench_import --target-ms 200 --runs 7
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+from src.utils import get_project_root
+
+CLI_MODULES = ["test_call", "analyze_transcript", "endpointing_report"]
+SERVER_STACK = ["flask", "twilio", "openai", "numpy"]
+CLI_IMPORT_TARGET_MS = float(os.getenv("CLI_IMPORT_TARGET_MS", "150"))
+
+_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed_ms = (time.perf_counter() - start) * 1000
+heavy = sorted(m for m in {stack!r} if m in sys.modules)
+print(json.dumps({{"ms": elapsed_ms, "heavy": heavy}}))
+"""
+
+
+def measure(module: str, runs: int) -> tuple[float, list[str]]:
+    """
+    Import a module in fresh interpreters.
+
+    Args:
+        module: Module to import.
+        runs: Number of interpreters to start.
+
+    Returns:
+        (median import ms, server-stack modules it pulled in).
+    """
+    timings: list[float] = []
+    heavy: list[str] = []
+    for _ in range(runs):
+        result = subprocess.run(
+            [sys.executable, "-c", _PROBE.format(module=module, stack=SERVER_STACK)],
+            cwd=get_project_root(),
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        data = json.loads(result.stdout.strip().splitlines()[-1])
+        timings.append(data["ms"])
+        heavy = data["heavy"]
+    return statistics.median(timings), heavy
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="CLI import-time benchmark")
+    parser.add_argument("--target-ms", type=float, default=CLI_IMPORT_TARGET_MS)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    failed = False
+    for module in CLI_MODULES:
+        median_ms, heavy = measure(module, args.runs)
+        ok = median_ms <= args.target_ms and not heavy
+        failed |= not ok
+        status = "OK  " if ok else "FAIL"
+        note = f" (imports {', '.join(heavy)})" if heavy else ""
+        print(f"[{status}] {module:<22} {median_ms:7.1f} ms  (target {args.target_ms:.0f} ms){note}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Memory per active call, for sizing hosts by concurrent calls.
+
+Builds N in-memory call sessions of a given length (agent/patient turns with
+the usual per-turn metrics and prompt history) and measures the memory they
+hold with tracemalloc. It does this both for the compact turn store
+(src/turn_store.py) and for the previous layout: transcript dicts with ISO
+timestamps, a prefixed history copy and a private scenario per call. The
+result is projected to --project concurrent calls.
+
+Usage:
+  python -m benchmarks.bench_memory
+  python -m benchmarks.bench_memory --calls 200 --turns 50 --project 1000
+"""
+
+import argparse
+import gc
+import tracemalloc
+from datetime import datetime
+from typing import Any, Callable
+
+from benchmarks.bench_hot_paths import AGENT_TURNS, SCENARIO
+from src.scenario_loader import get_scenario_by_name, shared_scenario
+from src.turn_store import AGENT, PATIENT, TurnStore
+
+PATIENT_REPLY = "I'd like to schedule an appointment for my knee."
+PATIENT_METRICS = {"reply_latency_ms": 812.4, "model": "gpt-4.1-mini", "route": "default", "llm_ms": 640.2}
+
+
+def _dict_call(turns: int) -> tuple[Any, ...]:
+    """One call in the previous layout: transcript dicts, history dicts, scenario copy."""
+    transcript: list[dict[str, Any]] = []
+    history: list[dict[str, str]] = []
+    for i in range(turns):
+        if i % 2 == 0:
+            text = AGENT_TURNS[(i // 2) % len(AGENT_TURNS)] + f" ({i})"
+            transcript.append({
+                "speaker": "agent", "text": text, "turn": i, "timestamp": datetime.now().isoformat(),
+                "confidence": 0.93, "speech_timeout": 3,
+            })
+            history.append({"role": "user", "content": f"Agent: {text}"})
+        else:
+            text = f"{PATIENT_REPLY} ({i})"
+            transcript.append({
+                "speaker": "patient", "text": text, "turn": i, "timestamp": datetime.now().isoformat(),
+                **PATIENT_METRICS,
+            })
+            history.append({"role": "assistant", "content": text})
+    return transcript, history, get_scenario_by_name(SCENARIO)
+
+
+def _store_call(turns: int) -> tuple[Any, ...]:
+    """One call in the turn store, with the shared read-only scenario."""
+    store = TurnStore()
+    for i in range(turns):
+        if i % 2 == 0:
+            text = AGENT_TURNS[(i // 2) % len(AGENT_TURNS)] + f" ({i})"
+            store.append(AGENT, text, 0.93, speech_timeout=3)
+            store.record_exchange(text, f"{PATIENT_REPLY} ({i + 1})")
+        else:
+            store.append(PATIENT, f"{PATIENT_REPLY} ({i})", **PATIENT_METRICS)
+    return store, shared_scenario(SCENARIO)
+
+
+def measure(build: Callable[[int], Any], calls: int, turns: int) -> float:
+    """Mean bytes held per call built by build(turns)."""
+    build(turns)  # load scenarios and caches outside the measurement
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    sessions = [build(turns) for _ in range(calls)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del sessions
+    return (after - before) / calls
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Memory per active call")
+    parser.add_argument("--calls", type=int, default=100, help="Sessions to build")
+    parser.add_argument("--turns", type=int, default=25, help="Turns per session")
+    parser.add_argument("--project", type=int, default=1000, help="Concurrent calls to project to")
+    args = parser.parse_args()
+
+    results = {"dict layout": measure(_dict_call, args.calls, args.turns),
+               "turn store": measure(_store_call, args.calls, args.turns)}
+    for name, per_call in results.items():
+        print(f"{name:<12} {per_call / 1024:8.1f} KiB/call  "
+              f"{per_call * args.project / 1024 ** 2:8.1f} MiB for {args.project} calls ({args.turns} turns)")
+    saved = 1 - results["turn store"] / results["dict layout"]
+    print(f"[INFO] Turn store holds {saved:.0%} less per call")
+    sample = _store_call(args.turns)[0]
+    print(f"[INFO] TurnStore.nbytes() estimate (GET /sessions): {sample.nbytes() / 1024:.1f} KiB/call")
+
+
+if __name__ == "__main__":
+    main()
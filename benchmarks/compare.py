@@ -0,0 +1,68 @@
+"""
+Compare two saved benchmark runs and flag regressions.
+
+Exits 1 if any benchmark's fastest run is slower than the baseline by more than
+the threshold (default BENCH_REGRESSION_THRESHOLD, 0.20 = 20%), or if either
+file is missing. The default baseline, benchmarks/baselines/baseline.json, is
+committed. Its timings come from one machine; the baseline column is scaled
+by the harness.reference benchmark of both runs (see harness.py), so the
+gate compares timings relative to the machine's speed in each run.
+
+Usage:
+  python -m benchmarks.compare
+  python -m benchmarks.compare benchmarks/results/latest.json --baseline old.json --threshold 0.1
+"""
+
+import argparse
+import os
+import sys
+from typing import Any
+
+from benchmarks.harness import BASELINE_PATH, REGRESSION_THRESHOLD, RESULTS_PATH, compare_results, load_results
+
+
+def print_comparison(rows: list[dict[str, Any]], threshold: float) -> bool:
+    """
+    Print a comparison table.
+
+    Args:
+        rows: Output of compare_results().
+        threshold: Regression threshold used (for the summary line).
+
+    Returns:
+        True if any benchmark regressed.
+    """
+    print(f"\n{'Benchmark':<50} {'Baseline':>12} {'Current':>12} {'Change':>8}")
+    print("-" * 95)
+    for row in rows:
+        flag = {"regression": "  REGRESSION", "improved": "  improved"}.get(row["status"], "")
+        print(
+            f"{row['name']:<50} {row['baseline_us']:>10.2f}us {row['current_us']:>10.2f}us "
+            f"{row['change'] * 100:>+7.1f}%{flag}"
+        )
+    regressions = [row for row in rows if row["status"] == "regression"]
+    if regressions:
+        print(f"\n[ERROR] {len(regressions)} benchmark(s) regressed by more than {threshold:.0%}")
+    else:
+        print(f"\n[SUCCESS] No regressions beyond {threshold:.0%}")
+    return bool(regressions)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare benchmark results against a baseline")
+    parser.add_argument("current", nargs="?", default=RESULTS_PATH)
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--threshold", type=float, default=REGRESSION_THRESHOLD)
+    args = parser.parse_args()
+
+    for label, path in (("results", args.current), ("baseline", args.baseline)):
+        if not os.path.exists(path):
+            hint = "run python -m benchmarks.run --save-baseline" if label == "baseline" else "run python -m benchmarks.run"
+            print(f"[ERROR] No {label} at {path}; {hint} first")
+            sys.exit(1)
+    rows = compare_results(load_results(args.current), load_results(args.baseline), args.threshold)
+    sys.exit(1 if print_comparison(rows, args.threshold) else 0)
+
+
+if __name__ == "__main__":
+    main()
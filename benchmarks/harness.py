@@ -0,0 +1,162 @@
+"""
+Shared timing, registry and baseline helpers for the hot-path benchmarks.
+
+A benchmark is a setup function registered with @benchmark: it prepares its
+inputs and returns a zero-argument callable, which is then timed. Results are
+stored as JSON ({name: {"median_us", "min_us", "runs", "loops"}}) so runs can
+be saved as a baseline and compared later.
+
+Absolute timings are machine-specific, so every run also times REFERENCE, a
+fixed pure-Python workload. compare_results() scales the baseline by how much
+faster or slower REFERENCE ran, and gates on that ratio: a baseline recorded
+on another machine (or a busier one) still compares like for like.
+"""
+
+import json
+import os
+import platform
+import statistics
+import time
+from datetime import datetime
+from typing import Any, Callable
+
+from src.utils import get_project_root
+
+BenchmarkSetup = Callable[[], Callable[[], Any]]
+
+BENCHMARKS_DIR = os.path.join(get_project_root(), "benchmarks")
+BASELINE_PATH = os.path.join(BENCHMARKS_DIR, "baselines", "baseline.json")
+RESULTS_PATH = os.path.join(BENCHMARKS_DIR, "results", "latest.json")
+
+# Fraction slower than baseline that counts as a regression
+REGRESSION_THRESHOLD = float(os.getenv("BENCH_REGRESSION_THRESHOLD", "0.20"))
+
+# Calibration benchmark run with every selection; it is never gated itself
+REFERENCE = "harness.reference"
+
+_registry: dict[str, tuple[str, BenchmarkSetup]] = {}
+
+
+def benchmark(name: str, group: str = "micro") -> Callable[[BenchmarkSetup], BenchmarkSetup]:
+    """Register a benchmark setup function under `name` ("micro" or "macro" group)."""
+    def register(setup: BenchmarkSetup) -> BenchmarkSetup:
+        _registry[name] = (group, setup)
+        return setup
+    return register
+
+
+@benchmark(REFERENCE, group="reference")
+def _bench_reference() -> Callable[[], Any]:
+    # Dict, string and sort work, roughly the mix of the hot paths
+    words = [f"word{i % 97}" for i in range(2000)]
+
+    def run() -> int:
+        counts: dict[str, int] = {}
+        for word in words:
+            counts[word.upper()] = counts.get(word.upper(), 0) + 1
+        return len(sorted(" ".join(words).split()))
+    return run
+
+
+def registered() -> dict[str, tuple[str, BenchmarkSetup]]:
+    """All registered benchmarks by name."""
+    return dict(_registry)
+
+
+def time_callable(fn: Callable[[], Any], runs: int = 7, min_run_seconds: float = 0.1) -> dict[str, Any]:
+    """
+    Time a callable, timeit-style.
+
+    The loop count is doubled until one run takes at least `min_run_seconds`,
+    then `runs` runs are timed and reduced to per-call microseconds.
+
+    Args:
+        fn: Zero-argument callable.
+        runs: Number of timed runs.
+        min_run_seconds: Minimum duration of a single run.
+
+    Returns:
+        Dict with median_us, min_us, runs and loops.
+    """
+    fn()  # warm caches and lazy imports outside the timed runs
+    loops = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        if time.perf_counter() - started >= min_run_seconds:
+            break
+        loops *= 2
+    per_call: list[float] = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        per_call.append((time.perf_counter() - started) / loops * 1e6)
+    return {
+        "median_us": round(statistics.median(per_call), 3),
+        "min_us": round(min(per_call), 3),
+        "runs": runs,
+        "loops": loops,
+    }
+
+
+def save_results(results: dict[str, dict[str, Any]], path: str) -> None:
+    """Write results with machine metadata to a JSON file."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    payload = {
+        "created_at": datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "results": results,
+    }
+    with open(path, "w") as f:
+        json.dump(payload, f, indent=2)
+
+
+def load_results(path: str) -> dict[str, dict[str, Any]]:
+    """Read the results section of a saved JSON file."""
+    with open(path, "r") as f:
+        return json.load(f)["results"]
+
+
+def compare_results(
+    current: dict[str, dict[str, Any]],
+    baseline: dict[str, dict[str, Any]],
+    threshold: float = REGRESSION_THRESHOLD,
+) -> list[dict[str, Any]]:
+    """
+    Compare against a baseline using the fastest run of each benchmark.
+
+    The minimum is the least noisy statistic on a shared machine; the median
+    is kept in the results for reading. When both runs timed REFERENCE, the
+    baseline is scaled by current/baseline REFERENCE time first, so the
+    change is relative to this machine's speed in this run.
+
+    Args:
+        current: Results of the run under test.
+        baseline: Saved baseline results.
+        threshold: Fractional slowdown that counts as a regression.
+
+    Returns:
+        One row per benchmark present in both: name, baseline_us (scaled),
+        current_us, change (fraction, positive = slower) and status
+        (ok/regression/improved).
+    """
+    scale = 1.0
+    if REFERENCE in current and REFERENCE in baseline and baseline[REFERENCE]["min_us"]:
+        scale = current[REFERENCE]["min_us"] / baseline[REFERENCE]["min_us"]
+    rows = []
+    for name in sorted((set(current) & set(baseline)) - {REFERENCE}):
+        before = baseline[name]["min_us"] * scale
+        after = current[name]["min_us"]
+        change = (after - before) / before if before else 0.0
+        if change > threshold:
+            status = "regression"
+        elif change < -threshold:
+            status = "improved"
+        else:
+            status = "ok"
+        rows.append({"name": name, "baseline_us": round(before, 3), "current_us": after, "change": change,
+                     "status": status})
+    return rows
@@ -0,0 +1,68 @@
+"""
+Run the hot-path benchmark suite and store the results as JSON.
+
+Usage:
+  python -m benchmarks.run                       # write benchmarks/results/latest.json
+  python -m benchmarks.run --save-baseline       # also make it the baseline
+  python -m benchmarks.run --only phrases --compare
+"""
+
+import argparse
+import os
+import sys
+
+# The simulated call logs every turn; keep the timings about the code, not the console
+os.environ.setdefault("LOG_LEVEL", "ERROR")
+
+from benchmarks import bench_archive, bench_call, bench_hot_paths  # noqa: E402,F401  (register benchmarks)
+from benchmarks.compare import print_comparison  # noqa: E402
+from benchmarks.harness import (  # noqa: E402
+    BASELINE_PATH,
+    REFERENCE,
+    REGRESSION_THRESHOLD,
+    RESULTS_PATH,
+    compare_results,
+    load_results,
+    registered,
+    save_results,
+    time_callable,
+)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Hot-path micro/macro benchmarks")
+    parser.add_argument("--only", help="Run benchmarks whose name contains this text")
+    parser.add_argument("--group", choices=["micro", "macro"], help="Run only one group")
+    parser.add_argument("--runs", type=int, default=7)
+    parser.add_argument("--output", default=RESULTS_PATH)
+    parser.add_argument("--save-baseline", action="store_true", help=f"Also write {os.path.relpath(BASELINE_PATH)}")
+    parser.add_argument("--compare", action="store_true", help="Compare against the baseline; exit 1 on regression")
+    parser.add_argument("--threshold", type=float, default=REGRESSION_THRESHOLD)
+    args = parser.parse_args()
+
+    results = {}
+    for name, (group, setup) in registered().items():
+        selected = not (args.only and args.only not in name) and not (args.group and group != args.group)
+        if not selected and name != REFERENCE:
+            continue
+        timing = time_callable(setup(), runs=args.runs)
+        results[name] = {"group": group, **timing}
+        print(f"{name:<50} {timing['median_us']:>12.2f} us  (min {timing['min_us']:.2f}, {timing['loops']} loops)")
+
+    save_results(results, args.output)
+    print(f"\n[INFO] Results: {args.output}")
+    if args.save_baseline:
+        save_results(results, BASELINE_PATH)
+        print(f"[INFO] Baseline: {BASELINE_PATH}")
+
+    if args.compare:
+        if not os.path.exists(BASELINE_PATH):
+            print(f"[ERROR] No baseline at {BASELINE_PATH}; run with --save-baseline first")
+            sys.exit(1)
+        rows = compare_results(results, load_results(BASELINE_PATH), args.threshold)
+        if print_comparison(rows, args.threshold):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+Compare a campaign run with the previous one: what changed in agent behavior.
+
+Agent utterances of both runs are clustered into behaviors (MinHash/LSH
+near-duplicate detection), then each scenario reports new, vanished and
+shifted behaviors, agent turns whose usual behavior changed, and shifts in
+turn count and end reason. See src/run_compare.py.
+
+Runs are picked with --baseline / --candidate: a transcript directory,
+campaign:NAME (from the call queue), FROM..TO call start times, or last /
+last-N (runs in data/transcripts/ split by RUN_GAP_MINUTES of quiet).
+
+Usage:
+  python compare_runs.py                                  # last-1 vs last
+  python compare_runs.py --list-runs
+  python compare_runs.py --baseline campaign:release-41 --candidate campaign:release-42
+  python compare_runs.py --baseline /tmp/dry_v1 --candidate /tmp/dry_v2 --json diff.json
+  python compare_runs.py --baseline 2026-10-01..2026-10-02 --candidate 2026-10-02.. --scenario appointment
+"""
+
+import argparse
+import json
+import sys
+import time
+from typing import Any
+
+from src.run_compare import (
+    CLUSTER_THRESHOLD,
+    MIN_SHARE,
+    call_started,
+    compare_runs,
+    load_transcripts,
+    select_run,
+    split_runs,
+)
+
+
+def _print_scenario(name: str, result: dict[str, Any]) -> None:
+    calls, turns, reasons = result["calls"], result["turns"], result["end_reasons"]
+    print(f"\n{name}  (calls {calls['baseline']} -> {calls['candidate']}, "
+          f"mean turns {turns['baseline']} -> {turns['candidate']})")
+    if not (calls["baseline"] and calls["candidate"]):
+        print(f"    only in {'candidate' if calls['candidate'] else 'baseline'} run")
+        return
+    if result["end_reason_shift"]:
+        print(f"    end reasons: {reasons['baseline']} -> {reasons['candidate']}")
+    for kind, sign in (("new", "+"), ("vanished", "-"), ("shifted", "~")):
+        for entry in result[kind]:
+            print(f"    {sign} {kind:<8} {entry['baseline']:.0%} -> {entry['candidate']:.0%}  \"{entry['behavior']}\"")
+    for entry in result["changed"]:
+        if entry["change"] == "inserted":
+            print(f"    * inserted at turn {entry['candidate_turn']}: \"{entry['candidate']}\"")
+        elif entry["change"] == "removed":
+            print(f"    * removed from turn {entry['baseline_turn']}: \"{entry['baseline']}\"")
+        else:
+            print(f"    * turn {entry['baseline_turn']} -> {entry['candidate_turn']}: \"{entry['baseline']}\"\n"
+                  f"          now: \"{entry['candidate']}\"")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare agent behavior between two runs")
+    parser.add_argument("--baseline", default="last-1", help="Previous run selector (default: last-1)")
+    parser.add_argument("--candidate", default="last", help="New run selector (default: last)")
+    parser.add_argument("--scenario", action="append", help="Only these scenarios (repeatable)")
+    parser.add_argument("--threshold", type=float, default=CLUSTER_THRESHOLD, help="Near-duplicate similarity")
+    parser.add_argument("--min-share", type=float, default=MIN_SHARE, help="Share of calls for a behavior to count")
+    parser.add_argument("--list-runs", action="store_true", help="List runs found in data/transcripts/")
+    parser.add_argument("--json", help="Also write the comparison to this JSON file")
+    parser.add_argument("--fail-on-change", action="store_true", help="Exit 1 if any scenario changed")
+    args = parser.parse_args()
+
+    transcripts = load_transcripts()
+    if args.list_runs:
+        runs = split_runs(transcripts)
+        for back, run in enumerate(reversed(runs)):
+            starts = sorted(call_started(t) for t in run.values())
+            scenarios = len({t.get("scenario_name") for t in run.values()})
+            label = "last" if back == 0 else f"last-{back}"
+            print(f"  {label:<8} {starts[0]:%Y-%m-%d %H:%M} .. {starts[-1]:%H:%M}  {len(run):>5} calls  "
+                  f"{scenarios} scenarios")
+        return
+
+    started = time.perf_counter()
+    try:
+        baseline = select_run(args.baseline, transcripts)
+        candidate = select_run(args.candidate, transcripts)
+    except ValueError as e:
+        print(f"[ERROR] {e}")
+        sys.exit(1)
+    if args.scenario:
+        baseline = {k: t for k, t in baseline.items() if t.get("scenario_name") in args.scenario}
+        candidate = {k: t for k, t in candidate.items() if t.get("scenario_name") in args.scenario}
+    if not baseline or not candidate:
+        print(f"[ERROR] Nothing to compare: {len(baseline)} baseline and {len(candidate)} candidate calls")
+        sys.exit(1)
+
+    report = compare_runs(baseline, candidate, args.threshold, args.min_share)
+    elapsed = time.perf_counter() - started
+
+    changed = []
+    for name, result in report["scenarios"].items():
+        differs = result["turn_shift"] or any(
+            result[kind] for kind in ("new", "vanished", "shifted", "changed", "end_reason_shift")
+        )
+        if differs or not (result["calls"]["baseline"] and result["calls"]["candidate"]):
+            changed.append(name)
+            _print_scenario(name, result)
+
+    print(f"\n[INFO] {report['baseline']['calls']} vs {report['candidate']['calls']} calls, "
+          f"{report['utterances']} agent utterances in {report['behaviors']} behaviors, "
+          f"{len(changed)}/{len(report['scenarios'])} scenarios changed ({elapsed:.1f}s)")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"[INFO] Comparison written to {args.json}")
+    sys.exit(1 if args.fail_on_change and changed else 0)
+
+
+if __name__ == "__main__":
+    main()
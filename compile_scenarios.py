@@ -0,0 +1,40 @@
+"""
+Validate every scenario and compile them into data/scenarios.bundle.
+
+The server loads the bundle at startup and recompiles it automatically when a
+scenario file changes; run this to catch schema errors before placing calls.
+
+Usage:
+  python compile_scenarios.py           # validate and write the bundle
+  python compile_scenarios.py --check   # validate only; exit 1 on errors
+"""
+
+import argparse
+import sys
+import time
+
+from src.scenario_bundle import BUNDLE_PATH
+from src.scenario_loader import compile_scenarios
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Validate and precompile scenarios")
+    parser.add_argument("--check", action="store_true", help="Validate only; do not write the bundle")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    compiled, invalid = compile_scenarios(write=not args.check)
+    elapsed = (time.perf_counter() - started) * 1000
+
+    for name, errors in invalid.items():
+        print(f"[ERROR] {name}")
+        for error in errors:
+            print(f"         - {error}")
+    print(f"[INFO] {len(compiled)} valid, {len(invalid)} invalid scenarios ({elapsed:.0f} ms)")
+    if not args.check:
+        print(f"[INFO] Bundle: {BUNDLE_PATH}")
+    sys.exit(1 if invalid else 0)
+
+
+if __name__ == "__main__":
+    main()
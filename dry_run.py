@@ -0,0 +1,79 @@
+"""
+Run simulated conversations in-process: clinic agent vs patient bot, no phone call.
+
+Transcripts are written to data/transcripts/dry_run/ in the usual format.
+The patient bot uses the real LLM for every agent kind; without an API key
+it runs on the rule-based fallbacks. Runs use a thread pool by default, so
+they share one rate limiter. --pool process suits offline runs (CPU-bound);
+with an API key, each worker process gets 1/workers of OPENAI_RPM / OPENAI_TPM.
+
+Usage:
+  python dry_run.py appointment --runs 50                  # rule-based agent, thread pool
+  python dry_run.py --all --agent scripted                 # replay each scenario's saved transcript
+  python dry_run.py edge_barge_in --agent scripted --source edge_barge_in
+  python dry_run.py appointment --agent llm --runs 10 --workers 8
+  OPENAI_API_KEY= python dry_run.py --all --runs 200 --pool process   # offline, all CPUs
+"""
+
+import argparse
+import os
+import sys
+import time
+from collections import Counter, defaultdict
+from typing import Any
+
+# Per-turn logs from hundreds of runs drown the summary; errors still show
+os.environ.setdefault("LOG_LEVEL", "ERROR")
+
+from src.dry_run import AGENT_KINDS, DRY_RUN_DIR, run_batch  # noqa: E402
+from src.scenario_loader import list_scenarios  # noqa: E402
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="In-process dry runs of scenarios against a simulated clinic agent")
+    parser.add_argument("scenarios", nargs="*", help="Scenario names")
+    parser.add_argument("--all", action="store_true", help="Run every scenario")
+    parser.add_argument("--agent", choices=AGENT_KINDS, default="rule")
+    parser.add_argument("--source", help="Transcript to replay with --agent scripted (default: scenario name)")
+    parser.add_argument("--runs", type=int, default=1, help="Conversations per scenario")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--pool", choices=["thread", "process"], default="thread",
+                        help="process: offline runs; provider limits are split across workers")
+    parser.add_argument("--output", default=DRY_RUN_DIR, help="Transcript directory")
+    args = parser.parse_args()
+
+    scenarios = [s["name"] for s in list_scenarios()] if args.all else args.scenarios
+    if not scenarios:
+        parser.print_usage()
+        sys.exit(1)
+
+    started = time.perf_counter()
+    by_scenario: dict[str, list[dict[str, Any]]] = defaultdict(list)
+    failures = 0
+    for result in run_batch(scenarios, args.runs, args.agent, args.source, args.workers, args.pool, args.output):
+        by_scenario[result["scenario"]].append(result)
+        if "error" in result:
+            failures += 1
+            print(f"[ERROR] {result['scenario']}: {result['error']}")
+    elapsed = time.perf_counter() - started
+
+    print(f"\n{'Scenario':<30} {'Runs':>5} {'Turns':>6} {'Goal':>6} {'Per run':>8}  End reasons")
+    print("-" * 100)
+    for name in scenarios:
+        results = [r for r in by_scenario[name] if "error" not in r]
+        if not results:
+            continue
+        turns = sum(r["turns"] for r in results) / len(results)
+        goal = sum(r["goal_achieved"] for r in results) / len(results)
+        per_run = sum(r["elapsed_s"] for r in results) / len(results)
+        reasons = ", ".join(f"{reason} {n}" for reason, n in Counter(r["end_reason"] for r in results).most_common())
+        print(f"{name:<30} {len(results):>5} {turns:>6.1f} {goal:>6.0%} {per_run:>7.2f}s  {reasons}")
+
+    total = sum(len(results) for results in by_scenario.values())
+    print(f"\n[INFO] {total} conversations in {elapsed:.1f}s ({total / elapsed:.1f}/s), {failures} failed")
+    print(f"[INFO] Transcripts: {args.output}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
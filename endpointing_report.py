@@ -0,0 +1,62 @@
+"""
+Report effective call duration per scenario, grouped by endpointing mode.
+
+Transcripts saved before per-scenario endpointing have no "endpointing" block
+and used a fixed 3s speech_timeout; they are reported as the "fixed-3s
+(before)" baseline so the effect of new settings can be compared.
+
+Usage: python endpointing_report.py
+"""
+
+from collections import defaultdict
+from typing import Any
+
+from src.transcript_manager import TranscriptManager
+
+BASELINE = "fixed-3s (before)"
+BASELINE_SPEECH_TIMEOUT = 3
+
+
+def _endpointing_wait(transcript: dict[str, Any]) -> float | None:
+    """Estimated seconds spent waiting for end-of-speech silence across agent turns."""
+    total = 0.0
+    for turn in transcript.get("transcript", []):
+        if turn.get("speaker") != "agent":
+            continue
+        speech_timeout = turn.get("speech_timeout", BASELINE_SPEECH_TIMEOUT)
+        if not isinstance(speech_timeout, (int, float)):
+            return None  # "auto": Twilio decides, not observable
+        total += speech_timeout
+    return total
+
+
+def main() -> None:
+    transcript_manager = TranscriptManager()
+    groups: dict[tuple[str, str], list[dict[str, Any]]] = defaultdict(list)
+    for key in transcript_manager.list_transcripts():
+        transcript = transcript_manager.load_transcript(key)
+        if not transcript or not transcript.get("duration_seconds"):
+            continue
+        endpointing = transcript.get("endpointing")
+        mode = str(endpointing["mode"]) if endpointing else BASELINE
+        groups[(transcript.get("scenario_name", "unknown"), mode)].append(transcript)
+
+    if not groups:
+        print("[INFO] No completed transcripts with a duration")
+        return
+
+    print(f"\n{'Scenario':<28} {'Endpointing':<18} {'Calls':>5} {'Duration':>9} {'Turns':>6} {'s/turn':>7} {'EP wait':>8}")
+    print("-" * 87)
+    for (scenario, mode), transcripts in sorted(groups.items()):
+        n = len(transcripts)
+        duration = sum(t["duration_seconds"] for t in transcripts) / n
+        turns = sum(t.get("turn_count", 0) for t in transcripts) / n
+        per_turn = duration / turns if turns else 0.0
+        waits = [_endpointing_wait(t) for t in transcripts]
+        wait = f"{sum(waits) / n:.0f}s" if all(w is not None for w in waits) else "n/a"
+        print(f"{scenario:<28} {mode:<18} {n:>5} {duration:>8.0f}s {turns:>6.1f} {per_turn:>6.1f}s {wait:>8}")
+    print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Grade saved transcripts against their scenario specs and summarize defects.
+
+Results are cached (data/grades/cache.json), so re-runs only grade
+transcripts, scenarios or rubrics that changed.
+
+Usage:
+  python grade_transcripts.py                       # LLM grader, GRADER_CONCURRENCY requests in flight
+  python grade_transcripts.py --offline             # heuristic grader, no API calls
+  python grade_transcripts.py --dry-runs --offline  # grade data/transcripts/dry_run/
+  python grade_transcripts.py --scenario edge_state_desync --verbose --json grades.json
+"""
+
+import argparse
+import json
+import sys
+import time
+from collections import Counter, defaultdict
+from typing import Any
+
+from src.grader import GRADER_CONCURRENCY, GradeCache, grade_transcripts
+from src.transcript_manager import DRY_RUN_DIR, TranscriptManager
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Grade transcripts against scenario specs")
+    parser.add_argument("--offline", action="store_true", help="Heuristic grader (no API calls)")
+    parser.add_argument("--workers", type=int, default=GRADER_CONCURRENCY, help="Grading requests in flight")
+    parser.add_argument("--scenario", action="append", help="Only these scenarios (repeatable)")
+    parser.add_argument("--dry-runs", action="store_true", help=f"Grade {DRY_RUN_DIR} instead of real calls")
+    parser.add_argument("--force", action="store_true", help="Ignore cached grades")
+    parser.add_argument("--verbose", action="store_true", help="List every defect")
+    parser.add_argument("--json", help="Also write every grade to this JSON file")
+    args = parser.parse_args()
+
+    transcript_manager = TranscriptManager()
+    if args.dry_runs:
+        transcript_manager.transcripts_dir = DRY_RUN_DIR
+    transcripts: dict[str, dict[str, Any]] = {}
+    for key in transcript_manager.list_transcripts():
+        transcript = transcript_manager.load_transcript(key)
+        if transcript and transcript.get("transcript") and (
+            not args.scenario or transcript.get("scenario_name") in args.scenario
+        ):
+            transcripts[key] = transcript
+    if not transcripts:
+        print("[INFO] No transcripts to grade")
+        return
+
+    grader = "offline" if args.offline else "llm"
+    cache = GradeCache()
+    started = time.perf_counter()
+    rows: list[dict[str, Any]] = []
+    try:
+        for row in grade_transcripts(transcripts, grader, args.workers, cache, refresh=args.force):
+            rows.append(row)
+            if "error" in row:
+                print(f"[ERROR] {row['key']}: {row['error']}")
+    finally:
+        cache.save()
+    elapsed = time.perf_counter() - started
+
+    by_scenario: dict[str, list[dict[str, Any]]] = defaultdict(list)
+    for row in rows:
+        if "error" not in row:
+            by_scenario[row["scenario"]].append(row)
+
+    print(f"\n{'Scenario':<30} {'Calls':>5} {'Pass':>5} {'Fail':>5}  Defects")
+    print("-" * 100)
+    for name in sorted(by_scenario):
+        graded = by_scenario[name]
+        passed = sum(1 for r in graded if r["passed"])
+        defects = Counter(d["type"] for r in graded for d in r["defects"])
+        summary = ", ".join(f"{kind} {n}" for kind, n in defects.most_common()) or "-"
+        print(f"{name:<30} {len(graded):>5} {passed:>5} {len(graded) - passed:>5}  {summary}")
+        if args.verbose:
+            for r in graded:
+                for d in r["defects"]:
+                    turn = f"turn {d['turn']}" if d.get("turn") is not None else "call"
+                    print(f"    {r['key']} [{d['severity']}] {d['type']} ({turn}) {d.get('evidence', '')}")
+
+    graded = [r for r in rows if "error" not in r]
+    cached = sum(1 for r in graded if r["cached"])
+    errors = len(rows) - len(graded)
+    print(f"\n[INFO] {len(graded)} graded ({cached} cached, {len(graded) - cached} new) by {grader} grader "
+          f"in {elapsed:.1f}s; {sum(1 for r in graded if r['passed'])} passed, {errors} errors")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(rows, f, indent=2)
+        print(f"[INFO] Grades: {args.json}")
+    sys.exit(1 if errors else 0)
+
+
+if __name__ == "__main__":
+    main()
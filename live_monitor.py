@@ -0,0 +1,99 @@
+"""
+Watch calls in flight on the webhook server (GET /live server-sent events).
+
+Prints every turn with its reply latency and model, end reasons and Twilio
+status changes as they happen. Reconnects if the server restarts.
+
+Usage:
+  python live_monitor.py
+  python live_monitor.py --scenario appointment --scenario edge_barge_in
+  python live_monitor.py --call-sid CA123... --server http://localhost:5000
+  python live_monitor.py --json                     # raw events, one per line
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import datetime
+from typing import Any, Iterator
+
+import requests
+
+RECONNECT_SECONDS = 3
+
+
+def read_events(response: requests.Response) -> Iterator[tuple[str, dict[str, Any]]]:
+    """(event type, data) pairs from a server-sent events stream."""
+    event_type, data = "message", []
+    for line in response.iter_lines(decode_unicode=True):
+        if line is None or line.startswith(":"):
+            continue
+        if not line:
+            if data:
+                yield event_type, json.loads("\n".join(data))
+            event_type, data = "message", []
+        elif line.startswith("event:"):
+            event_type = line[6:].strip()
+        elif line.startswith("data:"):
+            data.append(line[5:].strip())
+
+
+def format_event(event_type: str, event: dict[str, Any]) -> str | None:
+    """One console line per event."""
+    clock = datetime.fromtimestamp(event.get("ts", time.time())).strftime("%H:%M:%S")
+    call = f"{event.get('call_sid', '')[-6:]} {event.get('scenario') or '?':<20}"
+    if event_type == "snapshot":
+        active = event["active"]
+        calls = ", ".join(f"{c['call_sid'][-6:]} ({c['scenario']}, {c['turns']} turns)" for c in active)
+        return f"[INFO] {len(active)} active calls{': ' + calls if calls else ''}"
+    if event_type == "turn":
+        details = []
+        if event.get("reply_latency_ms") is not None:
+            details.append(f"{event['reply_latency_ms']:.0f} ms")
+        if event.get("model"):
+            details.append(event["model"])
+        if event.get("confidence") is not None:
+            details.append(f"conf {event['confidence']:.2f}")
+        suffix = f"  ({', '.join(details)})" if details else ""
+        return f"{clock} {call} {event['turn']:>3} {event['speaker']:<7} {event['text']}{suffix}"
+    if event_type == "end":
+        return f"{clock} {call}     -- ending: {event['reason']} after {event['turns']} turns"
+    if event_type == "status":
+        duration = f" ({event['duration_seconds']}s)" if event.get("duration_seconds") else ""
+        return f"{clock} {call}     -- status: {event['status']}{duration}"
+    if event_type == "dropped":
+        return f"[WARNING] {event['count']} events dropped (monitor too slow)"
+    return None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Live view of calls on the webhook server")
+    parser.add_argument("--server", default=f"http://localhost:{os.getenv('FLASK_PORT', '5000')}")
+    parser.add_argument("--call-sid", action="append", default=[], help="Only these calls (repeatable)")
+    parser.add_argument("--scenario", action="append", default=[], help="Only these scenarios (repeatable)")
+    parser.add_argument("--json", action="store_true", help="Print raw events as JSON lines")
+    args = parser.parse_args()
+
+    params = {"call_sid": ",".join(args.call_sid), "scenario": ",".join(args.scenario)}
+    while True:
+        try:
+            with requests.get(f"{args.server}/live", params=params, stream=True, timeout=(5, 60)) as response:
+                response.raise_for_status()
+                for event_type, event in read_events(response):
+                    line = json.dumps({"event": event_type, **event}) if args.json else format_event(event_type, event)
+                    if line:
+                        print(line, flush=True)
+        except KeyboardInterrupt:
+            sys.exit(0)
+        except requests.RequestException as e:
+            print(f"[WARNING] Live stream unavailable ({e}); reconnecting in {RECONNECT_SECONDS}s", file=sys.stderr)
+            try:
+                time.sleep(RECONNECT_SECONDS)
+            except KeyboardInterrupt:
+                sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
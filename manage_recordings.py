@@ -0,0 +1,61 @@
+"""
+Maintain the recording store: usage, legacy import, transcoding, retention.
+
+Usage:
+  python manage_recordings.py                         # usage summary
+  python manage_recordings.py --import-legacy         # move data/recordings/*.mp3 into the store
+  python manage_recordings.py --transcode             # re-store MP3 entries as Opus (needs ffmpeg)
+  python manage_recordings.py --enforce --quota-mb 500 --retention-days 90
+  python manage_recordings.py --verify                # re-hash every stored recording
+"""
+
+import argparse
+import sys
+
+from src.recording_store import QUOTA_MB, RETENTION_DAYS, RecordingStore
+
+
+def _print_usage(store: RecordingStore) -> None:
+    usage = store.usage()
+    codecs = ", ".join(f"{n} {codec}" for codec, n in sorted(usage["codecs"].items())) or "none"
+    legacy = len(store.list_recordings()) - usage["recordings"]
+    print(
+        f"[INFO] {usage['recordings']} recordings in {usage['blobs']} blobs, "
+        f"{usage['bytes'] / 1024 / 1024:.1f} MB ({codecs}); {legacy} legacy MP3s not imported"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Recording store maintenance")
+    parser.add_argument("--import-legacy", action="store_true", help="Move pre-store MP3s into the store")
+    parser.add_argument("--transcode", action="store_true", help="Transcode stored MP3s to Opus")
+    parser.add_argument("--enforce", action="store_true", help="Apply retention and quota now")
+    parser.add_argument("--retention-days", type=float, default=RETENTION_DAYS, help="Maximum age (0 = no limit)")
+    parser.add_argument("--quota-mb", type=float, default=QUOTA_MB, help="Maximum total size (0 = no limit)")
+    parser.add_argument("--verify", action="store_true", help="Re-hash every stored recording")
+    args = parser.parse_args()
+
+    store = RecordingStore()
+    if args.import_legacy:
+        imported = store.import_legacy()
+        print(f"[INFO] Imported {len(imported)} legacy recordings")
+    if args.transcode:
+        transcoded = [sid for sid in store.list_recordings() if store.transcode(sid)]
+        print(f"[INFO] Transcoded {len(transcoded)} recordings to Opus")
+    if args.enforce:
+        evicted = store.enforce(retention_days=args.retention_days, quota_mb=args.quota_mb)
+        print(f"[INFO] Evicted {len(evicted)} recordings")
+    failures = 0
+    if args.verify:
+        for call_sid in store.list_recordings():
+            # Legacy MP3s are not in the manifest, so get() skips them
+            if store.get(call_sid) and not store.get(call_sid, verify=True):
+                failures += 1
+                print(f"  [ERROR] {call_sid}: content does not match its hash")
+        print(f"[INFO] Verified stored recordings: {failures} corrupted")
+    _print_usage(store)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
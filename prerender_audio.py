@@ -0,0 +1,54 @@
+"""
+Pre-render recurring patient utterances into the audio cache.
+
+Renders COMMON_PHRASES and every scenario's fixed replies (identity answers,
+closing, fallback) with AUDIO_TTS_BACKEND, so the first call already plays
+them with <Play> instead of <Say>. The server also does this in the
+background at start; run this before a campaign to have it done up front.
+
+Usage:
+  AUDIO_TTS_BACKEND=espeak python prerender_audio.py
+  python prerender_audio.py "Yes, Tuesday works for me." "Can you repeat that?"
+  python prerender_audio.py --list
+"""
+
+import argparse
+import json
+import os
+import sys
+
+from src.audio_cache import AUDIO_CACHE_DIR, audio_cache, scenario_phrases
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Render patient phrases into the audio cache")
+    parser.add_argument("phrases", nargs="*", help="Extra phrases to render")
+    parser.add_argument("--list", action="store_true", help="List cached phrases and exit")
+    args = parser.parse_args()
+
+    if args.list:
+        index_path = os.path.join(AUDIO_CACHE_DIR, "index.json")
+        index = json.load(open(index_path)) if os.path.exists(index_path) else {}
+        for name, text in sorted(index.items(), key=lambda item: item[1]):
+            print(f"  {name}  {text}")
+        print(f"[INFO] {len(index)} cached phrases in {AUDIO_CACHE_DIR}")
+        return
+
+    if not audio_cache.enabled:
+        print("[ERROR] Audio cache disabled: set AUDIO_TTS_BACKEND=espeak or elevenlabs")
+        sys.exit(1)
+
+    phrases = scenario_phrases() + args.phrases
+    queued = audio_cache.prewarm(phrases)
+    print(f"[INFO] Rendering {queued} of {len(phrases)} phrases with {audio_cache.backend.name}")
+    audio_cache.wait()
+    stats = audio_cache.stats()
+    missing = [text for text in phrases if audio_cache.lookup(text, render_on_miss=False) is None]
+    print(f"[INFO] {stats['files']} phrases cached in {AUDIO_CACHE_DIR}")
+    if missing:
+        print(f"[ERROR] {len(missing)} phrases failed to render (see data/errors.log)")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Aggregate request profiles captured with PROFILE_EVERY_N / PROFILE_CALL_SIDS /
+PROFILE_SCENARIOS and print the hottest functions across them.
+
+Usage:
+  python profile_report.py
+  python profile_report.py --route handle-agent-response --sort cumulative --limit 40
+  python profile_report.py --scenario appointment --project-only
+"""
+
+import argparse
+import glob
+import os
+import pstats
+from collections import defaultdict
+
+from src.profiling import PROFILE_DIR, parse_profile_name
+from src.utils import get_project_root
+
+SORT_KEYS = {"tottime": 2, "cumulative": 3, "calls": 1}
+
+
+def _function_label(func: tuple[str, int, str], root: str) -> str:
+    """Short "path:line(name)" label, relative to the project when possible."""
+    filename, line, name = func
+    if filename.startswith(root):
+        filename = os.path.relpath(filename, root)
+    elif filename != "~":
+        filename = os.path.basename(filename)
+    return name if filename == "~" else f"{filename}:{line}({name})"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Hottest functions across captured request profiles")
+    parser.add_argument("--dir", default=PROFILE_DIR, help="Profile directory (default: data/profiles)")
+    parser.add_argument("--route", help="Only profiles for this route, e.g. handle-agent-response")
+    parser.add_argument("--scenario", help="Only profiles for this scenario")
+    parser.add_argument("--call-sid", help="Only profiles for this call")
+    parser.add_argument("--sort", choices=sorted(SORT_KEYS), default="tottime")
+    parser.add_argument("--limit", type=int, default=25)
+    parser.add_argument("--project-only", action="store_true", help="Hide stdlib and third-party functions")
+    args = parser.parse_args()
+
+    paths = []
+    for path in sorted(glob.glob(os.path.join(args.dir, "*.prof"))):
+        fields = parse_profile_name(path)
+        if args.route and fields["route"] != args.route.strip("/").replace("/", "-"):
+            continue
+        if args.scenario and fields["scenario"] != args.scenario:
+            continue
+        if args.call_sid and fields["call_sid"] != args.call_sid:
+            continue
+        paths.append(path)
+    if not paths:
+        print(f"[INFO] No matching profiles in {args.dir}")
+        return
+
+    per_route: dict[str, list[float]] = defaultdict(list)
+    for path in paths:
+        per_route[parse_profile_name(path)["route"]].append(pstats.Stats(path).total_tt)
+    stats = pstats.Stats(*paths)
+
+    print(f"\n{len(paths)} profiled requests")
+    print(f"{'Route':<32} {'Requests':>8} {'Mean':>9} {'Max':>9}")
+    for route, totals in sorted(per_route.items()):
+        print(f"{'/' + route:<32} {len(totals):>8} {sum(totals) / len(totals) * 1000:>7.1f}ms {max(totals) * 1000:>7.1f}ms")
+
+    root = get_project_root()
+    rows = [
+        (func, calls, tottime, cumtime)
+        for func, (_, calls, tottime, cumtime, _) in stats.stats.items()
+        if not args.project_only or (func[0].startswith(root) and "site-packages" not in func[0])
+    ]
+    rows.sort(key=lambda row: row[SORT_KEYS[args.sort]], reverse=True)
+
+    n = len(paths)
+    print(f"\nTop {args.limit} functions by {args.sort} (per-request times are means over {n} requests)")
+    print(f"{'Calls':>8} {'Tottime':>10} {'Cumtime':>10} {'Tot/req':>9} {'Cum/req':>9}  Function")
+    print("-" * 100)
+    for func, calls, tottime, cumtime in rows[:args.limit]:
+        print(
+            f"{calls:>8} {tottime:>9.3f}s {cumtime:>9.3f}s "
+            f"{tottime / n * 1000:>7.2f}ms {cumtime / n * 1000:>7.2f}ms  {_function_label(func, root)}"
+        )
+    print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Run a call campaign across the caller ID / target line pool.
+
+Queues the calls on the running webhook server (python -m src.phone_system)
+via POST /queue. The server's scheduler dials them onto free lines and
+retries busy, no-answer and failed calls with backoff. The queue is on disk,
+so a campaign survives a server restart. This script then follows progress
+until every call has completed or run out of attempts.
+
+Usage:
+  python run_campaign.py appointment --calls 20
+  python run_campaign.py --all --calls 2            # 2 calls per scenario
+  python run_campaign.py edge_barge_in --calls 10 --server http://localhost:5000
+  python run_campaign.py --status campaign-20250101-120000
+"""
+
+import argparse
+import os
+import sys
+import time
+from datetime import datetime
+from typing import Any
+
+import requests
+
+from src.scenario_loader import list_scenarios
+
+POLL_SECONDS = 10
+
+
+def _progress(stats: dict[str, Any]) -> str:
+    calls = stats["calls"]
+    attempts = ", ".join(f"{outcome} {n}" for outcome, n in sorted(stats["attempts"].items())) or "none yet"
+    return (
+        f"{calls['completed']} completed, {calls['failed']} failed, {calls['in_progress']} in progress, "
+        f"{calls['pending'] + calls['dialing']} waiting | attempts: {attempts}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Queue calls across the line pool on the webhook server")
+    parser.add_argument("scenarios", nargs="*", help="Scenario names")
+    parser.add_argument("--all", action="store_true", help="Every scenario")
+    parser.add_argument("--calls", type=int, default=1, help="Calls per scenario")
+    parser.add_argument("--campaign", default=f"campaign-{datetime.now():%Y%m%d-%H%M%S}", help="Campaign label")
+    parser.add_argument("--status", metavar="CAMPAIGN", help="Follow an existing campaign instead of queueing")
+    parser.add_argument("--server", default=f"http://localhost:{os.getenv('FLASK_PORT', '5000')}")
+    parser.add_argument("--no-wait", action="store_true", help="Exit once the calls are queued")
+    args = parser.parse_args()
+
+    session = requests.Session()
+    try:
+        lines = session.get(f"{args.server}/lines", timeout=5).json()
+    except requests.RequestException as e:
+        print(f"[ERROR] Webhook server not reachable at {args.server}: {e}")
+        sys.exit(1)
+
+    campaign = args.status or args.campaign
+    if not args.status:
+        scenarios = [s["name"] for s in list_scenarios()] if args.all else args.scenarios
+        if not scenarios:
+            parser.print_usage()
+            sys.exit(1)
+        for name in scenarios:
+            response = session.post(
+                f"{args.server}/queue", data={"scenario": name, "calls": args.calls, "campaign": campaign}, timeout=10
+            )
+            response.raise_for_status()
+        print(f"[INFO] Queued {len(scenarios) * args.calls} calls as {campaign} over {len(lines['callers'])} "
+              f"caller IDs x {len(lines['targets'])} lines ({lines['strategy']}, capacity {lines['capacity']})")
+        if args.no_wait:
+            print(f"[INFO] Follow with: python run_campaign.py --status {campaign}")
+            return
+
+    while True:
+        stats = session.get(f"{args.server}/queue", params={"campaign": campaign}, timeout=10).json()
+        calls = stats["calls"]
+        if not (calls["pending"] or calls["dialing"] or calls["in_progress"]):
+            break
+        print(f"[INFO] {_progress(stats)}")
+        time.sleep(POLL_SECONDS)
+
+    print(f"\n[INFO] {campaign}: {_progress(stats)}")
+    sys.exit(1 if stats["calls"]["failed"] else 0)
+
+
+if __name__ == "__main__":
+    main()
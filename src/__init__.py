@@ -3,4 +3,10 @@ PGAI Voice Agent - core package.
 
 Provides phone system, conversation, scenario loading, recording,
 and transcript management for patient simulation and call testing.
+
+.env is loaded here, once, so module-level settings in any submodule see it.
 """
+
+from dotenv import load_dotenv
+
+load_dotenv()
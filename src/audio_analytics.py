@@ -0,0 +1,276 @@
+"""
+Offline audio analytics for call recordings: speech activity per speaker,
+response gaps, talk-over and dead air.
+
+Recordings are decoded as a stream (ffmpeg pipe for MP3, chunked reads for
+WAV) and reduced to one energy value per 20ms frame per channel, so memory
+stays proportional to frames rather than samples. Voice activity, interval
+merging and overlap detection are vectorized NumPy operations on those
+frame arrays.
+
+Calls placed by make_call are recorded dual-channel, one channel per party.
+The clinic agent speaks first on every call, so the channel with the
+earliest speech is taken as the agent unless RECORDING_AGENT_CHANNEL says
+otherwise. Mono recordings (older calls) still get dead air and pauses, but
+talk-over and per-speaker latencies need two channels.
+"""
+
+import os
+import subprocess
+import wave
+from datetime import datetime
+from typing import Any, Iterator
+
+import numpy as np
+
+from src.vad import FRAME_MS, MIN_SPEECH_DB, MIN_SPEECH_MS, SAMPLE_RATE, SPEECH_MARGIN_DB, frame_energy_db
+
+# Silence inside a speaker's run shorter than this does not split the turn
+TURN_HANGOVER_MS = int(os.getenv("AUDIO_TURN_HANGOVER_MS", "400"))
+# Shortest mutual silence reported as dead air, and shortest overlap reported as talk-over
+DEAD_AIR_MIN_MS = int(os.getenv("AUDIO_DEAD_AIR_MS", "2000"))
+TALK_OVER_MIN_MS = int(os.getenv("AUDIO_TALK_OVER_MIN_MS", "200"))
+# "auto" (first speaker is the agent), or 1/2 for a fixed channel
+RECORDING_AGENT_CHANNEL = os.getenv("RECORDING_AGENT_CHANNEL", "auto")
+
+# Frames decoded per chunk (10s); bounds peak memory for long recordings
+CHUNK_FRAMES = 500
+
+
+def _ffprobe_channels(path: str) -> int:
+    """Audio channel count of a file, via ffprobe."""
+    result = subprocess.run(
+        ["ffprobe", "-v", "error", "-select_streams", "a:0", "-show_entries", "stream=channels", "-of", "csv=p=0", path],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return int(result.stdout.strip().splitlines()[0])
+
+
+def _pcm_chunks(path: str) -> Iterator[tuple[np.ndarray, int]]:
+    """
+    Stream a recording as int16 PCM chunks of shape (samples, channels).
+
+    Yields:
+        (chunk, sample_rate). WAV is read natively; anything else is decoded
+        to 8 kHz by ffmpeg and read from its stdout pipe.
+    """
+    if path.lower().endswith(".wav"):
+        with wave.open(path, "rb") as wav:
+            if wav.getsampwidth() != 2:
+                raise ValueError(f"Only 16-bit WAV is supported: {path}")
+            channels, rate = wav.getnchannels(), wav.getframerate()
+            frame_samples = rate * FRAME_MS // 1000
+            while True:
+                data = wav.readframes(frame_samples * CHUNK_FRAMES)
+                if not data:
+                    return
+                yield np.frombuffer(data, dtype="<i2").reshape(-1, channels), rate
+    channels = _ffprobe_channels(path)
+    process = subprocess.Popen(
+        ["ffmpeg", "-v", "error", "-i", path, "-f", "s16le", "-ar", str(SAMPLE_RATE), "-ac", str(channels), "-"],
+        stdout=subprocess.PIPE,
+    )
+    chunk_bytes = (SAMPLE_RATE * FRAME_MS // 1000) * CHUNK_FRAMES * channels * 2
+    try:
+        assert process.stdout is not None
+        while True:
+            data = process.stdout.read(chunk_bytes)
+            if not data:
+                break
+            usable = len(data) - len(data) % (2 * channels)
+            yield np.frombuffer(data[:usable], dtype="<i2").reshape(-1, channels), SAMPLE_RATE
+    finally:
+        if process.stdout:
+            process.stdout.close()
+        if process.wait() != 0:
+            raise RuntimeError(f"ffmpeg failed to decode {path}")
+
+
+def channel_energies(path: str) -> np.ndarray:
+    """
+    Per-frame energy (dBFS) of every channel of a recording.
+
+    Args:
+        path: MP3/WAV recording.
+
+    Returns:
+        float array of shape (channels, frames).
+    """
+    per_chunk: list[np.ndarray] = []
+    pending: np.ndarray | None = None
+    for chunk, rate in _pcm_chunks(path):
+        frame_samples = rate * FRAME_MS // 1000
+        if pending is not None and len(pending):
+            chunk = np.concatenate([pending, chunk])
+        usable = len(chunk) - len(chunk) % frame_samples
+        pending = chunk[usable:]
+        if usable:
+            per_chunk.append(np.stack([
+                frame_energy_db(chunk[:usable, c], frame_samples) for c in range(chunk.shape[1])
+            ]))
+    if not per_chunk:
+        return np.empty((1, 0))
+    return np.concatenate(per_chunk, axis=1)
+
+
+def _runs(mask: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Start (inclusive) and end (exclusive) frame indices of True runs."""
+    edges = np.flatnonzero(np.diff(np.concatenate(([0], mask.view(np.int8), [0]))))
+    return edges[0::2], edges[1::2]
+
+
+def _to_mask(starts: np.ndarray, ends: np.ndarray, n_frames: int) -> np.ndarray:
+    """Boolean frame mask covering the given intervals."""
+    marks = np.zeros(n_frames + 1, dtype=np.int32)
+    np.add.at(marks, starts, 1)
+    np.add.at(marks, ends, -1)
+    return np.cumsum(marks[:-1]) > 0
+
+
+def speech_intervals(energy_db: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Speech intervals of one channel, in frames.
+
+    Frames louder than the channel's noise floor (10th percentile) plus
+    VAD_SPEECH_MARGIN_DB count as speech; gaps shorter than
+    AUDIO_TURN_HANGOVER_MS are bridged and runs shorter than VAD_MIN_SPEECH_MS
+    dropped.
+
+    Args:
+        energy_db: Per-frame energy of the channel.
+
+    Returns:
+        (starts, ends) frame index arrays.
+    """
+    if energy_db.size == 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    threshold = max(float(np.percentile(energy_db, 10)) + SPEECH_MARGIN_DB, MIN_SPEECH_DB)
+    starts, ends = _runs(energy_db > threshold)
+    if starts.size > 1:
+        keep_gap = (starts[1:] - ends[:-1]) >= TURN_HANGOVER_MS // FRAME_MS
+        starts = starts[np.concatenate(([True], keep_gap))]
+        ends = ends[np.concatenate((keep_gap, [True]))]
+    long_enough = (ends - starts) >= max(1, MIN_SPEECH_MS // FRAME_MS)
+    return starts[long_enough], ends[long_enough]
+
+
+def _seconds(frames: np.ndarray | int) -> Any:
+    return np.round(np.asarray(frames) * FRAME_MS / 1000.0, 2)
+
+
+def _latency_summary(gaps_ms: np.ndarray) -> dict[str, float] | None:
+    if gaps_ms.size == 0:
+        return None
+    return {
+        "count": int(gaps_ms.size),
+        "mean_ms": round(float(gaps_ms.mean()), 1),
+        "p50_ms": round(float(np.percentile(gaps_ms, 50)), 1),
+        "p90_ms": round(float(np.percentile(gaps_ms, 90)), 1),
+        "max_ms": round(float(gaps_ms.max()), 1),
+    }
+
+
+def analyze_energies(energies: np.ndarray, agent_channel: str = RECORDING_AGENT_CHANNEL) -> dict[str, Any]:
+    """
+    Compute response gaps, talk-over and dead air from per-channel energies.
+
+    Args:
+        energies: (channels, frames) array from channel_energies().
+        agent_channel: "auto" or the 1-based channel carrying the clinic agent.
+
+    Returns:
+        Analysis dict (times in seconds, latencies in ms) for the transcript.
+    """
+    n_channels, n_frames = energies.shape
+    intervals = [speech_intervals(energies[c]) for c in range(n_channels)]
+    analysis: dict[str, Any] = {
+        "analyzed_at": datetime.now().isoformat(),
+        "channels": n_channels,
+        "duration_s": float(_seconds(n_frames)),
+    }
+
+    if n_channels >= 2:
+        if agent_channel == "auto":
+            firsts = [starts[0] if starts.size else n_frames for starts, _ in intervals[:2]]
+            agent_index = int(np.argmin(firsts))
+        else:
+            agent_index = int(agent_channel) - 1
+        order = [(agent_index, "agent"), (1 - agent_index, "patient")]
+        analysis["agent_channel"] = agent_index + 1
+    else:
+        order = [(0, "unknown")]
+    masks = {label: _to_mask(*intervals[c], n_frames) for c, label in order}
+    analysis["speech_s"] = {label: float(_seconds(mask.sum())) for label, mask in masks.items()}
+
+    # Dead air: mutual silence between the first and last speech of the call
+    anyone = np.logical_or.reduce(list(masks.values()))
+    active = np.flatnonzero(anyone)
+    if active.size:
+        span = slice(active[0], active[-1] + 1)
+        silent_starts, silent_ends = _runs(~anyone[span])
+        long_enough = (silent_ends - silent_starts) >= DEAD_AIR_MIN_MS // FRAME_MS
+        silent_starts = silent_starts[long_enough] + active[0]
+        silent_ends = silent_ends[long_enough] + active[0]
+    else:
+        silent_starts = silent_ends = np.empty(0, dtype=np.int64)
+    analysis["dead_air"] = {
+        "total_s": float(_seconds((silent_ends - silent_starts).sum())),
+        "intervals": [[float(s), float(e)] for s, e in zip(_seconds(silent_starts), _seconds(silent_ends))],
+    }
+
+    # Speaker turns in time order; a gap at each speaker change (negative = they overlapped)
+    labels = np.concatenate([np.full(intervals[c][0].size, i) for i, (c, _) in enumerate(order)])
+    starts = np.concatenate([intervals[c][0] for c, _ in order])
+    ends = np.concatenate([intervals[c][1] for c, _ in order])
+    by_start = np.argsort(starts, kind="stable")
+    labels, starts, ends = labels[by_start], starts[by_start], ends[by_start]
+    names = [label for _, label in order]
+    if n_channels >= 2:
+        change = np.flatnonzero(labels[1:] != labels[:-1])
+    else:
+        change = np.arange(max(0, starts.size - 1))
+    gaps_ms = (starts[change + 1] - ends[change]) * FRAME_MS
+    analysis["response_gaps"] = [
+        {"from": names[labels[i]], "to": names[labels[i + 1]], "at_s": float(_seconds(starts[i + 1])), "gap_ms": int(gap)}
+        for i, gap in zip(change, gaps_ms)
+    ]
+
+    if n_channels >= 2:
+        to_agent = labels[change + 1] == 0
+        analysis["agent_response_latency"] = _latency_summary(gaps_ms[to_agent & (gaps_ms >= 0)])
+        analysis["patient_response_latency"] = _latency_summary(gaps_ms[~to_agent & (gaps_ms >= 0)])
+
+        # Talk-over: both channels active; whoever was silent the frame before interrupted
+        agent_mask, patient_mask = masks["agent"], masks["patient"]
+        both_starts, both_ends = _runs(agent_mask & patient_mask)
+        long_enough = (both_ends - both_starts) >= TALK_OVER_MIN_MS // FRAME_MS
+        both_starts, both_ends = both_starts[long_enough], both_ends[long_enough]
+        before = np.maximum(both_starts - 1, 0)
+        interrupter = np.where(agent_mask[before] & (both_starts > 0), "patient", "agent")
+        analysis["talk_over"] = {
+            "total_s": float(_seconds((both_ends - both_starts).sum())),
+            "count": int(both_starts.size),
+            "intervals": [
+                {"start_s": float(s), "end_s": float(e), "interrupted_by": str(who)}
+                for s, e, who in zip(_seconds(both_starts), _seconds(both_ends), interrupter)
+            ],
+        }
+    return analysis
+
+
+def analyze_recording(path: str) -> dict[str, Any]:
+    """
+    Decode and analyze one recording (safe to run in a worker process).
+
+    Args:
+        path: MP3/WAV recording.
+
+    Returns:
+        {"path", "analysis"} on success or {"path", "error"} on failure.
+    """
+    try:
+        return {"path": path, "analysis": analyze_energies(channel_energies(path))}
+    except Exception as e:
+        return {"path": path, "error": str(e)}
@@ -0,0 +1,228 @@
+"""
+Pre-rendered audio for recurring patient utterances, served to Twilio via <Play>.
+
+Gather mode speaks every patient turn with <Say>, so Twilio synthesizes the
+same short phrases ("Thank you, goodbye.", "Yes, this is Lucas.", the DOB,
+"Hello?") again on every call, and TTS start-up adds to each turn. The audio
+cache renders those phrases once with a pluggable TTS backend
+(AUDIO_TTS_BACKEND):
+
+- "none" (default): cache off, every turn uses <Say>
+- "espeak": local espeak-ng / espeak engine, WAV output, no API calls
+- "elevenlabs": ElevenLabs API (src/tts.py), MP3 output
+
+The cache changes the patient's voice mid-call: cached phrases play in the
+backend's voice, every other reply in Twilio's <Say> voice (PATIENT_VOICE).
+The clinic agent's STT may treat the two voices differently, so the cache is
+off by default and the server warns when it is on.
+
+Files live in data/audio_cache/, named by a hash of backend, voice and text;
+index.json lists what each file says. The server serves them at GET
+/audio/<file>. TwiML plays the cached file when one exists and falls back to
+<Say> otherwise. Short replies that miss the cache are rendered in the
+background, so a phrase that recurs is played from the cache next time.
+
+At server start, prewarm() renders every scenario's fixed replies (identity
+answers, closings, fallbacks). `python prerender_audio.py` does the same
+offline.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable
+
+from src.metrics import Counter
+from src.utils import get_project_root, log
+
+AUDIO_CACHE_DIR = os.path.join(get_project_root(), "data", "audio_cache")
+AUDIO_TTS_BACKEND = os.getenv("AUDIO_TTS_BACKEND", "none").lower()
+# Only replies up to this long are cached on a miss (LLM replies rarely recur verbatim)
+AUDIO_CACHE_MAX_CHARS = int(os.getenv("AUDIO_CACHE_MAX_CHARS", "60"))
+ESPEAK_VOICE = os.getenv("ESPEAK_VOICE", "en-us+m3")
+
+# Voice Twilio uses for <Say> when no cached audio exists
+PATIENT_VOICE = "Polly.Matthew-Neural"
+
+# Phrases every call may use regardless of scenario
+COMMON_PHRASES = (
+    "Hello?",
+    "Thank you, goodbye.",
+    "Okay, thank you.",
+    "Yes, that's correct.",
+)
+
+AUDIO_CACHE_LOOKUPS = Counter("pgai_audio_cache_total", "Patient utterances by audio cache outcome", ("outcome",))
+
+
+class EspeakBackend:
+    """Local espeak-ng (or espeak) engine."""
+
+    name = "espeak"
+    extension = "wav"
+
+    def __init__(self, voice: str = ESPEAK_VOICE) -> None:
+        self.voice = voice
+        self.binary = shutil.which("espeak-ng") or shutil.which("espeak")
+
+    def synthesize(self, text: str) -> bytes:
+        if not self.binary:
+            raise RuntimeError("espeak-ng/espeak not found on PATH")
+        result = subprocess.run(
+            [self.binary, "-v", self.voice, "-s", "165", "--stdout", text], capture_output=True, check=True
+        )
+        return result.stdout
+
+
+class ElevenLabsBackend:
+    """ElevenLabs API, the same voice as Media Streams mode."""
+
+    name = "elevenlabs"
+    extension = "mp3"
+
+    def __init__(self) -> None:
+        from src.tts import ELEVENLABS_VOICE_ID
+
+        self.voice = ELEVENLABS_VOICE_ID
+
+    def synthesize(self, text: str) -> bytes:
+        from src.tts import synthesize
+
+        return synthesize(text, "mp3_22050_32")
+
+
+BACKENDS = {"espeak": EspeakBackend, "elevenlabs": ElevenLabsBackend}
+
+
+def _normalize(text: str) -> str:
+    return " ".join(text.split())
+
+
+class AudioCache:
+    """Rendered utterances on disk, keyed by backend, voice and text."""
+
+    def __init__(self, backend_name: str = AUDIO_TTS_BACKEND, cache_dir: str = AUDIO_CACHE_DIR) -> None:
+        self.cache_dir = cache_dir
+        self.backend = BACKENDS[backend_name]() if backend_name in BACKENDS else None
+        if backend_name not in BACKENDS and backend_name != "none":
+            log("WARNING", f"Unknown AUDIO_TTS_BACKEND {backend_name!r}, audio cache disabled")
+        self._index_path = os.path.join(cache_dir, "index.json")
+        self._files: dict[str, str] = {}
+        self._pending: set[str] = set()
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="audio-cache")
+        if self.backend and os.path.exists(self._index_path):
+            with open(self._index_path, "r") as f:
+                index = json.load(f)
+            # Files from another backend or voice have other names and are ignored
+            self._files = {
+                text: name
+                for name, text in index.items()
+                if name == self.filename(text) and os.path.exists(os.path.join(cache_dir, name))
+            }
+
+    @property
+    def enabled(self) -> bool:
+        return self.backend is not None
+
+    def filename(self, text: str) -> str:
+        """Cache file name for an utterance with the current backend and voice."""
+        assert self.backend is not None
+        key = f"{self.backend.name}\n{self.backend.voice}\n{_normalize(text)}"
+        return f"{hashlib.sha256(key.encode()).hexdigest()[:32]}.{self.backend.extension}"
+
+    def lookup(self, text: str, render_on_miss: bool = True) -> str | None:
+        """
+        Cached file name for an utterance, or None (speak it with <Say>).
+
+        A miss on a short utterance queues it for rendering in the background.
+        """
+        if not self.enabled:
+            return None
+        text = _normalize(text)
+        name = self._files.get(text)
+        AUDIO_CACHE_LOOKUPS.inc("hit" if name else "miss")
+        if name is None and render_on_miss and len(text) <= AUDIO_CACHE_MAX_CHARS:
+            self.prewarm([text])
+        return name
+
+    def render(self, text: str) -> str | None:
+        """Render one utterance now (no-op if cached); returns the file name, None on failure."""
+        if not self.enabled:
+            return None
+        text = _normalize(text)
+        if text in self._files:
+            return self._files[text]
+        name = self.filename(text)
+        try:
+            audio = self.backend.synthesize(text)
+        except Exception as e:
+            log("WARNING", f"Could not render audio for {text!r}", str(e))
+            return None
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = os.path.join(self.cache_dir, name)
+        with open(f"{path}.tmp", "wb") as f:
+            f.write(audio)
+        os.replace(f"{path}.tmp", path)
+        with self._lock:
+            self._files[text] = name
+            index = {file: utterance for utterance, file in self._files.items()}
+            with open(f"{self._index_path}.tmp", "w") as f:
+                json.dump(index, f, indent=2)
+            os.replace(f"{self._index_path}.tmp", self._index_path)
+        return name
+
+    def prewarm(self, texts: Iterable[str]) -> int:
+        """Queue uncached utterances for background rendering; returns how many were queued."""
+        if not self.enabled:
+            return 0
+        queued = 0
+        for text in dict.fromkeys(_normalize(t) for t in texts if t):
+            with self._lock:
+                if text in self._files or text in self._pending:
+                    continue
+                self._pending.add(text)
+            self._executor.submit(self._render_pending, text)
+            queued += 1
+        return queued
+
+    def _render_pending(self, text: str) -> None:
+        try:
+            self.render(text)
+        finally:
+            with self._lock:
+                self._pending.discard(text)
+
+    def wait(self) -> None:
+        """Block until queued renders are done (offline pre-rendering)."""
+        self._executor.shutdown(wait=True)
+        self._executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="audio-cache")
+
+    def stats(self) -> dict[str, object]:
+        return {
+            "backend": self.backend.name if self.backend else "none",
+            "files": len(self._files),
+            "pending": len(self._pending),
+        }
+
+
+def scenario_phrases() -> list[str]:
+    """COMMON_PHRASES plus every scenario's fixed replies."""
+    # Imported here so the server's import of the cache stays light
+    from src.conversation import ConversationManager
+    from src.scenario_loader import all_scenarios
+
+    phrases = list(COMMON_PHRASES)
+    for scenario in all_scenarios():
+        try:
+            phrases += ConversationManager(scenario).fixed_replies()
+        except Exception as e:
+            log("WARNING", f"Skipping scenario {scenario.get('name')} for audio prewarm", str(e))
+    return list(dict.fromkeys(phrases))
+
+
+audio_cache = AudioCache()
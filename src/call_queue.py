@@ -0,0 +1,394 @@
+"""
+Durable outbound call queue with retries (SQLite, data/call_queue.db).
+
+Campaign calls are queued rather than dialed directly, so no call is lost:
+- A call that ends busy, no-answer or failed, or that Twilio refused to
+  create (dial_error), is retried with exponential backoff and jitter. The
+  backoff base depends on the failure class (RETRY_BACKOFF_SECONDS), up to
+  CALL_MAX_ATTEMPTS attempts.
+- "canceled" calls and calls out of attempts are marked failed, with every
+  attempt kept in call_attempts.
+- The queue lives on disk. At startup, recover() returns calls caught
+  mid-dial to pending, and settles calls left in progress from their
+  Twilio status.
+- A final status can reach /call-status before the dial returns its SID.
+  record_outcome() then keeps it in early_outcomes, and mark_placed()
+  settles the attempt with it right away.
+
+CallScheduler (a daemon thread in the webhook server) moves due calls onto
+free lines through dialer.dispatch_call. If the line pool is saturated, a
+call stays pending without using up an attempt. /call-status reports each
+call's outcome to record_outcome().
+"""
+
+import os
+import random
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator
+
+from src.dialer import dispatch_call
+from src.line_pool import get_line_pool
+from src.metrics import CallbackGauge, Counter
+from src.utils import get_project_root, log
+
+QUEUE_PATH = os.path.join(get_project_root(), "data", "call_queue.db")
+CALL_MAX_ATTEMPTS = int(os.getenv("CALL_MAX_ATTEMPTS", "4"))
+QUEUE_POLL_SECONDS = float(os.getenv("CALL_QUEUE_POLL_SECONDS", "2"))
+
+# Backoff base per failure class: attempt n waits base * 2**(n-1), capped, with jitter
+RETRY_BACKOFF_SECONDS = {
+    "dial_error": 15.0,
+    "failed": 30.0,
+    "busy": 60.0,
+    "no-answer": 120.0,
+    "lost": 60.0,
+}
+MAX_BACKOFF_SECONDS = 1800.0
+# Calls still "in_progress" this long after dialing are presumed lost on recovery
+STALE_CALL_SECONDS = 2 * 3600
+# Outcomes for SIDs not (yet) in the queue are kept this long for mark_placed()
+EARLY_OUTCOME_SECONDS = 3600
+
+STATUSES = ("pending", "dialing", "in_progress", "completed", "failed")
+
+CALL_OUTCOMES = Counter("pgai_call_outcomes_total", "Queued call attempts by outcome", ("outcome",))
+CALL_RETRIES = Counter("pgai_call_retries_total", "Queued calls rescheduled after a failed attempt", ("outcome",))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS calls (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    scenario TEXT NOT NULL,
+    campaign TEXT,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL,
+    next_attempt_at REAL NOT NULL,
+    call_sid TEXT,
+    last_outcome TEXT,
+    last_error TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS calls_due ON calls (status, next_attempt_at);
+CREATE INDEX IF NOT EXISTS calls_sid ON calls (call_sid);
+CREATE TABLE IF NOT EXISTS call_attempts (
+    call_id INTEGER NOT NULL REFERENCES calls (id),
+    attempt INTEGER NOT NULL,
+    call_sid TEXT,
+    outcome TEXT NOT NULL,
+    error TEXT,
+    at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS early_outcomes (
+    call_sid TEXT PRIMARY KEY,
+    outcome TEXT NOT NULL,
+    at REAL NOT NULL
+);
+"""
+
+
+def retry_delay(outcome: str, attempt: int) -> float:
+    """
+    Seconds before the next attempt after `attempt` failed with `outcome`.
+
+    Exponential backoff from the outcome's base, capped at MAX_BACKOFF_SECONDS,
+    with "equal jitter" (half fixed, half random) so retries of calls that
+    failed together spread out.
+    """
+    backoff = min(MAX_BACKOFF_SECONDS, RETRY_BACKOFF_SECONDS[outcome] * 2 ** (attempt - 1))
+    return backoff / 2 + random.uniform(0, backoff / 2)
+
+
+class CallQueue:
+    """SQLite-backed queue of outbound calls; safe across threads and processes."""
+
+    def __init__(self, path: str = QUEUE_PATH) -> None:
+        self.path = path
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        db = sqlite3.connect(path, timeout=10)
+        try:
+            # WAL lets the webhook threads read stats while the scheduler writes
+            db.execute("PRAGMA journal_mode=WAL")
+            db.executescript(_SCHEMA)
+        finally:
+            db.close()
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """One short-lived connection per operation; commits on success."""
+        db = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+        db.row_factory = sqlite3.Row
+        try:
+            db.execute("BEGIN IMMEDIATE")
+            yield db
+            db.execute("COMMIT")
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+        finally:
+            db.close()
+
+    def enqueue(self, scenario_name: str, count: int = 1, campaign: str | None = None,
+                max_attempts: int = CALL_MAX_ATTEMPTS) -> list[int]:
+        """
+        Queue calls for a scenario.
+
+        Args:
+            scenario_name: Scenario key.
+            count: Number of calls.
+            campaign: Optional label to group calls in stats().
+            max_attempts: Attempts before a call is marked failed.
+
+        Returns:
+            Queue IDs of the new calls.
+        """
+        now = time.time()
+        with self._connect() as db:
+            return [
+                db.execute(
+                    "INSERT INTO calls (scenario, campaign, max_attempts, next_attempt_at, created_at, updated_at)"
+                    " VALUES (?, ?, ?, ?, ?, ?)",
+                    (scenario_name, campaign, max_attempts, now, now, now),
+                ).lastrowid
+                for _ in range(count)
+            ]
+
+    def claim_next(self) -> sqlite3.Row | None:
+        """Mark the most overdue pending call as dialing and return it (None if nothing is due)."""
+        now = time.time()
+        with self._connect() as db:
+            row = db.execute(
+                "SELECT * FROM calls WHERE status = 'pending' AND next_attempt_at <= ?"
+                " ORDER BY next_attempt_at, id LIMIT 1",
+                (now,),
+            ).fetchone()
+            if row is not None:
+                db.execute("UPDATE calls SET status = 'dialing', updated_at = ? WHERE id = ?", (now, row["id"]))
+            return row
+
+    def unclaim(self, call_id: int) -> None:
+        """Return a claimed call to pending without using an attempt (no free line)."""
+        with self._connect() as db:
+            db.execute(
+                "UPDATE calls SET status = 'pending', updated_at = ? WHERE id = ? AND status = 'dialing'",
+                (time.time(), call_id),
+            )
+
+    def mark_placed(self, call_id: int, call_sid: str) -> str:
+        """
+        Record that an attempt was placed and is now in progress.
+
+        Returns:
+            The call's new status: "in_progress", or the settled status if
+            /call-status already reported the call's outcome.
+        """
+        with self._connect() as db:
+            db.execute(
+                "UPDATE calls SET status = 'in_progress', call_sid = ?, attempts = attempts + 1, updated_at = ?"
+                " WHERE id = ?",
+                (call_sid, time.time(), call_id),
+            )
+            early = db.execute("SELECT outcome FROM early_outcomes WHERE call_sid = ?", (call_sid,)).fetchone()
+            if early is None:
+                return "in_progress"
+            db.execute("DELETE FROM early_outcomes WHERE call_sid = ?", (call_sid,))
+            row = db.execute("SELECT * FROM calls WHERE id = ?", (call_id,)).fetchone()
+            return self._finish_attempt(db, row, early["outcome"], None, row["attempts"])
+
+    def _finish_attempt(self, db: sqlite3.Connection, row: sqlite3.Row, outcome: str, error: str | None,
+                        attempt: int) -> str:
+        """Log the attempt and move the call to completed, failed, or pending with a backoff."""
+        now = time.time()
+        db.execute(
+            "INSERT INTO call_attempts (call_id, attempt, call_sid, outcome, error, at) VALUES (?, ?, ?, ?, ?, ?)",
+            (row["id"], attempt, None if outcome == "dial_error" else row["call_sid"], outcome, error, now),
+        )
+        CALL_OUTCOMES.inc(outcome)
+        if outcome == "completed":
+            status, next_at = "completed", row["next_attempt_at"]
+        elif outcome in RETRY_BACKOFF_SECONDS and attempt < row["max_attempts"]:
+            status, next_at = "pending", now + retry_delay(outcome, attempt)
+            CALL_RETRIES.inc(outcome)
+            log("WARNING", f"Call {row['id']} ({row['scenario']}) {outcome}, retry {attempt + 1}/"
+                f"{row['max_attempts']} in {next_at - now:.0f}s", error or "")
+        else:
+            status, next_at = "failed", row["next_attempt_at"]
+            log("ERROR", f"Call {row['id']} ({row['scenario']}) failed after {attempt} attempts: {outcome}",
+                error or "")
+        db.execute(
+            "UPDATE calls SET status = ?, attempts = ?, next_attempt_at = ?, last_outcome = ?, last_error = ?,"
+            " updated_at = ? WHERE id = ?",
+            (status, attempt, next_at, outcome, error, now, row["id"]),
+        )
+        return status
+
+    def record_dial_error(self, call_id: int, error: str) -> str | None:
+        """An attempt that Twilio refused to create; returns the call's new status."""
+        with self._connect() as db:
+            row = db.execute("SELECT * FROM calls WHERE id = ?", (call_id,)).fetchone()
+            if row is None:
+                return None
+            return self._finish_attempt(db, row, "dial_error", error, row["attempts"] + 1)
+
+    def record_outcome(self, call_sid: str, outcome: str) -> str | None:
+        """
+        Settle the in-progress attempt of a call from its final Twilio status.
+
+        Args:
+            call_sid: Twilio call SID.
+            outcome: completed, busy, no-answer, failed or canceled (or "lost").
+
+        Returns:
+            The queued call's new status, or None if no queued call is in
+            progress with this SID. The outcome is then kept for
+            mark_placed(), in case the call is still being placed.
+        """
+        with self._connect() as db:
+            row = db.execute(
+                "SELECT * FROM calls WHERE call_sid = ? AND status = 'in_progress'", (call_sid,)
+            ).fetchone()
+            if row is None:
+                now = time.time()
+                db.execute("DELETE FROM early_outcomes WHERE at < ?", (now - EARLY_OUTCOME_SECONDS,))
+                db.execute(
+                    "INSERT OR REPLACE INTO early_outcomes (call_sid, outcome, at) VALUES (?, ?, ?)",
+                    (call_sid, outcome, now),
+                )
+                return None
+            return self._finish_attempt(db, row, outcome, None, row["attempts"])
+
+    def recover(self, fetch_status: Callable[[str], str | None] | None = None) -> dict[str, int]:
+        """
+        Resume after a restart.
+
+        Calls claimed but not placed go back to pending. This can redial a
+        call whose SID never reached the queue; a duplicate is safer than a
+        lost call. For calls still in progress, fetch_status(call_sid) asks
+        Twilio for the final status. A call with no answer there that is
+        older than STALE_CALL_SECONDS counts as "lost" and is retried.
+
+        Returns:
+            Counts: requeued, settled, lost.
+        """
+        now = time.time()
+        counts = {"requeued": 0, "settled": 0, "lost": 0}
+        with self._connect() as db:
+            counts["requeued"] = db.execute(
+                "UPDATE calls SET status = 'pending', updated_at = ? WHERE status = 'dialing'", (now,)
+            ).rowcount
+            in_progress = db.execute("SELECT call_sid, updated_at FROM calls WHERE status = 'in_progress'").fetchall()
+        for row in in_progress:
+            status = None
+            if fetch_status:
+                try:
+                    status = fetch_status(row["call_sid"])
+                except Exception as e:
+                    log("WARNING", f"Could not fetch status of {row['call_sid']}", str(e))
+            if status in ("completed", "canceled", *RETRY_BACKOFF_SECONDS):
+                self.record_outcome(row["call_sid"], status)
+                counts["settled"] += 1
+            elif now - row["updated_at"] > STALE_CALL_SECONDS:
+                self.record_outcome(row["call_sid"], "lost")
+                counts["lost"] += 1
+        if any(counts.values()):
+            log("INFO", "Call queue recovered", str(counts))
+        return counts
+
+    def call_sids(self, campaign: str) -> list[str]:
+        """SIDs of every call placed for a campaign, retries included (its transcripts)."""
+        with self._connect() as db:
+            rows = db.execute(
+                "SELECT call_sid FROM call_attempts WHERE call_id IN (SELECT id FROM calls WHERE campaign = ?)"
+                " AND call_sid IS NOT NULL"
+                " UNION SELECT call_sid FROM calls WHERE campaign = ? AND call_sid IS NOT NULL",
+                (campaign, campaign),
+            )
+            return [row[0] for row in rows]
+
+    def stats(self, campaign: str | None = None) -> dict[str, Any]:
+        """Calls by status and attempts by outcome (optionally for one campaign)."""
+        where, params = ("WHERE campaign = ?", (campaign,)) if campaign else ("", ())
+        with self._connect() as db:
+            by_status = dict(db.execute(f"SELECT status, COUNT(*) FROM calls {where} GROUP BY status", params))
+            by_outcome = dict(db.execute(
+                f"SELECT outcome, COUNT(*) FROM call_attempts WHERE call_id IN (SELECT id FROM calls {where})"
+                " GROUP BY outcome",
+                params,
+            ))
+            next_due = db.execute(
+                f"SELECT MIN(next_attempt_at) FROM calls {where} {'AND' if where else 'WHERE'} status = 'pending'",
+                params,
+            ).fetchone()[0]
+        return {
+            "calls": {status: by_status.get(status, 0) for status in STATUSES},
+            "attempts": by_outcome,
+            "next_due_in_s": round(max(0.0, next_due - time.time()), 1) if next_due else None,
+        }
+
+
+class CallScheduler:
+    """Background thread that dials due queued calls onto free lines."""
+
+    def __init__(self, queue: CallQueue, poll_seconds: float = QUEUE_POLL_SECONDS) -> None:
+        self.queue = queue
+        self.poll_seconds = poll_seconds
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="call-scheduler", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def dial_due(self) -> int:
+        """Dial due calls until none are due or the line pool is saturated; returns calls placed."""
+        placed = 0
+        while not self._stop.is_set():
+            row = self.queue.claim_next()
+            if row is None:
+                break
+            # Wait out the pool's dial spacing rather than a whole poll interval
+            call = dispatch_call(row["scenario"], timeout=get_line_pool().dial_interval)
+            if call is None:
+                self.queue.unclaim(row["id"])
+                break
+            if call["call_sid"] is None:
+                self.queue.record_dial_error(row["id"], call.get("error") or "call could not be placed")
+                continue
+            self.queue.mark_placed(row["id"], call["call_sid"])
+            placed += 1
+        return placed
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.poll_seconds):
+            try:
+                self.dial_due()
+            except Exception as e:
+                log("ERROR", "Call scheduler error", str(e))
+
+
+_queue: CallQueue | None = None
+_queue_lock = threading.Lock()
+
+
+def get_call_queue() -> CallQueue:
+    """Process-wide queue, opened on first use."""
+    global _queue
+    with _queue_lock:
+        if _queue is None:
+            _queue = CallQueue()
+        return _queue
+
+
+CallbackGauge(
+    "pgai_call_queue_calls",
+    "Queued calls by status",
+    lambda: {(status,): n for status, n in get_call_queue().stats()["calls"].items()} if _queue else {},
+    ("status",),
+)
@@ -0,0 +1,46 @@
+"""
+Lazily constructed API clients shared by the whole process.
+
+The OpenAI and Twilio SDKs are slow to import and their clients are only
+needed once a call is placed or a reply is generated, so CLI paths that just
+list scenarios or print transcripts never pay for them.
+"""
+
+import os
+import threading
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from openai import OpenAI
+    from twilio.rest import Client
+
+_lock = threading.Lock()
+_openai_client: "OpenAI | None" = None
+_twilio_client: "Client | None" = None
+
+
+def get_openai_client() -> "OpenAI":
+    """Return the process-wide OpenAI client, creating it on first use."""
+    global _openai_client
+    if _openai_client is None:
+        with _lock:
+            if _openai_client is None:
+                from openai import OpenAI
+
+                _openai_client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+    return _openai_client
+
+
+def get_twilio_client() -> "Client":
+    """Return the process-wide Twilio REST client, creating it on first use."""
+    global _twilio_client
+    if _twilio_client is None:
+        with _lock:
+            if _twilio_client is None:
+                from twilio.rest import Client
+
+                _twilio_client = Client(
+                    os.getenv("TWILIO_ACCOUNT_SID"),
+                    os.getenv("TWILIO_AUTH_TOKEN"),
+                )
+    return _twilio_client
@@ -6,23 +6,47 @@ Used by phone_system during live calls.
 """
 
 import os
-from typing import Any
-
-from dotenv import load_dotenv
+import threading
+import time
+from typing import Any, Mapping
 
 from src.llm_client import generate_patient_reply
+from src.metrics import FALLBACKS
+from src.model_router import router
+from src.rate_limiter import ProviderUnavailable
+from src.turn_store import TurnStore
 from src.utils import log
 
-load_dotenv()
+COMPLETION_REPLY = "No, that's all. Thank you!"
+LLM_ERROR_REPLY = "I'm sorry, could you repeat that?"
 
 
 class ConversationManager:
     """Manages patient conversation state and generation via OpenAI GPT-4.1 mini."""
 
-    def __init__(self, scenario: dict[str, Any]) -> None:
+    def __init__(
+        self, scenario: Mapping[str, Any], call_key: str = "default", turns: TurnStore | None = None
+    ) -> None:
+        # May be the read-only scenario shared by every call (scenario_loader.shared_scenario)
         self.scenario = scenario
-        self.conversation_history: list[dict[str, str]] = []
+        # Fair-queuing key for the shared LLM rate limiter (the call SID)
+        self.call_key = call_key
+        # The call's turns (shared with CallSession); the prompt history is rendered from it
+        self.turns = turns if turns is not None else TurnStore()
         self.turn_count = 0
+        self._system_prompt: str | None = None
+        # Model routing: the route of the last LLM reply served, from generate_reply
+        # or a speculative / pre-warmed draft (per turn in the transcript), and
+        # per-model totals over every LLM request
+        self.last_route: dict[str, Any] | None = None
+        self._usage: dict[str, dict[str, float]] = {}
+        self._usage_lock = threading.Lock()
+
+    def get_system_prompt(self) -> str:
+        """Return the system prompt, building it once per call."""
+        if self._system_prompt is None:
+            self._system_prompt = self.generate_system_prompt()
+        return self._system_prompt
 
     def generate_system_prompt(self) -> str:
         """
@@ -163,16 +187,44 @@ You are on a live phone call. Be direct and conversational. DO NOT use filler wo
         Generate patient response using OpenAI GPT-4.1 mini.
         Proper goal tracking: only ends when agent asks "anything else?" AND goal is complete.
         """
-        agent_lower = agent_text.lower()
+        patient_reply, from_llm, self.last_route = self.draft_reply(agent_text, confidence)
+        if from_llm:
+            self.record_turn(agent_text, patient_reply)
+            log("INFO", f"Patient will say: '{patient_reply}'")
+        return patient_reply
 
-        # Verification phase: answer identity questions directly (use scenario DOB/name when set)
+    def _identity_replies(self) -> tuple[str, str]:
+        """(name reply, date of birth reply) for the verification fast path."""
         context = self.scenario.get("patient_context", {})
         scenario_dob = context.get("dob", "02/17/2026")
         scenario_name = context.get("name") or context.get("caller_name") or "Lucas"
         dob_reply = (
             "January 1st, 1970." if scenario_dob == "1970-01-01" else "February 17th, 2026."
         )
-        name_reply = f"Yes, this is {scenario_name}."
+        return f"Yes, this is {scenario_name}.", dob_reply
+
+    def fixed_replies(self) -> list[str]:
+        """Replies this scenario gives verbatim, without the LLM (pre-rendered by the audio cache)."""
+        return [*self._identity_replies(), COMPLETION_REPLY, LLM_ERROR_REPLY]
+
+    def draft_reply(self, agent_text: str, confidence: float = 1.0) -> tuple[str, bool, dict[str, Any] | None]:
+        """
+        Compute the patient reply without touching conversation history.
+
+        Used directly by speculative generation, where the reply may be thrown
+        away if the final agent utterance differs from the partial one.
+
+        Returns:
+            (reply, from_llm, route). Only LLM replies should be recorded in
+            history; route (model, route, llm_ms) is set for LLM replies only.
+
+        Raises:
+            ProviderUnavailable: If the LLM is rate limited or its breaker is open.
+        """
+        agent_lower = agent_text.lower()
+
+        # Verification phase: answer identity questions directly (use scenario DOB/name when set)
+        name_reply, dob_reply = self._identity_replies()
         verification_phrases = [
             "speaking with",
             "date of birth",
@@ -184,9 +236,9 @@ You are on a live phone call. Be direct and conversational. DO NOT use filler wo
         verification_phase = any(p in agent_lower for p in verification_phrases)
         if verification_phase:
             if "speaking with" in agent_lower or "your name" in agent_lower or "who is this" in agent_lower:
-                return name_reply
+                return name_reply, False, None
             if "date of birth" in agent_lower or "dob" in agent_lower:
-                return dob_reply
+                return dob_reply, False, None
 
         # Completion signals: only end if agent asks "anything else?" AND goal is complete.
         # This prevents premature call termination when agent asks "anything else?" but
@@ -194,12 +246,9 @@ You are on a live phone call. Be direct and conversational. DO NOT use filler wo
         completion_signals = ["is there anything else", "anything else i can help"]
         has_completion_signal = any(signal in agent_lower for signal in completion_signals)
         if has_completion_signal:
-            history_str = " ".join(
-                entry.get("content", "") for entry in self.conversation_history
-            )
-            full_context = f"{history_str} {agent_text}"
+            full_context = f"{self.turns.prompt_text()} {agent_text}"
             if self._is_goal_completed(full_context):
-                return "No, that's all. Thank you!"
+                return COMPLETION_REPLY, False, None
 
         # Build OpenAI Chat messages: system + conversation history + latest agent turn
         user_content = f"Agent: {agent_text}"
@@ -207,24 +256,54 @@ You are on a live phone call. Be direct and conversational. DO NOT use filler wo
             user_content += "\n(Note: Agent's speech may have been unclear - respond appropriately)"
 
         messages = [
-            {"role": "system", "content": self.generate_system_prompt()},
-            *self.conversation_history,
+            {"role": "system", "content": self.get_system_prompt()},
+            *self.turns.messages(),
             {"role": "user", "content": user_content},
         ]
 
+        route = router.route(self.scenario.get("test_type", "standard"), agent_text)
+        started = time.perf_counter()
         try:
-            patient_reply = generate_patient_reply(messages)
-
-            self.conversation_history.append({"role": "user", "content": f"Agent: {agent_text}"})
-            self.conversation_history.append({"role": "assistant", "content": patient_reply})
-            self.turn_count += 1
-
-            log("INFO", f"Patient will say: '{patient_reply}'")
-            return patient_reply
-
+            reply = generate_patient_reply(messages, self.call_key, model=route.model)
+        except ProviderUnavailable:
+            raise
         except Exception as e:
+            self._record_usage(route.model, time.perf_counter() - started, ok=False)
             log("ERROR", "OpenAI generation failed", str(e))
-            return "I'm sorry, could you repeat that?"
+            FALLBACKS.inc("llm_error")
+            return LLM_ERROR_REPLY, False, None
+        elapsed = time.perf_counter() - started
+        self._record_usage(route.model, elapsed, ok=True)
+        return reply, True, {"model": route.model, "route": route.reason, "llm_ms": round(elapsed * 1000, 1)}
+
+    def _record_usage(self, model: str, elapsed: float, ok: bool) -> None:
+        with self._usage_lock:
+            usage = self._usage.setdefault(model, {"requests": 0, "errors": 0, "total_ms": 0.0})
+            usage["requests"] += 1
+            usage["errors"] += not ok
+            usage["total_ms"] += elapsed * 1000
+
+    def model_usage(self) -> dict[str, dict[str, float]]:
+        """Requests, errors and mean latency per model for this call (drafts included)."""
+        with self._usage_lock:
+            return {
+                model: {
+                    "requests": int(u["requests"]),
+                    "errors": int(u["errors"]),
+                    "mean_ms": round(u["total_ms"] / u["requests"], 1),
+                }
+                for model, u in self._usage.items()
+            }
+
+    @property
+    def conversation_history(self) -> list[dict[str, str]]:
+        """LLM prompt history (agent turns and LLM replies) as chat messages."""
+        return self.turns.messages()
+
+    def record_turn(self, agent_text: str, patient_reply: str) -> None:
+        """Add an agent/patient exchange to the LLM conversation history."""
+        self.turns.record_exchange(agent_text, patient_reply)
+        self.turn_count += 1
 
     def get_scenario_info(self) -> dict[str, Any]:
         """Return scenario metadata for transcripts."""
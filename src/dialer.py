@@ -0,0 +1,126 @@
+"""
+Outbound call placement via the Twilio REST API.
+
+Kept apart from phone_system so CLI entry points can place calls without
+importing Flask or the webhook stack. The webhook server learns about the
+call from its status callbacks.
+
+dispatch_call() places a call on a free caller ID / target line from the
+line pool (src/line_pool.py); make_call() dials one explicit pair. Both log
+failures; place_call() raises them instead.
+"""
+
+import os
+
+from src.clients import get_twilio_client
+from src.line_pool import get_line_pool
+from src.utils import log
+
+
+def place_call(
+    scenario_name: str = "appointment_scheduling",
+    from_number: str | None = None,
+    to_number: str | None = None,
+) -> str:
+    """
+    Create the outbound call with Twilio.
+
+    Args:
+        scenario_name: Scenario key from scenarios.yaml.
+        from_number: Caller ID (default: TWILIO_PHONE_NUMBER).
+        to_number: Line to dial (default: TEST_LINE_NUMBER).
+
+    Returns:
+        Call SID.
+
+    Raises:
+        ValueError: If BASE_URL is not set.
+        Exception: Whatever the Twilio client raised.
+    """
+    base_url = os.getenv("BASE_URL", "").strip().rstrip("/")
+
+    if not base_url:
+        raise ValueError("BASE_URL not set in .env")
+
+    if not base_url.startswith("https://"):
+        log("WARNING", "BASE_URL should be HTTPS for Twilio webhooks")
+
+    call = get_twilio_client().calls.create(
+        to=to_number or os.getenv("TEST_LINE_NUMBER"),
+        from_=from_number or os.getenv("TWILIO_PHONE_NUMBER"),
+        url=f"{base_url}/voice?scenario={scenario_name}",
+        record=True,
+        # One channel per party, so recordings can be analyzed per speaker
+        recording_channels="dual",
+        recording_status_callback=f"{base_url}/recording-complete",
+        # initiated/ringing let the server create and pre-warm the session while the line rings
+        status_callback=f"{base_url}/call-status?scenario={scenario_name}",
+        status_callback_event=["initiated", "ringing", "answered", "completed"],
+    )
+
+    log("SUCCESS", "Call initiated", f"SID: {call.sid} | Scenario: {scenario_name} | {call.from_} -> {call.to}")
+    return call.sid
+
+
+def _log_call_failure(error: Exception) -> None:
+    log("ERROR", "Call initiation failed", str(error))
+
+    error_str = str(error).lower()
+    if "authenticate" in error_str:
+        log("INFO", "Hint: Check TWILIO_ACCOUNT_SID and TWILIO_AUTH_TOKEN in .env")
+    elif "balance" in error_str or "insufficient" in error_str:
+        log("INFO", "Hint: Check Twilio account balance")
+    elif "not a valid phone number" in error_str:
+        log("INFO", "Hint: Phone number format should be E.164 (e.g. +1XXXXXXXXXX)")
+
+
+def make_call(
+    scenario_name: str = "appointment_scheduling",
+    from_number: str | None = None,
+    to_number: str | None = None,
+) -> str | None:
+    """
+    Initiate outbound call with specified scenario.
+
+    Args:
+        scenario_name: Scenario key from scenarios.yaml.
+        from_number: Caller ID (default: TWILIO_PHONE_NUMBER).
+        to_number: Line to dial (default: TEST_LINE_NUMBER).
+
+    Returns:
+        Call SID on success, None on failure.
+    """
+    try:
+        return place_call(scenario_name, from_number, to_number)
+    except Exception as e:
+        _log_call_failure(e)
+        return None
+
+
+def dispatch_call(scenario_name: str, timeout: float = 0.0) -> dict[str, str | None] | None:
+    """
+    Place a call on the least busy (or next, with round_robin) free line pair.
+
+    The lines stay reserved until /call-status reports the call finished.
+
+    Args:
+        scenario_name: Scenario key from scenarios.yaml.
+        timeout: Max seconds to wait for a free line pair (0 = don't wait).
+
+    Returns:
+        None if the pool is saturated. Otherwise {"call_sid", "from", "to"},
+        with call_sid None and an "error" if the call could not be placed.
+    """
+    pool = get_line_pool()
+    reservation = pool.acquire(timeout)
+    if reservation is None:
+        return None
+    token, from_number, to_number = reservation
+    try:
+        call_sid = place_call(scenario_name, from_number, to_number)
+    except Exception as e:
+        _log_call_failure(e)
+        pool.release(token, failed=True)
+        return {"call_sid": None, "from": from_number, "to": to_number, "error": str(e)}
+    pool.assign(token, call_sid)
+    return {"call_sid": call_sid, "from": from_number, "to": to_number}
@@ -0,0 +1,310 @@
+"""
+In-process dry-run engine: a simulated clinic agent talks to the patient bot.
+
+Runs whole conversations without Twilio. Each run pairs the real
+CallSession and ConversationManager with a pluggable simulated agent:
+
+- "scripted": replays the agent turns of a saved transcript
+- "rule": a deterministic receptionist that verifies identity, then follows
+  a short script for the scenario's goal (appointment, refill, reschedule,
+  cancel or general questions) and closes the call
+- "llm": a receptionist played by the chat model
+
+A turn goes through the same steps as /handle-agent-response:
+record_agent_turn, end_reason (should_end_call and is_closing_utterance),
+then generate_gpt_reply with its fallbacks. The transcript is written once
+at the end in the usual format, plus a "dry_run" block.
+
+run_batch() spreads many runs over a thread pool (default) or a process pool.
+The patient side calls the real LLM for every agent kind whenever an API key
+is set, so runs are mostly waiting on the API: threads share one rate limiter
+and circuit breaker, keeping dry runs within OPENAI_RPM / OPENAI_TPM. Each
+worker process would build its own, so the process pool gives every worker
+1/workers of the budget (share_limits). Use processes for offline runs (no
+API key), where the rule and scripted agents are CPU-bound.
+"""
+
+import os
+import time
+import uuid
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Iterator
+
+from src.llm_client import chat_completion
+from src.phone_system import CallSession, active_calls, generate_gpt_reply
+from src.rate_limiter import share_limits
+from src.transcript_manager import DRY_RUN_DIR, TranscriptManager
+from src.utils import log
+
+AGENT_KINDS = ("scripted", "rule", "llm")
+# Confidence reported for simulated agent speech (no STT involved)
+SIMULATED_CONFIDENCE = 0.95
+# Hard stop in case an agent never closes and the session never ends the call
+MAX_AGENT_TURNS = 40
+
+CLINIC = "Pivot Point Orthopedics"
+
+# Goal keyword -> agent lines after "How can I help you today?"
+RULE_SCRIPTS: dict[str, list[str]] = {
+    "refill": [
+        "Which medication do you need refilled?",
+        "And which pharmacy should we send it to?",
+        "Okay, the refill request has been sent to your pharmacy.",
+    ],
+    "reschedule": [
+        "I see your upcoming appointment. What day would work better for you?",
+        "I can move it to Thursday at 2 PM. Does that work?",
+        "Done, your appointment has been rescheduled to Thursday at 2 PM.",
+    ],
+    "cancel": [
+        "I see your upcoming appointment. Would you like me to cancel it?",
+        "Your appointment has been cancelled. There is no cancellation fee with 24 hours notice.",
+    ],
+    "appointment": [
+        "What is the reason for your visit?",
+        "Do you prefer mornings or afternoons?",
+        "I have Tuesday at 9 AM with Dr. Patel. Does that work for you?",
+        "Your appointment is scheduled for Tuesday at 9 AM with Dr. Patel.",
+    ],
+    "": [
+        "Sure, what would you like to know?",
+        "We're open Saturdays from 9 to 1, parking is in the lot behind the building, and we accept Medicare.",
+        "Do you have any other questions about those?",
+    ],
+}
+
+LLM_AGENT_PROMPT = f"""You are the AI front-desk receptionist answering the phone at {CLINIC}.
+Greet the caller, confirm their name and date of birth, then help with their request:
+scheduling, rescheduling or cancelling appointments, prescription refills, and questions
+about hours, parking and insurance. Invent plausible availability and details.
+Speak in short phone sentences (under 25 words). Ask one question at a time.
+When the request is handled, ask if there is anything else; if not, say goodbye."""
+
+
+class ScriptedAgent:
+    """Replays the agent turns of a saved transcript, ignoring the patient."""
+
+    kind = "scripted"
+
+    def __init__(self, transcript: dict[str, Any]) -> None:
+        self.turns = [t for t in transcript.get("transcript", []) if t.get("speaker") == "agent"]
+        self.index = 0
+
+    def next_turn(self, patient_text: str | None) -> tuple[str, float] | None:
+        """Next agent utterance and its recorded STT confidence, or None to hang up."""
+        if self.index >= len(self.turns):
+            return None
+        turn = self.turns[self.index]
+        self.index += 1
+        return turn.get("text", ""), float(turn.get("confidence", SIMULATED_CONFIDENCE))
+
+
+class RuleBasedAgent:
+    """Deterministic receptionist: verify identity, follow the goal script, close."""
+
+    kind = "rule"
+
+    def __init__(self, scenario: dict[str, Any]) -> None:
+        goal = (scenario.get("patient_context", {}).get("goal") or scenario.get("goal") or "").lower()
+        script = next(lines for keyword, lines in RULE_SCRIPTS.items() if keyword in goal)
+        self.lines = [
+            f"Thank you for calling {CLINIC}, this call may be recorded. Am I speaking with the patient?",
+            "Can you confirm your date of birth for me?",
+            "Thanks. How can I help you today?",
+            *script,
+            "Is there anything else I can help you with?",
+        ]
+        self.index = 0
+        self.closed = False
+
+    def next_turn(self, patient_text: str | None) -> tuple[str, float] | None:
+        """Next agent utterance, or None to hang up."""
+        if self.closed:
+            return None
+        if self.index < len(self.lines):
+            line = self.lines[self.index]
+            self.index += 1
+            return line, SIMULATED_CONFIDENCE
+        self.closed = True
+        lower = (patient_text or "").lower()
+        if "that's all" in lower or "no," in lower or "thank" in lower:
+            return "Alright, have a great day. Goodbye.", SIMULATED_CONFIDENCE
+        return "I've made a note of that for the team. Thanks for calling, have a great day. Goodbye.", SIMULATED_CONFIDENCE
+
+
+class LLMAgent:
+    """Receptionist played by the chat model (patient turns are its user messages)."""
+
+    kind = "llm"
+
+    def __init__(self, call_key: str) -> None:
+        self.call_key = call_key
+        self.messages: list[dict[str, str]] = [{"role": "system", "content": LLM_AGENT_PROMPT}]
+
+    def next_turn(self, patient_text: str | None) -> tuple[str, float] | None:
+        """Next agent utterance from the model."""
+        self.messages.append({"role": "user", "content": patient_text or "(The call connects.)"})
+        text = chat_completion(self.messages, self.call_key, temperature=0.7) or "Sorry, could you say that again?"
+        self.messages.append({"role": "assistant", "content": text})
+        return text, SIMULATED_CONFIDENCE
+
+
+def make_agent(kind: str, scenario: dict[str, Any], call_sid: str, source: dict[str, Any] | None = None) -> Any:
+    """
+    Build a simulated agent.
+
+    Args:
+        kind: "scripted", "rule" or "llm".
+        scenario: Scenario dict (rule agent picks its script from the goal).
+        call_sid: Dry-run call SID (llm agent limiter key).
+        source: Saved transcript to replay (scripted agent).
+    """
+    if kind == "scripted":
+        if not source:
+            raise ValueError("scripted agent needs a source transcript")
+        return ScriptedAgent(source)
+    if kind == "rule":
+        return RuleBasedAgent(scenario)
+    if kind == "llm":
+        return LLMAgent(call_sid)
+    raise ValueError(f"Unknown agent kind: {kind}")
+
+
+class DryRunSession(CallSession):
+    """CallSession that writes its transcript once, when the run finishes."""
+
+    def save_transcript(self) -> None:
+        pass
+
+
+def run_conversation(
+    scenario_name: str,
+    agent_kind: str = "rule",
+    source_key: str | None = None,
+    output_dir: str = DRY_RUN_DIR,
+) -> dict[str, Any]:
+    """
+    Run one simulated call to completion and save its transcript.
+
+    Args:
+        scenario_name: Scenario to load for the patient bot.
+        agent_kind: "scripted", "rule" or "llm".
+        source_key: Saved transcript to replay (scripted agent; default: scenario name).
+        output_dir: Where the transcript is written.
+
+    Returns:
+        Summary: call_sid, scenario, agent, turns, end_reason, goal_achieved,
+        elapsed_s and file (or error).
+    """
+    started = time.perf_counter()
+    call_sid = f"DR{uuid.uuid4().hex}"
+    summary: dict[str, Any] = {"call_sid": call_sid, "scenario": scenario_name, "agent": agent_kind}
+    manager = TranscriptManager()
+    manager.transcripts_dir = output_dir
+    os.makedirs(output_dir, exist_ok=True)
+
+    session = DryRunSession(call_sid, scenario_name)
+    if not session.conversation_manager:
+        return {**summary, "error": f"could not load scenario {scenario_name}"}
+    source = None
+    if agent_kind == "scripted":
+        source = TranscriptManager().load_transcript(source_key or scenario_name)
+        if source is None:
+            return {**summary, "error": f"transcript not found: {source_key or scenario_name}"}
+
+    active_calls[call_sid] = session
+    end_reason = "max_agent_turns"
+    try:
+        agent = make_agent(agent_kind, session.conversation_manager.scenario, call_sid, source)
+        patient_text: str | None = None
+        for _ in range(MAX_AGENT_TURNS):
+            turn = agent.next_turn(patient_text)
+            if turn is None:
+                end_reason = "agent_hung_up"
+                break
+            agent_text, confidence = turn
+            session.record_agent_turn(agent_text, confidence)
+            reason = session.end_reason(agent_text)
+            if reason == "agent_closing_utterance":
+                end_reason = reason
+                break
+            if reason:
+                end_reason = reason
+                session.record_patient_turn("Thank you, goodbye.")
+                break
+            patient_text = generate_gpt_reply(call_sid, agent_text, confidence) or "Thank you, goodbye."
+            session.record_patient_turn(patient_text, **(session.conversation_manager.last_route or {}))
+    except Exception as e:
+        log("ERROR", f"Dry run failed for {scenario_name}", str(e))
+        summary["error"] = str(e)
+        end_reason = "error"
+    finally:
+        active_calls.pop(call_sid, None)
+
+    elapsed = time.perf_counter() - started
+    transcript_data: dict[str, Any] = {
+        "scenario_name": scenario_name,
+        "transcript": session.transcript,
+        "turn_count": session.turn_count,
+        "status": "completed",
+        "completed_at": datetime.now().isoformat(),
+        "endpointing": session.endpointing.describe(),
+        "end_reason": end_reason,
+        "scenario_info": session.conversation_manager.get_scenario_info(),
+        "model_usage": session.conversation_manager.model_usage(),
+        "dry_run": {"agent": agent_kind, "source": source_key if source else None, "end_reason": end_reason},
+    }
+    return {
+        **summary,
+        "turns": session.turn_count,
+        "end_reason": end_reason,
+        "goal_achieved": session.goal_achieved,
+        "elapsed_s": round(elapsed, 3),
+        "file": manager.save_transcript(call_sid, transcript_data),
+    }
+
+
+def _init_worker(workers: int) -> None:
+    """Process pool initializer: this worker's share of the provider rate limits."""
+    share_limits(workers)
+
+
+def _run_job(job: tuple[str, str, str | None, str]) -> dict[str, Any]:
+    """Pool entry point (module level so it pickles)."""
+    return run_conversation(*job)
+
+
+def run_batch(
+    scenarios: list[str],
+    runs: int,
+    agent_kind: str = "rule",
+    source_key: str | None = None,
+    workers: int = os.cpu_count() or 1,
+    pool: str = "thread",
+    output_dir: str = DRY_RUN_DIR,
+) -> Iterator[dict[str, Any]]:
+    """
+    Run `runs` conversations per scenario in parallel.
+
+    Args:
+        scenarios: Scenario names.
+        runs: Conversations per scenario.
+        agent_kind: "scripted", "rule" or "llm".
+        source_key: Transcript to replay for the scripted agent (default: each scenario's name).
+        workers: Pool size.
+        pool: "thread" (one shared rate limiter) or "process" (offline runs; limits
+            split across workers).
+        output_dir: Where transcripts are written.
+
+    Yields:
+        run_conversation() summaries in job order.
+    """
+    jobs = [(name, agent_kind, source_key, output_dir) for name in scenarios for _ in range(runs)]
+    if pool == "process":
+        executor: Executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(workers,))
+        chunksize = max(1, len(jobs) // (workers * 4))
+    else:
+        executor, chunksize = ThreadPoolExecutor(max_workers=workers), 1
+    with executor:
+        yield from executor.map(_run_job, jobs, chunksize=chunksize)
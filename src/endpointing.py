@@ -0,0 +1,144 @@
+"""
+Endpointing settings for the speech Gather.
+
+Scenarios may set an `endpointing` block in YAML:
+
+    endpointing:
+      speech_timeout: adaptive   # integer seconds, "auto" (Twilio), or "adaptive"
+      timeout: 10                # seconds to wait for the agent to start talking
+      first_turn_timeout: 20     # same, for the clinic greeting
+
+"adaptive" starts at the default speech_timeout and moves it per turn: down
+after a run of cleanly captured agent turns, up after a turn that looks cut
+off mid-sentence (low STT confidence or a trailing fragment).
+"""
+
+import os
+import re
+from typing import Any
+
+from src.utils import log
+
+DEFAULT_TIMEOUT = 10
+DEFAULT_FIRST_TURN_TIMEOUT = 20
+
+# Twilio only accepts whole seconds for a numeric speech_timeout
+MIN_SPEECH_TIMEOUT = 1
+MAX_SPEECH_TIMEOUT = 5
+# Consecutive complete turns required before lowering the timeout
+COMPLETE_TURNS_TO_LOWER = 2
+
+LOW_CONFIDENCE = 0.7
+
+# Words a finished sentence rarely ends on; seeing one last means the agent was cut off.
+# Twilio ends every final SpeechResult with punctuation, so a "." says nothing; words
+# that often close a complete sentence ("do that.", "check you in.", "I think so.") are left out.
+TRAILING_FRAGMENT_WORDS = {
+    "a", "an", "and", "at", "because", "but", "by", "for", "from", "if",
+    "my", "of", "or", "the", "to", "with", "your",
+}
+
+_LAST_WORD_RE = re.compile(r"([a-z']+)\W*$")
+
+
+def looks_cut_off(text: str, confidence: float) -> bool:
+    """
+    Heuristic for an agent utterance captured before the agent finished.
+
+    Args:
+        text: Final SpeechResult.
+        confidence: STT confidence 0-1.
+
+    Returns:
+        True if the utterance looks truncated mid-sentence.
+    """
+    stripped = text.strip()
+    if not stripped or confidence < LOW_CONFIDENCE:
+        return True
+    # Questions and exclamations are finished; "." is added to fragments too
+    if stripped[-1] in "?!":
+        return False
+    match = _LAST_WORD_RE.search(stripped.lower())
+    return bool(match) and match.group(1) in TRAILING_FRAGMENT_WORDS
+
+
+def _parse_speech_timeout(value: Any) -> str | int:
+    """Normalize a YAML/env speech_timeout to "auto", "adaptive" or whole seconds."""
+    text = str(value).strip().lower()
+    if text in ("auto", "adaptive"):
+        return text
+    try:
+        return max(MIN_SPEECH_TIMEOUT, int(float(text)))
+    except ValueError:
+        raise ValueError(f"Invalid speech_timeout: {value!r}")
+
+
+def _default_speech_timeout() -> str | int:
+    """SPEECH_TIMEOUT, validated once so a bad value cannot break every call."""
+    value = os.getenv("SPEECH_TIMEOUT", "3")
+    try:
+        return _parse_speech_timeout(value)
+    except ValueError as e:
+        log("WARNING", "Invalid SPEECH_TIMEOUT, using 3", str(e))
+        return 3
+
+
+DEFAULT_SPEECH_TIMEOUT = _default_speech_timeout()
+
+
+class EndpointingController:
+    """Per-call Gather timeouts, optionally adapted from captured agent turns."""
+
+    def __init__(self, settings: dict[str, Any] | None = None) -> None:
+        settings = settings or {}
+        self.mode = _parse_speech_timeout(settings.get("speech_timeout", DEFAULT_SPEECH_TIMEOUT))
+        self.timeout = int(settings.get("timeout", DEFAULT_TIMEOUT))
+        self.first_turn_timeout = int(settings.get("first_turn_timeout", DEFAULT_FIRST_TURN_TIMEOUT))
+        if self.mode == "adaptive":
+            base = DEFAULT_SPEECH_TIMEOUT
+            self.current: str | int = base if isinstance(base, int) else 3
+        else:
+            self.current = self.mode
+        self._complete_streak = 0
+        self.adjustments = 0
+
+    @property
+    def speech_timeout(self) -> str | int:
+        """speech_timeout for the next Gather."""
+        return self.current
+
+    def gather_timeout(self, first_turn: bool = False) -> int:
+        """Seconds to wait for the agent to start speaking."""
+        return self.first_turn_timeout if first_turn else self.timeout
+
+    def observe(self, agent_text: str, confidence: float) -> None:
+        """
+        Update the timeout from a captured agent turn (adaptive mode only).
+
+        Args:
+            agent_text: Final SpeechResult.
+            confidence: STT confidence 0-1.
+        """
+        if self.mode != "adaptive":
+            return
+        if looks_cut_off(agent_text, confidence):
+            self._complete_streak = 0
+            if self.current < MAX_SPEECH_TIMEOUT:
+                self.current += 1
+                self.adjustments += 1
+            return
+        self._complete_streak += 1
+        if self._complete_streak >= COMPLETE_TURNS_TO_LOWER and self.current > MIN_SPEECH_TIMEOUT:
+            self.current -= 1
+            self.adjustments += 1
+            self._complete_streak = 0
+
+    def describe(self) -> dict[str, Any]:
+        """Return endpointing settings for transcripts."""
+        return {
+            "mode": self.mode,
+            "speech_timeout": self.current,
+            "timeout": self.timeout,
+            "first_turn_timeout": self.first_turn_timeout,
+            "adjustments": self.adjustments,
+        }
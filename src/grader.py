@@ -0,0 +1,308 @@
+"""
+Transcript grader: evaluates saved calls against their scenario specs.
+
+Each transcript is paired with its scenario (goal, description, test type,
+response stage triggers) and graded. There are two graders:
+
+- "llm": the chat model reads the spec and the call and returns a verdict
+  with defects. Requests run on a bounded thread pool and also go through
+  the shared chat rate limiter.
+- "offline": deterministic heuristics with no API calls. It checks goal
+  completion keywords, repeated agent lines, calls stuck until the turn cap,
+  and poor STT capture.
+
+Defects use the categories of docs/BUG_REPORT.md (DEFECT_TYPES). Results are
+cached in data/grades/cache.json, keyed by a hash of the graded content:
+the call's turns, the scenario spec, the grader and GRADER_VERSION. A re-run
+only grades calls, specs or rubrics that changed.
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Iterator
+
+from src.conversation import ConversationManager
+from src.llm_client import chat_completion
+from src.scenario_loader import load_scenario
+from src.utils import get_project_root, log
+
+# Bump when the rubric, prompt or heuristics change so cached grades are redone
+GRADER_VERSION = "1"
+GRADER_CONCURRENCY = int(os.getenv("GRADER_CONCURRENCY", "4"))
+CACHE_PATH = os.path.join(get_project_root(), "data", "grades", "cache.json")
+
+DEFECT_TYPES = {
+    "goal_not_completed": "The caller's request was never completed or clearly declined",
+    "state_loss": "The agent forgot or contradicted details already established in the call",
+    "repetition_loop": "The agent repeated the same line or question without progress",
+    "no_exit_path": "The call got stuck (e.g. endless checking/holding) with no outcome",
+    "identity_error": "Name/DOB misheard, misread back, or verification skipped",
+    "policy_violation": "Disclosed or requested data it should not, or acted outside policy",
+    "premature_end": "The agent ended the call before the caller was done",
+    "stt_quality": "Agent speech was captured poorly enough to disrupt the call",
+}
+SEVERITIES = ("low", "medium", "high")
+
+# Offline heuristics
+REPEAT_SIMILARITY = 0.8
+REPEAT_MIN_COUNT = 3
+TURN_CAP = 25
+POOR_CAPTURE_CONFIDENCE = 0.7
+POOR_CAPTURE_SHARE = 0.3
+
+_WORD = re.compile(r"[a-z0-9']+")
+
+GRADER_PROMPT = """You are a QA reviewer for a clinic's AI phone agent. A test bot played the
+patient following the scenario spec below; grade the AGENT's behavior in the transcript.
+
+Defect types:
+{defect_types}
+
+Reply with JSON only:
+{{"passed": true|false, "goal_completed": true|false,
+  "defects": [{{"type": "<defect type>", "severity": "low|medium|high", "turn": <turn number>, "evidence": "<short quote>"}}],
+  "summary": "<one sentence>"}}
+
+A call passes when the agent handled the scenario correctly: for standard scenarios the
+goal is completed; for edge cases the agent keeps to policy and gives the caller a clear
+outcome. Only report defects you can quote from the transcript."""
+
+
+def scenario_spec(scenario: dict[str, Any]) -> dict[str, Any]:
+    """The parts of a scenario a grade depends on."""
+    context = scenario.get("patient_context", {})
+    stages = context.get("response_stages") or {}
+    return {
+        "name": scenario.get("name"),
+        "description": scenario.get("description", ""),
+        "test_type": scenario.get("test_type", "standard"),
+        "goal": context.get("goal") or scenario.get("goal", ""),
+        "response_stages": {
+            key: stage.get("trigger", "") for key, stage in stages.items() if isinstance(stage, dict)
+        },
+    }
+
+
+def grade_key(transcript: dict[str, Any], spec: dict[str, Any], grader: str) -> str:
+    """Cache key: hash of the turns, the scenario spec, the grader and GRADER_VERSION."""
+    turns = [[t.get("speaker"), t.get("text"), t.get("confidence")] for t in transcript.get("transcript", [])]
+    payload = json.dumps([GRADER_VERSION, grader, spec, turns], sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def _words(text: str) -> set[str]:
+    return set(_WORD.findall(text.lower()))
+
+
+def grade_offline(transcript: dict[str, Any], scenario: dict[str, Any]) -> dict[str, Any]:
+    """
+    Heuristic grade with no API calls.
+
+    Args:
+        transcript: Saved transcript.
+        scenario: Scenario dict from load_scenario.
+
+    Returns:
+        Grade dict (passed, goal_completed, defects, summary).
+    """
+    turns = transcript.get("transcript", [])
+    agent_turns = [t for t in turns if t.get("speaker") == "agent"]
+    defects: list[dict[str, Any]] = []
+
+    agent_text = " ".join(t.get("text", "") for t in agent_turns)
+    goal_completed = ConversationManager(scenario)._is_goal_completed(agent_text)
+    if not goal_completed and scenario.get("test_type", "standard") == "standard":
+        defects.append({"type": "goal_not_completed", "severity": "high", "turn": None, "evidence": ""})
+
+    # Near-identical agent lines (word-set Jaccard) repeated REPEAT_MIN_COUNT+ times
+    word_sets = [_words(t.get("text", "")) for t in agent_turns]
+    reported: set[int] = set()
+    for i, words in enumerate(word_sets):
+        if i in reported or len(words) < 4:
+            continue
+        similar = [
+            j for j in range(i, len(word_sets))
+            if word_sets[j] and len(words & word_sets[j]) / len(words | word_sets[j]) >= REPEAT_SIMILARITY
+        ]
+        if len(similar) >= REPEAT_MIN_COUNT:
+            reported.update(similar)
+            defects.append({
+                "type": "repetition_loop",
+                "severity": "medium",
+                "turn": agent_turns[i].get("turn"),
+                "evidence": f"{len(similar)}x: {agent_turns[i].get('text', '')[:80]}",
+            })
+
+    if transcript.get("turn_count", len(turns)) >= TURN_CAP and not goal_completed:
+        defects.append({
+            "type": "no_exit_path",
+            "severity": "high",
+            "turn": turns[-1].get("turn") if turns else None,
+            "evidence": f"call ran to the {TURN_CAP}-turn cap without an outcome",
+        })
+
+    confidences = [t["confidence"] for t in agent_turns if t.get("confidence") is not None]
+    poor = sum(1 for c in confidences if c < POOR_CAPTURE_CONFIDENCE)
+    if confidences and poor / len(confidences) > POOR_CAPTURE_SHARE:
+        defects.append({
+            "type": "stt_quality",
+            "severity": "low",
+            "turn": None,
+            "evidence": f"{poor}/{len(confidences)} agent turns below {POOR_CAPTURE_CONFIDENCE} confidence",
+        })
+
+    passed = not any(d["severity"] == "high" for d in defects)
+    return {
+        "passed": passed,
+        "goal_completed": goal_completed,
+        "defects": defects,
+        "summary": "no blocking defects" if passed else ", ".join(d["type"] for d in defects if d["severity"] == "high"),
+    }
+
+
+def grade_llm(transcript: dict[str, Any], scenario: dict[str, Any], call_key: str = "grader") -> dict[str, Any]:
+    """
+    Grade with the chat model.
+
+    Args:
+        transcript: Saved transcript.
+        scenario: Scenario dict from load_scenario.
+        call_key: Rate limiter key.
+
+    Returns:
+        Grade dict (passed, goal_completed, defects, summary).
+
+    Raises:
+        ValueError: If the reply is not valid grade JSON.
+    """
+    spec = scenario_spec(scenario)
+    lines = [
+        f"[{t.get('turn', i)}] {t.get('speaker', 'unknown').upper()}: {t.get('text', '')}"
+        for i, t in enumerate(transcript.get("transcript", []))
+    ]
+    messages = [
+        {
+            "role": "system",
+            "content": GRADER_PROMPT.format(
+                defect_types="\n".join(f"- {name}: {text}" for name, text in DEFECT_TYPES.items())
+            ),
+        },
+        {
+            "role": "user",
+            "content": f"SCENARIO SPEC:\n{json.dumps(spec, indent=2)}\n\nTRANSCRIPT:\n" + "\n".join(lines),
+        },
+    ]
+    reply = chat_completion(messages, call_key, temperature=0.0)
+    match = re.search(r"\{.*\}", reply, re.DOTALL)
+    if not match:
+        raise ValueError(f"Grader reply is not JSON: {reply[:120]!r}")
+    grade = json.loads(match.group(0))
+    if not isinstance(grade.get("passed"), bool):
+        raise ValueError("Grader reply has no boolean 'passed'")
+    grade["defects"] = [
+        {
+            "type": d.get("type") if d.get("type") in DEFECT_TYPES else "other",
+            "severity": d.get("severity") if d.get("severity") in SEVERITIES else "medium",
+            "turn": d.get("turn"),
+            "evidence": str(d.get("evidence", ""))[:200],
+        }
+        for d in grade.get("defects", []) if isinstance(d, dict)
+    ]
+    grade.setdefault("goal_completed", None)
+    grade.setdefault("summary", "")
+    return grade
+
+
+class GradeCache:
+    """JSON file of grades by grade_key(), shared by the grading threads."""
+
+    def __init__(self, path: str = CACHE_PATH) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self._entries: dict[str, dict[str, Any]] = {}
+        if os.path.exists(path):
+            with open(path, "r") as f:
+                self._entries = json.load(f)
+
+    def get(self, key: str) -> dict[str, Any] | None:
+        with self._lock:
+            return self._entries.get(key)
+
+    def put(self, key: str, grade: dict[str, Any]) -> None:
+        with self._lock:
+            self._entries[key] = grade
+
+    def save(self) -> None:
+        """Write the cache atomically."""
+        with self._lock:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp = f"{self.path}.tmp"
+            with open(tmp, "w") as f:
+                json.dump(self._entries, f)
+            os.replace(tmp, self.path)
+
+
+def grade_transcripts(
+    transcripts: dict[str, dict[str, Any]],
+    grader: str = "llm",
+    workers: int = GRADER_CONCURRENCY,
+    cache: GradeCache | None = None,
+    refresh: bool = False,
+) -> Iterator[dict[str, Any]]:
+    """
+    Grade many transcripts with bounded concurrency, skipping cached results.
+
+    Args:
+        transcripts: Saved transcripts by key.
+        grader: "llm" or "offline".
+        workers: Maximum grading requests in flight.
+        cache: Result cache (None disables caching).
+        refresh: Re-grade everything, still storing the new grades in the cache.
+
+    Yields:
+        One row per transcript: key, scenario, cached, and the grade fields
+        (or error). Cached rows are yielded first.
+    """
+    scenarios: dict[str, dict[str, Any] | None] = {}
+    pending: list[tuple[str, dict[str, Any], dict[str, Any], str]] = []
+    for key, transcript in transcripts.items():
+        name = transcript.get("scenario_name", "unknown")
+        if name not in scenarios:
+            try:
+                scenarios[name] = load_scenario(name)
+            except Exception as e:
+                log("WARNING", f"Cannot grade scenario {name}", str(e))
+                scenarios[name] = None
+        scenario = scenarios[name]
+        if scenario is None:
+            yield {"key": key, "scenario": name, "cached": False, "error": "scenario not found"}
+            continue
+        cache_key = grade_key(transcript, scenario_spec(scenario), grader)
+        cached = cache.get(cache_key) if cache and not refresh else None
+        if cached is not None:
+            yield {"key": key, "scenario": name, "cached": True, **cached}
+            continue
+        pending.append((key, transcript, scenario, cache_key))
+
+    def run(job: tuple[str, dict[str, Any], dict[str, Any], str]) -> dict[str, Any]:
+        key, transcript, scenario, cache_key = job
+        row = {"key": key, "scenario": scenario["name"], "cached": False}
+        try:
+            if grader == "offline":
+                grade = grade_offline(transcript, scenario)
+            else:
+                grade = grade_llm(transcript, scenario, call_key=f"grade-{key}")
+        except Exception as e:
+            return {**row, "error": str(e)}
+        grade["graded_at"] = datetime.now().isoformat()
+        if cache:
+            cache.put(cache_key, grade)
+        return {**row, **grade}
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        yield from executor.map(run, pending)
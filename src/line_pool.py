@@ -0,0 +1,340 @@
+"""
+Outbound line pool: caller IDs and target lines shared by concurrent calls.
+
+Every outbound call uses one caller number (from TWILIO_PHONE_NUMBERS, or the
+single TWILIO_PHONE_NUMBER) and one target line (from TEST_LINE_NUMBERS, or
+TEST_LINE_NUMBER). Each number can carry at most `max_concurrent` calls at a
+time. The limit comes from LINE_MAX_CONCURRENT, or per number with the
+"number:limit" syntax, e.g. "+15550001111:3,+15550002222". After a call ends
+the number rests for LINE_COOLDOWN_SECONDS (longer after busy/no-answer/
+failed), so a line is not redialed while it is still resetting.
+
+acquire() picks a free caller and target by DIAL_STRATEGY:
+- "least_busy" (default): lowest active/limit, longest idle first
+- "round_robin": next free number in configured order
+
+New dials are spaced to stay within DIAL_CPS calls per second.
+
+The webhook server keeps utilization current from /call-status callbacks
+(observe()). Calls placed by another process, such as test_call.py, are
+counted too, as long as their From/To numbers are in the pool. Utilization
+is served at GET /lines and as gauges on GET /metrics.
+"""
+
+import itertools
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any
+
+from src.metrics import CallbackGauge
+
+LINE_MAX_CONCURRENT = int(os.getenv("LINE_MAX_CONCURRENT", "1"))
+LINE_COOLDOWN_SECONDS = float(os.getenv("LINE_COOLDOWN_SECONDS", "5"))
+DIAL_STRATEGY = os.getenv("DIAL_STRATEGY", "least_busy")
+DIAL_CPS = float(os.getenv("DIAL_CPS", "1"))
+DEFAULT_TEST_LINE = "805-439-8008"
+
+DIAL_STRATEGIES = ("least_busy", "round_robin")
+# Twilio call statuses
+ACTIVE_STATUSES = ("queued", "initiated", "ringing", "in-progress")
+FAILED_STATUSES = ("busy", "no-answer", "failed")
+TERMINAL_STATUSES = ("completed", "canceled", *FAILED_STATUSES)
+# Cooldown multiplier after a call that never connected
+FAILURE_COOLDOWN_FACTOR = 3.0
+# Call SIDs remembered after release, for a terminal /call-status that beats assign()
+RELEASED_SIDS_KEPT = 1024
+# Reservation tokens stand in for a call SID until place_call returns
+_TOKEN_PREFIX = "pending-"
+
+
+class Line:
+    """One phone number in the pool and the calls it is carrying."""
+
+    def __init__(self, number: str, role: str, max_concurrent: int = LINE_MAX_CONCURRENT) -> None:
+        self.number = number
+        self.role = role
+        self.max_concurrent = max(1, max_concurrent)
+        self.active: set[str] = set()
+        self.cooldown_until = 0.0
+        self.last_released = 0.0
+        self.placed = 0
+        self.completed = 0
+        self.failed = 0
+
+    def available(self, now: float) -> bool:
+        return len(self.active) < self.max_concurrent and now >= self.cooldown_until
+
+    def load(self) -> float:
+        return len(self.active) / self.max_concurrent
+
+    def stats(self, now: float) -> dict[str, Any]:
+        return {
+            "number": self.number,
+            "active": len(self.active),
+            "max_concurrent": self.max_concurrent,
+            "utilization": round(self.load(), 3),
+            "cooldown_s": round(max(0.0, self.cooldown_until - now), 1),
+            "placed": self.placed,
+            "completed": self.completed,
+            "failed": self.failed,
+        }
+
+
+def parse_numbers(value: str, default_limit: int = LINE_MAX_CONCURRENT) -> list[tuple[str, int]]:
+    """
+    Parse "number[:limit],..." into (number, max_concurrent) pairs.
+
+    Raises:
+        ValueError: If a limit is not a positive integer.
+    """
+    numbers = []
+    for item in value.split(","):
+        item = item.strip()
+        if not item:
+            continue
+        number, _, limit = item.partition(":")
+        if limit and not (limit.isdigit() and int(limit) > 0):
+            raise ValueError(f"Invalid concurrency limit in {item!r}")
+        numbers.append((number.strip(), int(limit) if limit else default_limit))
+    return numbers
+
+
+def _normalize(number: str) -> str:
+    """Digits only, last 10 (so "805-439-8008" matches Twilio's "+18054398008")."""
+    return "".join(c for c in number if c.isdigit())[-10:]
+
+
+class LinePool:
+    """Caller and target numbers with per-number concurrency limits and cooldowns."""
+
+    def __init__(
+        self,
+        callers: list[tuple[str, int]],
+        targets: list[tuple[str, int]],
+        strategy: str = DIAL_STRATEGY,
+        cooldown_seconds: float = LINE_COOLDOWN_SECONDS,
+        calls_per_second: float = DIAL_CPS,
+    ) -> None:
+        if strategy not in DIAL_STRATEGIES:
+            raise ValueError(f"DIAL_STRATEGY must be one of {', '.join(DIAL_STRATEGIES)}, got {strategy!r}")
+        self.callers = [Line(number, "caller", limit) for number, limit in callers]
+        self.targets = [Line(number, "target", limit) for number, limit in targets]
+        self.strategy = strategy
+        self.cooldown_seconds = cooldown_seconds
+        self.dial_interval = 1.0 / calls_per_second if calls_per_second > 0 else 0.0
+        self._next_dial_at = 0.0
+        self._cursor = {"caller": 0, "target": 0}
+        self._calls: dict[str, tuple[Line, Line]] = {}
+        # Recently released SIDs -> (failed, lines were counted and cooled down)
+        self._released: OrderedDict[str, tuple[bool, bool]] = OrderedDict()
+        self._tokens = itertools.count(1)
+        self._cond = threading.Condition()
+        self.saturated = 0
+
+    @classmethod
+    def from_env(cls) -> "LinePool":
+        """Pool configured from TWILIO_PHONE_NUMBERS / TEST_LINE_NUMBERS (or the single-number settings)."""
+        callers = os.getenv("TWILIO_PHONE_NUMBERS") or os.getenv("TWILIO_PHONE_NUMBER", "")
+        targets = os.getenv("TEST_LINE_NUMBERS") or os.getenv("TEST_LINE_NUMBER", DEFAULT_TEST_LINE)
+        return cls(parse_numbers(callers), parse_numbers(targets))
+
+    def _pick(self, lines: list[Line], now: float) -> int | None:
+        """Index of the line to use next, or None if every line is busy or cooling down."""
+        free = [i for i, line in enumerate(lines) if line.available(now)]
+        if not free:
+            return None
+        if self.strategy == "least_busy":
+            return min(free, key=lambda i: (lines[i].load(), lines[i].last_released))
+        start = self._cursor[lines[0].role]
+        return min(free, key=lambda i: (i - start) % len(lines))
+
+    def _find(self, lines: list[Line], number: str) -> Line | None:
+        wanted = _normalize(number)
+        return next((line for line in lines if _normalize(line.number) == wanted), None) if wanted else None
+
+    def _wait_hint(self, now: float) -> float:
+        """Seconds until a cooldown or the dial spacing ends (release() wakes waiters for busy lines)."""
+        waits = [
+            until - now
+            for until in (self._next_dial_at, *(line.cooldown_until for line in self.callers + self.targets))
+            if until > now
+        ]
+        return max(0.05, min(waits)) if waits else 1.0
+
+    def acquire(self, timeout: float = 0.0) -> tuple[str, str, str] | None:
+        """
+        Reserve a caller and a target line for one new call.
+
+        Args:
+            timeout: Max seconds to wait for a free pair and dial slot (0 = don't wait).
+
+        Returns:
+            (reservation token, caller number, target number), or None if the
+            pool stays saturated. Pass the token to assign() once the call has
+            a SID, or to release() if placing it failed.
+        """
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                caller_index = self._pick(self.callers, now)
+                target_index = self._pick(self.targets, now)
+                if caller_index is not None and target_index is not None and now >= self._next_dial_at:
+                    caller, target = self.callers[caller_index], self.targets[target_index]
+                    self._cursor["caller"] = (caller_index + 1) % len(self.callers)
+                    self._cursor["target"] = (target_index + 1) % len(self.targets)
+                    token = f"{_TOKEN_PREFIX}{next(self._tokens)}"
+                    for line in (caller, target):
+                        line.active.add(token)
+                        line.placed += 1
+                    self._calls[token] = (caller, target)
+                    self._next_dial_at = now + self.dial_interval
+                    return token, caller.number, target.number
+                remaining = deadline - now
+                if remaining <= 0:
+                    self.saturated += 1
+                    return None
+                self._cond.wait(min(remaining, self._wait_hint(now)))
+
+    def assign(self, token: str, call_sid: str) -> None:
+        """
+        Re-key a reservation to the call SID Twilio returned.
+
+        If /call-status already reported the call finished (the callback can
+        arrive before place_call returns), the reservation is released instead.
+        """
+        with self._cond:
+            lines = self._calls.pop(token, None)
+            if lines is None:
+                return
+            released = self._released.pop(call_sid, None)
+            if released is not None:
+                failed, counted = released
+                if counted:
+                    # Registered from From/To and already released: drop the duplicate reservation
+                    for line in lines:
+                        line.active.discard(token)
+                        line.placed -= 1
+                    self._cond.notify_all()
+                else:
+                    self._free(lines, token, failed)
+                return
+            # /call-status may have registered the call from its From/To already
+            known = call_sid in self._calls
+            for line in lines:
+                line.active.discard(token)
+                line.active.add(call_sid)
+                line.placed -= known
+            self._calls[call_sid] = self._calls.get(call_sid, lines)
+
+    def _free(self, lines: tuple[Line, Line], key: str, failed: bool) -> None:
+        """Remove a call from its lines and start their cooldown (caller holds the lock)."""
+        now = time.monotonic()
+        cooldown = self.cooldown_seconds * (FAILURE_COOLDOWN_FACTOR if failed else 1.0)
+        for line in lines:
+            line.active.discard(key)
+            line.last_released = now
+            line.cooldown_until = max(line.cooldown_until, now + cooldown)
+            if failed:
+                line.failed += 1
+            else:
+                line.completed += 1
+        self._cond.notify_all()
+
+    def release(self, key: str, failed: bool = False) -> None:
+        """
+        Free a call's lines and start their cooldown.
+
+        Args:
+            key: Call SID or reservation token.
+            failed: The call never connected (longer cooldown).
+        """
+        with self._cond:
+            lines = self._calls.pop(key, None)
+            if not key.startswith(_TOKEN_PREFIX):
+                self._released[key] = (failed, lines is not None)
+                while len(self._released) > RELEASED_SIDS_KEPT:
+                    self._released.popitem(last=False)
+            if lines is not None:
+                self._free(lines, key, failed)
+
+    def observe(self, call_sid: str, status: str, from_number: str = "", to_number: str = "") -> None:
+        """
+        Update utilization from a /call-status callback.
+
+        Active statuses register calls placed outside this pool (another
+        process, same numbers); terminal statuses release the call.
+        """
+        if status in TERMINAL_STATUSES:
+            self.release(call_sid, failed=status in FAILED_STATUSES)
+            return
+        if status not in ACTIVE_STATUSES:
+            return
+        with self._cond:
+            # A late active status for a call that already ended must not reserve its lines again
+            if call_sid in self._calls or call_sid in self._released:
+                return
+            caller = self._find(self.callers, from_number)
+            target = self._find(self.targets, to_number)
+            if caller and target:
+                for line in (caller, target):
+                    line.active.add(call_sid)
+                    line.placed += 1
+                self._calls[call_sid] = (caller, target)
+
+    def capacity(self) -> int:
+        """Most calls the pool can carry at once."""
+        return min(
+            sum(line.max_concurrent for line in self.callers),
+            sum(line.max_concurrent for line in self.targets),
+        )
+
+    def stats(self) -> dict[str, Any]:
+        """Snapshot of pool utilization."""
+        with self._cond:
+            now = time.monotonic()
+            active = len(self._calls)
+            capacity = self.capacity()
+            return {
+                "strategy": self.strategy,
+                "active_calls": active,
+                "capacity": capacity,
+                "utilization": round(active / capacity, 3) if capacity else 0.0,
+                "saturated": self.saturated,
+                "callers": [line.stats(now) for line in self.callers],
+                "targets": [line.stats(now) for line in self.targets],
+            }
+
+
+_pool: LinePool | None = None
+_pool_lock = threading.Lock()
+
+
+def get_line_pool() -> LinePool:
+    """Process-wide pool, built from the environment on first use."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = LinePool.from_env()
+        return _pool
+
+
+def _line_gauge(field: str) -> dict[tuple[str, ...], float]:
+    stats = get_line_pool().stats()
+    return {
+        (line["number"], role[:-1]): line[field]
+        for role in ("callers", "targets")
+        for line in stats[role]
+    }
+
+
+# Same state as GET /lines, exposed on GET /metrics
+CallbackGauge(
+    "pgai_line_active_calls", "Calls in progress per pool number", lambda: _line_gauge("active"), ("number", "role")
+)
+CallbackGauge(
+    "pgai_line_utilization", "Active calls / concurrency limit per pool number",
+    lambda: _line_gauge("utilization"), ("number", "role"),
+)
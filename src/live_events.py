@@ -0,0 +1,142 @@
+"""
+In-memory event bus for the live call monitor (GET /live, server-sent events).
+
+Call sessions publish an event for every recorded turn (with per-turn
+latency and model), every end reason decided, and every Twilio status
+callback. Each subscriber (one open /live stream) has its own bounded
+buffer of LIVE_BUFFER_EVENTS events:
+- publish() never blocks. It appends to each matching subscriber's buffer
+  and returns, so the webhook path does not wait on slow consumers.
+- When a buffer is full, the oldest event is dropped and counted. The
+  subscriber then receives a "dropped" event with the count, so a viewer
+  knows it missed something.
+- With no subscribers, publish() returns right away.
+
+Subscribers can filter by call SID and/or scenario. Nothing is persisted:
+only events published while a stream is open reach it.
+"""
+
+import json
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Iterator
+
+from src.metrics import CallbackGauge, Counter
+
+LIVE_BUFFER_EVENTS = int(os.getenv("LIVE_BUFFER_EVENTS", "256"))
+# Seconds between keep-alive comments on an idle stream (proxies close silent connections)
+HEARTBEAT_SECONDS = 15.0
+
+LIVE_EVENTS_DROPPED = Counter("pgai_live_events_dropped_total", "Live monitor events dropped for slow subscribers")
+
+
+class Subscriber:
+    """One consumer's filter and bounded event buffer."""
+
+    def __init__(
+        self, call_sids: set[str] | None = None, scenarios: set[str] | None = None, size: int = LIVE_BUFFER_EVENTS
+    ) -> None:
+        self.call_sids = call_sids or None
+        self.scenarios = scenarios or None
+        self._events: deque[dict[str, Any]] = deque(maxlen=size)
+        self._ready = threading.Condition()
+        self.dropped = 0
+        self.closed = False
+
+    def wants(self, event: dict[str, Any]) -> bool:
+        return (self.call_sids is None or event.get("call_sid") in self.call_sids) and (
+            self.scenarios is None or event.get("scenario") in self.scenarios
+        )
+
+    def push(self, event: dict[str, Any]) -> None:
+        with self._ready:
+            if len(self._events) == self._events.maxlen:
+                self.dropped += 1
+                LIVE_EVENTS_DROPPED.inc()
+            self._events.append(event)
+            self._ready.notify()
+
+    def next_events(self, timeout: float) -> list[dict[str, Any]]:
+        """Everything buffered, waiting up to timeout for the first event; a "dropped" notice leads."""
+        with self._ready:
+            if not self._events and not self.closed:
+                self._ready.wait(timeout)
+            events = list(self._events)
+            self._events.clear()
+            dropped, self.dropped = self.dropped, 0
+        if dropped:
+            events.insert(0, {"type": "dropped", "count": dropped, "ts": time.time()})
+        return events
+
+    def close(self) -> None:
+        with self._ready:
+            self.closed = True
+            self._ready.notify()
+
+
+class EventBus:
+    """Fan-out of call events to live subscribers."""
+
+    def __init__(self) -> None:
+        self._subscribers: list[Subscriber] = []
+        self._lock = threading.Lock()
+
+    def subscribe(self, call_sids: set[str] | None = None, scenarios: set[str] | None = None) -> Subscriber:
+        subscriber = Subscriber(call_sids, scenarios)
+        with self._lock:
+            self._subscribers = [*self._subscribers, subscriber]
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber) -> None:
+        subscriber.close()
+        with self._lock:
+            self._subscribers = [s for s in self._subscribers if s is not subscriber]
+
+    def publish(self, event_type: str, call_sid: str, scenario: str | None, **fields: Any) -> None:
+        """
+        Send an event to every matching subscriber without blocking.
+
+        Args:
+            event_type: "turn", "end" or "status".
+            call_sid: Call the event belongs to.
+            scenario: The call's scenario name.
+            **fields: Event payload (JSON-serializable).
+        """
+        # Copy-on-write list: reading it needs no lock
+        subscribers = self._subscribers
+        if not subscribers:
+            return
+        event = {"type": event_type, "call_sid": call_sid, "scenario": scenario, "ts": time.time(), **fields}
+        for subscriber in subscribers:
+            if subscriber.wants(event):
+                subscriber.push(event)
+
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+
+def sse_stream(
+    bus: "EventBus", subscriber: Subscriber, snapshot: dict[str, Any], heartbeat: float = HEARTBEAT_SECONDS
+) -> Iterator[str]:
+    """
+    Server-sent events for one subscriber: a snapshot of active calls, then live events.
+
+    Unsubscribes when the client disconnects (the generator is closed).
+    """
+    try:
+        yield f"event: snapshot\ndata: {json.dumps(snapshot)}\n\n"
+        while True:
+            events = subscriber.next_events(heartbeat)
+            if not events:
+                yield ": keep-alive\n\n"
+            for event in events:
+                yield f"event: {event['type']}\ndata: {json.dumps(event, default=str)}\n\n"
+    finally:
+        bus.unsubscribe(subscriber)
+
+
+live_events = EventBus()
+
+CallbackGauge("pgai_live_subscribers", "Open live monitor streams", lambda: {(): live_events.subscriber_count()})
@@ -1,28 +1,81 @@
 """
 Centralized OpenAI LLM client for patient reply generation.
 
-Uses GPT-4.1 mini for all patient bot responses. Single entry point:
-generate_patient_reply(messages) for the /handle-agent-response flow.
+Patient replies use the model picked per turn by src.model_router (GPT-4.1
+mini unless tiers are configured). Entry points:
+generate_patient_reply(messages) for the /handle-agent-response flow, and
+chat_completion(messages) for other roles (the dry-run clinic agent).
 """
 
 import os
+import time
 from typing import Any
 
-from dotenv import load_dotenv
-from openai import OpenAI
+from src.clients import get_openai_client
+from src.metrics import LLM_LATENCY, LLM_TOKENS
+from src.model_router import router
+from src.rate_limiter import get_limiter, provider_call
 
-load_dotenv()
+MODEL_NAME = os.getenv("OPENAI_MODEL", "gpt-4.1-mini")
+MAX_TOKENS = 256
 
-OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
-client = OpenAI(api_key=OPENAI_API_KEY)
 
-MODEL_NAME = os.getenv("OPENAI_MODEL", "gpt-4.1-mini")
+def chat_completion(
+    messages: list[dict[str, Any]],
+    call_key: str = "default",
+    temperature: float = 0.4,
+    model: str | None = None,
+) -> str:
+    """
+    Run one chat completion through the shared "chat" rate limiter and circuit breaker.
+
+    Raises ProviderUnavailable when the provider is unhealthy or saturated.
+    Latency and errors are reported to the model router.
+
+    Args:
+        messages: OpenAI Chat API messages.
+        call_key: Fair-queuing key for the limiter, usually the call SID.
+        temperature: Sampling temperature.
+        model: Model to use (default: MODEL_NAME).
+
+    Returns:
+        The stripped completion text (may be empty).
+    """
+    # Rough prompt size (~4 chars per token) plus the completion budget
+    model = model or MODEL_NAME
+    estimated_tokens = sum(len(str(m.get("content", ""))) for m in messages) / 4 + MAX_TOKENS
+    with provider_call("chat", call_key, estimated_tokens):
+        started = time.perf_counter()
+        try:
+            response = get_openai_client().chat.completions.create(
+                model=model,
+                messages=messages,
+                temperature=temperature,
+                max_tokens=MAX_TOKENS,
+            )
+        except Exception:
+            elapsed = time.perf_counter() - started
+            LLM_LATENCY.observe(elapsed, model, "error")
+            router.observe(model, elapsed, ok=False)
+            raise
+        elapsed = time.perf_counter() - started
+        LLM_LATENCY.observe(elapsed, model, "ok")
+        router.observe(model, elapsed, ok=True)
+    if response.usage:
+        get_limiter("chat").settle(estimated_tokens, response.usage.total_tokens)
+        LLM_TOKENS.inc(model, "prompt", amount=response.usage.prompt_tokens)
+        LLM_TOKENS.inc(model, "completion", amount=response.usage.completion_tokens)
+
+    return (response.choices[0].message.content or "").strip()
 
 
-def generate_patient_reply(messages: list[dict[str, Any]]) -> str:
+def generate_patient_reply(messages: list[dict[str, Any]], call_key: str = "default", model: str | None = None) -> str:
     """
     Generate patient reply using GPT-4.1 mini.
 
+    Goes through the shared "chat" rate limiter and circuit breaker; raises
+    ProviderUnavailable when the provider is unhealthy or saturated.
+
     messages: OpenAI Chat API format, e.g.:
       [
         {"role": "system", "content": "..."},
@@ -30,16 +83,10 @@ def generate_patient_reply(messages: list[dict[str, Any]]) -> str:
         {"role": "assistant", "content": "..."},
         ...
       ]
+    call_key: Fair-queuing key for the limiter, usually the call SID.
+    model: Model chosen by the router (default: MODEL_NAME).
     """
-    response = client.chat.completions.create(
-        model=MODEL_NAME,
-        messages=messages,
-        temperature=0.4,
-        max_tokens=256,
-    )
-
-    choice = response.choices[0]
-    text = (choice.message.content or "").strip()
+    text = chat_completion(messages, call_key, model=model)
 
     # Guard: avoid ultra-short or incomplete replies that sound unnatural.
     # Filters out empty responses, very short fragments (< 8 chars), and incomplete
@@ -48,3 +95,16 @@ def generate_patient_reply(messages: list[dict[str, Any]]) -> str:
         return "I'm sorry, could you repeat that?"
 
     return text
+
+
+def warm_up() -> None:
+    """
+    Open the HTTPS connection to the API ahead of the first reply.
+
+    The client keeps connections alive, so the first real completion skips
+    DNS, TCP and TLS setup. Failures are ignored; the reply path retries anyway.
+    """
+    try:
+        get_openai_client().models.retrieve(MODEL_NAME)
+    except Exception:
+        pass
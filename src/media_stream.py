@@ -0,0 +1,193 @@
+"""
+Bidirectional Twilio Media Streams call mode (CALL_MODE=stream).
+
+Instead of one Gather webhook per utterance, Twilio streams the call audio
+over a WebSocket. The in-process endpointer (src.vad) detects when the
+clinic agent stops talking, the utterance is transcribed, the turn is handed
+to the phone system, and the synthesized reply is streamed straight back.
+Agent speech that starts while the patient is talking clears playback
+(barge-in).
+"""
+
+import base64
+import io
+import json
+import os
+import queue
+import threading
+import time
+import wave
+from typing import Any, Callable
+
+import numpy as np
+
+from src.clients import get_openai_client
+from src.metrics import TURN_PHASE, WHISPER_JOB
+from src.rate_limiter import provider_call
+from src.tts import synthesize_ulaw
+from src.utils import log
+from src.vad import SAMPLE_RATE, Endpointer
+
+STREAM_STT_MODEL = os.getenv("STREAM_STT_MODEL", "whisper-1")
+
+# Bytes of mu-law per outbound media message (0.5s of audio)
+OUTBOUND_CHUNK_BYTES = SAMPLE_RATE // 2
+
+# Turn handler: (agent text, STT ms) -> (patient reply or None to stay silent, hang up after reply)
+TurnHandler = Callable[[str, float], tuple[str | None, bool]]
+
+
+def transcribe_utterance(samples: np.ndarray, call_key: str = "default") -> str:
+    """
+    Transcribe one agent utterance with Whisper.
+
+    Args:
+        samples: int16 PCM at 8 kHz.
+        call_key: Fair-queuing key for the shared Whisper limiter.
+
+    Returns:
+        Transcribed text (may be empty).
+    """
+    buf = io.BytesIO()
+    with wave.open(buf, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(SAMPLE_RATE)
+        wav.writeframes(samples.astype("<i2").tobytes())
+    with provider_call("whisper", call_key):
+        started = time.perf_counter()
+        try:
+            result = get_openai_client().audio.transcriptions.create(
+                model=STREAM_STT_MODEL,
+                file=("utterance.wav", buf.getvalue()),
+                language="en",
+            )
+        except Exception:
+            WHISPER_JOB.observe(time.perf_counter() - started, "stream", "error")
+            raise
+        WHISPER_JOB.observe(time.perf_counter() - started, "stream", "ok")
+    return (result.text or "").strip()
+
+
+class MediaStream:
+    """One Twilio Media Streams WebSocket connection."""
+
+    def __init__(self, ws: Any) -> None:
+        self.ws = ws
+        self.stream_sid = ""
+        self.call_sid = ""
+        self.endpointer = Endpointer()
+        self.playing = False
+        self.hangup_pending = False
+        self.barge_ins = 0
+        self._send_lock = threading.Lock()
+        self._utterances: queue.Queue = queue.Queue()
+        self._marks = 0
+
+    def _send(self, message: dict[str, Any]) -> None:
+        with self._send_lock:
+            self.ws.send(json.dumps(message))
+
+    def wait_for_start(self) -> dict[str, Any]:
+        """
+        Read messages until the "start" event.
+
+        Returns:
+            The start payload (callSid, streamSid, customParameters, ...).
+
+        Raises:
+            ConnectionError: If the stream closes before starting.
+        """
+        while True:
+            raw = self.ws.receive()
+            if raw is None:
+                raise ConnectionError("Media stream closed before start")
+            message = json.loads(raw)
+            if message.get("event") == "start":
+                self.stream_sid = message.get("streamSid") or message["start"].get("streamSid", "")
+                self.call_sid = message["start"].get("callSid", "")
+                return message["start"]
+
+    def play(self, audio: bytes) -> None:
+        """Stream mu-law audio to the caller, followed by a mark to detect playback end."""
+        for i in range(0, len(audio), OUTBOUND_CHUNK_BYTES):
+            chunk = base64.b64encode(audio[i:i + OUTBOUND_CHUNK_BYTES]).decode("ascii")
+            self._send({"event": "media", "streamSid": self.stream_sid, "media": {"payload": chunk}})
+        self._marks += 1
+        self._send({"event": "mark", "streamSid": self.stream_sid, "mark": {"name": f"reply-{self._marks}"}})
+        self.playing = True
+
+    def clear(self) -> None:
+        """Stop playback of any queued patient audio (barge-in)."""
+        self._send({"event": "clear", "streamSid": self.stream_sid})
+        self.playing = False
+
+    def run(self, on_turn: TurnHandler, on_hangup: Callable[[], None]) -> None:
+        """
+        Pump inbound audio until the stream stops.
+
+        Args:
+            on_turn: Called on the worker thread for each transcribed agent utterance.
+            on_hangup: Called once the final reply has finished playing.
+        """
+        worker = threading.Thread(target=self._turn_worker, args=(on_turn,), daemon=True)
+        worker.start()
+        try:
+            while True:
+                raw = self.ws.receive()
+                if raw is None:
+                    break
+                message = json.loads(raw)
+                event = message.get("event")
+                if event == "media":
+                    audio = base64.b64decode(message["media"]["payload"])
+                    for kind, samples in self.endpointer.feed(audio):
+                        if kind == "speech_start" and self.playing:
+                            self.barge_ins += 1
+                            log("INFO", "Barge-in: agent started talking, clearing patient audio")
+                            self.clear()
+                        elif kind == "speech_end":
+                            self._utterances.put((time.monotonic(), samples))
+                elif event == "mark":
+                    self.playing = False
+                    if self.hangup_pending:
+                        on_hangup()
+                        break
+                elif event == "stop":
+                    break
+        finally:
+            self._utterances.put(None)
+            worker.join(timeout=5)
+
+    def _turn_worker(self, on_turn: TurnHandler) -> None:
+        """Transcribe, generate and speak replies one utterance at a time."""
+        while True:
+            item = self._utterances.get()
+            if item is None:
+                return
+            ended_at, samples = item
+            try:
+                agent_text = transcribe_utterance(samples, self.call_sid)
+                stt_done = time.monotonic()
+                TURN_PHASE.observe(stt_done - ended_at, "stream", "stt")
+                if not agent_text:
+                    continue
+                log("SUCCESS", f"Agent said (stream): {agent_text}")
+                reply, hangup = on_turn(agent_text, round((stt_done - ended_at) * 1000, 1))
+                if not reply:
+                    continue
+                if self.endpointer.in_speech:
+                    log("WARNING", "Agent talking again; dropping stale patient reply")
+                    continue
+                tts_started = time.monotonic()
+                audio = synthesize_ulaw(reply)
+                TURN_PHASE.observe(time.monotonic() - tts_started, "stream", "tts")
+                self.hangup_pending = hangup
+                self.play(audio)
+                log(
+                    "INFO",
+                    f"Stream turn {(time.monotonic() - ended_at) * 1000:.0f}ms after agent stopped",
+                    f"STT {(stt_done - ended_at) * 1000:.0f}ms",
+                )
+            except Exception as e:
+                log("ERROR", "Media stream turn failed", str(e))
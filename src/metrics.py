@@ -0,0 +1,226 @@
+"""
+In-process operational metrics in the Prometheus text format.
+
+Counters and histograms are sharded per thread: each webhook thread only
+ever writes to its own shard, so recording a sample is a dict update with no
+lock and no contention. GET /metrics merges the shards when scraped. Shards
+left behind by finished threads are folded into a retired shard at scrape
+time so the per-thread dev server does not grow the shard list forever.
+
+Gauges that describe live state (active sessions, limiter buckets) are
+callbacks evaluated at scrape time instead of being updated on every change.
+"""
+
+import threading
+from bisect import bisect_left
+from typing import Callable, Iterable
+
+# Seconds; tuned for webhook turns (tens of ms) up to LLM and Whisper calls (seconds)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LabelValues = tuple[str, ...]
+
+
+class _Shard:
+    """One thread's private samples: counters and histogram bucket counts."""
+
+    __slots__ = ("thread", "counters", "histograms")
+
+    def __init__(self, thread: threading.Thread | None) -> None:
+        self.thread = thread
+        self.counters: dict[tuple[str, LabelValues], float] = {}
+        # (name, labels) -> [count per bucket..., +Inf count, sum]
+        self.histograms: dict[tuple[str, LabelValues], list[float]] = {}
+
+    def merge_into(self, other: "_Shard") -> None:
+        for key, value in self.counters.items():
+            other.counters[key] = other.counters.get(key, 0.0) + value
+        for key, cells in self.histograms.items():
+            target = other.histograms.get(key)
+            if target is None:
+                other.histograms[key] = list(cells)
+            else:
+                for i, value in enumerate(cells):
+                    target[i] += value
+
+
+_local = threading.local()
+_shards: list[_Shard] = []
+_retired = _Shard(None)
+_shards_lock = threading.Lock()
+
+
+def _shard() -> _Shard:
+    """This thread's shard (registered once per thread)."""
+    shard = getattr(_local, "shard", None)
+    if shard is None:
+        shard = _Shard(threading.current_thread())
+        _local.shard = shard
+        with _shards_lock:
+            _shards.append(shard)
+    return shard
+
+
+class _Metric:
+    """Name, help text and label names shared by all metric types."""
+
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        _registry.append(self)
+
+
+class Counter(_Metric):
+    """Monotonic counter, e.g. requests or fallbacks by reason."""
+
+    kind = "counter"
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        """Add `amount` to the series for these label values (in labelnames order)."""
+        counters = _shard().counters
+        key = (self.name, labels)
+        counters[key] = counters.get(key, 0.0) + amount
+
+
+class Histogram(_Metric):
+    """Latency/size distribution with fixed upper-bound buckets."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Iterable[str] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, *labels: str) -> None:
+        """Record one sample for these label values (in labelnames order)."""
+        histograms = _shard().histograms
+        key = (self.name, labels)
+        cells = histograms.get(key)
+        if cells is None:
+            cells = histograms[key] = [0.0] * (len(self.buckets) + 2)
+        cells[bisect_left(self.buckets, value)] += 1
+        cells[-1] += value
+
+
+class CallbackGauge(_Metric):
+    """Gauge read at scrape time: callback returns {label values: value}."""
+
+    kind = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        callback: Callable[[], dict[LabelValues, float]],
+        labelnames: Iterable[str] = (),
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.callback = callback
+
+
+_registry: list[_Metric] = []
+
+
+def _collect() -> _Shard:
+    """Merge every thread's shard; fold shards of finished threads into the retired one."""
+    merged = _Shard(None)
+    with _shards_lock:
+        alive = []
+        for shard in _shards:
+            if shard.thread is not None and shard.thread.is_alive():
+                alive.append(shard)
+            else:
+                shard.merge_into(_retired)
+        _shards[:] = alive
+        _retired.merge_into(merged)
+        # Live shards may be written concurrently; a sample landing mid-copy shows up next scrape
+        for shard in alive:
+            snapshot = _Shard(None)
+            snapshot.counters = dict(shard.counters)
+            snapshot.histograms = {key: list(cells) for key, cells in list(shard.histograms.items())}
+            snapshot.merge_into(merged)
+    return merged
+
+
+def _format_labels(names: tuple[str, ...], values: LabelValues, extra: str = "") -> str:
+    parts = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def render() -> str:
+    """
+    Render all registered metrics in the Prometheus text exposition format.
+
+    Returns:
+        Exposition text for GET /metrics.
+    """
+    samples = _collect()
+    lines: list[str] = []
+    for metric in _registry:
+        lines.append(f"# HELP {metric.name} {metric.documentation}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        if isinstance(metric, Counter):
+            for (name, labels), value in sorted(samples.counters.items()):
+                if name == metric.name:
+                    lines.append(f"{name}{_format_labels(metric.labelnames, labels)} {_format_value(value)}")
+        elif isinstance(metric, Histogram):
+            for (name, labels), cells in sorted(samples.histograms.items()):
+                if name != metric.name:
+                    continue
+                cumulative = 0.0
+                for bound, count in zip((*metric.buckets, float("inf")), cells):
+                    cumulative += count
+                    le = 'le="+Inf"' if bound == float("inf") else f'le="{bound}"'
+                    lines.append(
+                        f"{name}_bucket{_format_labels(metric.labelnames, labels, le)} {_format_value(cumulative)}"
+                    )
+                label_text = _format_labels(metric.labelnames, labels)
+                lines.append(f"{name}_sum{label_text} {_format_value(cells[-1])}")
+                lines.append(f"{name}_count{label_text} {_format_value(cumulative)}")
+        elif isinstance(metric, CallbackGauge):
+            try:
+                values = metric.callback()
+            except Exception:
+                continue
+            for labels, value in sorted(values.items()):
+                lines.append(f"{metric.name}{_format_labels(metric.labelnames, labels)} {_format_value(value)}")
+    return "\n".join(lines) + "\n"
+
+
+# Shared metrics recorded outside the webhook routes
+
+LLM_LATENCY = Histogram(
+    "pgai_llm_request_seconds", "OpenAI chat completion latency", ("model", "outcome")
+)
+LLM_TOKENS = Counter("pgai_llm_tokens_total", "OpenAI tokens used", ("model", "kind"))
+TRANSCRIPT_WRITE = Histogram(
+    "pgai_transcript_write_seconds",
+    "Time to write a transcript file",
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0),
+)
+WHISPER_JOB = Histogram(
+    "pgai_whisper_job_seconds", "Whisper transcription request duration", ("source", "outcome")
+)
+FALLBACKS = Counter("pgai_reply_fallbacks_total", "Patient replies not generated by the LLM", ("reason",))
+TURN_PHASE = Histogram("pgai_turn_phase_seconds", "Time spent in each phase of a patient turn", ("mode", "phase"))
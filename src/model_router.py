@@ -0,0 +1,181 @@
+"""
+Latency-aware model routing for patient replies.
+
+Each LLM turn is routed to one of three model tiers:
+- fast (OPENAI_FAST_MODEL): short confirmations and identity answers the
+  agent asks for ("Is that correct?", "Can you confirm your phone number?")
+- primary (OPENAI_MODEL): ordinary turns
+- strong (OPENAI_STRONG_MODEL): edge-case scenarios (test_type edge_case) and
+  long or multi-question agent turns
+
+Unset tiers default to OPENAI_MODEL, so with no extra settings every turn
+uses the one model as before.
+
+Every completion reports its latency and outcome to the router, which keeps
+a rolling ROUTER_WINDOW_SECONDS window per model. If the chosen model's p90
+latency exceeds REPLY_LATENCY_SLO_MS, or its error rate exceeds
+ROUTER_MAX_ERROR_RATE, the turn steps down to the next faster healthy tier.
+Old samples age out of the window, so a degraded model is tried again once
+it has been left alone for a while.
+"""
+
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, NamedTuple
+
+from src.metrics import CallbackGauge
+
+PRIMARY_MODEL = os.getenv("OPENAI_MODEL", "gpt-4.1-mini")
+FAST_MODEL = os.getenv("OPENAI_FAST_MODEL") or PRIMARY_MODEL
+STRONG_MODEL = os.getenv("OPENAI_STRONG_MODEL") or PRIMARY_MODEL
+REPLY_LATENCY_SLO_MS = float(os.getenv("REPLY_LATENCY_SLO_MS", "2500"))
+ROUTER_MAX_ERROR_RATE = float(os.getenv("ROUTER_MAX_ERROR_RATE", "0.25"))
+ROUTER_WINDOW_SECONDS = float(os.getenv("ROUTER_WINDOW_SECONDS", "120"))
+# Samples needed before a model can be judged degraded
+MIN_SAMPLES = 5
+
+# Tiers from slowest to fastest; fallbacks step right
+TIERS = ("strong", "primary", "fast")
+
+# Agent turns the fast model answers well: yes/no checks and single identity details
+CONFIRMATION_PHRASES = (
+    "is that correct", "is that right", "does that work", "can you confirm", "could you confirm",
+    "am i speaking with", "is this", "is your", "your date of birth", "your name", "still there",
+)
+SHORT_TURN_WORDS = 14
+COMPLEX_TURN_WORDS = 35
+
+
+class Route(NamedTuple):
+    """Model chosen for one turn and why."""
+
+    model: str
+    tier: str
+    reason: str
+
+
+class ModelHealth:
+    """Rolling latency and error samples for one model."""
+
+    def __init__(self, window_seconds: float = ROUTER_WINDOW_SECONDS) -> None:
+        self.window_seconds = window_seconds
+        self._samples: deque[tuple[float, float, bool]] = deque()
+        self._lock = threading.Lock()
+
+    def _prune(self, now: float) -> None:
+        while self._samples and now - self._samples[0][0] > self.window_seconds:
+            self._samples.popleft()
+
+    def observe(self, latency_s: float, ok: bool) -> None:
+        now = time.monotonic()
+        with self._lock:
+            self._samples.append((now, latency_s, ok))
+            self._prune(now)
+
+    def stats(self) -> dict[str, Any]:
+        """Samples, p90 latency of successful calls (ms) and error rate in the window."""
+        with self._lock:
+            self._prune(time.monotonic())
+            samples = list(self._samples)
+        latencies = sorted(latency for _, latency, ok in samples if ok)
+        p90 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.9))] * 1000 if latencies else None
+        errors = sum(1 for _, _, ok in samples if not ok)
+        return {
+            "samples": len(samples),
+            "p90_ms": round(p90, 1) if p90 is not None else None,
+            "error_rate": round(errors / len(samples), 3) if samples else 0.0,
+        }
+
+
+class ModelRouter:
+    """Picks a model tier per turn and falls back to faster tiers when one is degraded."""
+
+    def __init__(
+        self,
+        models: dict[str, str] | None = None,
+        slo_ms: float = REPLY_LATENCY_SLO_MS,
+        max_error_rate: float = ROUTER_MAX_ERROR_RATE,
+    ) -> None:
+        self.models = models or {"strong": STRONG_MODEL, "primary": PRIMARY_MODEL, "fast": FAST_MODEL}
+        self.slo_ms = slo_ms
+        self.max_error_rate = max_error_rate
+        self._health: dict[str, ModelHealth] = {}
+        self._lock = threading.Lock()
+
+    def health(self, model: str) -> ModelHealth:
+        with self._lock:
+            if model not in self._health:
+                self._health[model] = ModelHealth()
+            return self._health[model]
+
+    def observe(self, model: str, latency_s: float, ok: bool) -> None:
+        """Record one completion (called by llm_client for every request)."""
+        self.health(model).observe(latency_s, ok)
+
+    def degraded(self, model: str) -> str | None:
+        """Why a model should be avoided right now, or None if it is healthy."""
+        stats = self.health(model).stats()
+        if stats["samples"] < MIN_SAMPLES:
+            return None
+        if stats["error_rate"] > self.max_error_rate:
+            return f"error rate {stats['error_rate']:.0%}"
+        if stats["p90_ms"] is not None and stats["p90_ms"] > self.slo_ms:
+            return f"p90 {stats['p90_ms']:.0f}ms > SLO {self.slo_ms:.0f}ms"
+        return None
+
+    @staticmethod
+    def classify(test_type: str, agent_text: str) -> tuple[str, str]:
+        """(tier, reason) from the scenario type and the agent turn alone."""
+        lower = agent_text.lower()
+        words = len(lower.split())
+        if test_type == "edge_case":
+            return "strong", "edge_case"
+        if words > COMPLEX_TURN_WORDS or lower.count("?") >= 2:
+            return "strong", "complex_turn"
+        if words <= SHORT_TURN_WORDS and any(phrase in lower for phrase in CONFIRMATION_PHRASES):
+            return "fast", "confirmation"
+        return "primary", "default"
+
+    def route(self, test_type: str, agent_text: str) -> Route:
+        """
+        Model for one patient reply.
+
+        Args:
+            test_type: Scenario test_type ("standard" or "edge_case").
+            agent_text: The agent turn being answered.
+
+        Returns:
+            Route(model, tier, reason); reason notes any fallback taken.
+        """
+        tier, reason = self.classify(test_type, agent_text)
+        for candidate in TIERS[TIERS.index(tier):]:
+            model = self.models[candidate]
+            problem = self.degraded(model)
+            if problem is None:
+                return Route(model, candidate, reason)
+            reason = f"{reason}; {candidate} {model} degraded ({problem})"
+        # Everything degraded: the fastest tier is the best bet for the SLO
+        return Route(self.models["fast"], "fast", reason)
+
+    def stats(self) -> dict[str, Any]:
+        """Tier assignment and rolling health per model."""
+        return {
+            "slo_ms": self.slo_ms,
+            "tiers": dict(self.models),
+            "models": {
+                model: {**self.health(model).stats(), "degraded": self.degraded(model)}
+                for model in dict.fromkeys(self.models.values())
+            },
+        }
+
+
+router = ModelRouter()
+
+CallbackGauge(
+    "pgai_model_degraded",
+    "1 while the router avoids a model (latency SLO or error rate)",
+    lambda: {(model,): float(router.degraded(model) is not None) for model in set(router.models.values())},
+    ("model",),
+)
@@ -7,27 +7,116 @@ Sprint 3: Recording download and transcript persistence.
 """
 
 import os
+import time
 from datetime import datetime
 from typing import Any
 
-from dotenv import load_dotenv
-from flask import Flask, request
-from twilio.rest import Client
-from twilio.twiml.voice_response import VoiceResponse, Gather
+from flask import Flask, Response, g, request, send_from_directory
+from flask_sock import Sock
+from twilio.twiml.voice_response import Connect, VoiceResponse, Gather
 
+from src.audio_cache import PATIENT_VOICE, audio_cache, scenario_phrases
+from src.call_queue import CallScheduler, get_call_queue
+from src.clients import get_twilio_client
 from src.conversation import ConversationManager
+from src.dialer import dispatch_call, make_call  # noqa: F401  (make_call re-exported for callers of the old location)
+from src.endpointing import EndpointingController
+from src.line_pool import TERMINAL_STATUSES, get_line_pool
+from src.live_events import live_events, sse_stream
+from src.media_stream import MediaStream
+from src.model_router import router
+from src.metrics import CONTENT_TYPE, FALLBACKS, TURN_PHASE, CallbackGauge, Counter, Histogram, render
+from src.prewarm import PREWARM_OPENING_TURNS, CallPrewarmer
+from src.profiling import PROFILING_ENABLED, save_profile, should_profile, start_profile
+from src.rate_limiter import ProviderUnavailable, limiter_stats, provider_healthy
 from src.recording_manager import RecordingManager
-from src.scenario_loader import get_scenario_by_name
+from src.scenario_loader import prepare_scenarios, shared_scenario
+from src.speculation import SPECULATIVE_REPLIES, ReplySpeculator
+from src.stt_alignment import align_transcript
 from src.transcript_manager import TranscriptManager
-from src.utils import get_project_root, log
+from src.turn_store import AGENT, PATIENT, TurnStore
+from src.utils import bind_log_context, clear_log_context, dropped_log_records, enable_async_logging, log
+from src.webhook_dedup import DUPLICATE_WEBHOOKS, TurnResponseCache, request_key
 
-load_dotenv()
+# Webhook threads hand log records to a background writer instead of printing inline
+enable_async_logging()
 
-twilio_client = Client(
-    os.getenv("TWILIO_ACCOUNT_SID"),
-    os.getenv("TWILIO_AUTH_TOKEN"),
-)
 app = Flask(__name__)
+sock = Sock(app)
+
+
+@app.before_request
+def _bind_call_log_context() -> None:
+    """Tag every log line of a webhook request with its CallSid."""
+    call_sid = request.values.get("CallSid")
+    session = active_calls.get(call_sid) if call_sid else None
+    bind_log_context(call_sid=call_sid, scenario=session.scenario_name if session else None)
+
+
+@app.teardown_request
+def _clear_call_log_context(_: BaseException | None) -> None:
+    """Drop the request's log context so it cannot leak into the next request."""
+    clear_log_context()
+
+
+REQUEST_LATENCY = Histogram(
+    "pgai_http_request_seconds", "Webhook request latency (count = requests)", ("route", "status")
+)
+EARLY_EXITS = Counter("pgai_call_early_exits_total", "Turns where the patient ended the call", ("reason",))
+CallbackGauge("pgai_active_sessions", "Calls with an in-memory session", lambda: {(): len(active_calls)})
+CallbackGauge(
+    "pgai_session_bytes",
+    "Approximate memory held by the turns of all active calls",
+    lambda: {(): sum(session.memory_bytes() for session in list(active_calls.values()))},
+)
+CallbackGauge("pgai_log_records_dropped", "Log records dropped by the async logger", lambda: {(): dropped_log_records()})
+
+
+@app.before_request
+def _start_request_timer() -> None:
+    g.request_started = time.perf_counter()
+
+
+@app.after_request
+def _observe_request(response: Response) -> Response:
+    """Record latency per route; the Media Streams socket is a whole call, not a request."""
+    rule = request.url_rule.rule if request.url_rule else "unmatched"
+    if rule != "/media-stream" and "request_started" in g:
+        REQUEST_LATENCY.observe(time.perf_counter() - g.request_started, rule, str(response.status_code))
+    return response
+
+
+@app.before_request
+def _maybe_start_profiler() -> None:
+    """Run sampled or targeted requests under cProfile (PROFILE_* settings)."""
+    if not PROFILING_ENABLED or request.path == "/media-stream":
+        return
+    call_sid = request.values.get("CallSid")
+    session = active_calls.get(call_sid) if call_sid else None
+    scenario = session.scenario_name if session else request.values.get("scenario")
+    if should_profile(call_sid, scenario):
+        g.profile = (start_profile(), scenario, call_sid)
+
+
+@app.teardown_request
+def _save_profile(_: BaseException | None) -> None:
+    """
+    Stop the request's profiler and write it to data/profiles/ if one was started.
+
+    A teardown rather than after_request: with debug=True exceptions propagate
+    and skip after_request, which would leave cProfile enabled on the thread.
+    """
+    profile = g.pop("profile", None)
+    if profile:
+        profiler, scenario, call_sid = profile
+        rule = request.url_rule.rule if request.url_rule else "unmatched"
+        path = save_profile(profiler, rule, scenario, call_sid)
+        if path:
+            log("INFO", f"Request profile saved: {path}")
+
+
+# "gather" (one webhook per utterance) or "stream" (Media Streams WebSocket with local VAD)
+CALL_MODE = os.getenv("CALL_MODE", "gather").lower()
 
 recording_manager = RecordingManager()
 transcript_manager = TranscriptManager()
@@ -73,17 +162,39 @@ class CallSession:
     def __init__(self, call_sid: str, scenario_name: str = "appointment_scheduling") -> None:
         self.call_sid = call_sid
         self.turn_count = 0
-        self.transcript: list[dict[str, Any]] = []
+        # Every turn of the call, shared with the ConversationManager (transcript and prompt history)
+        self.turns = TurnStore()
         self.scenario_name = scenario_name
         self.goal_achieved = False
         self.conversation_manager: ConversationManager | None = None
+        self.speculator: ReplySpeculator | None = None
+        self.prewarmer: CallPrewarmer | None = None
+        # Whether the reply being generated was served from the pre-warmed drafts
+        self.last_prewarmed = False
+        # Outcome of speculation for the turn being generated: "hit", "miss" or None
+        self.last_speculation: str | None = None
+        self.endpointing = EndpointingController()
+        # Sequence number of the last Gather issued (its action URL carries it) and
+        # the TwiML of recent turns, replayed when Twilio retries a webhook
+        self.gather_seq = 0
+        self.responses = TurnResponseCache()
+        # Why the call ended (end_reason), saved in the transcript for run comparisons
+        self.closed_reason: str | None = None
 
         try:
-            scenario = get_scenario_by_name(scenario_name)
-            self.conversation_manager = ConversationManager(scenario)
+            scenario = shared_scenario(scenario_name)
+            self.conversation_manager = ConversationManager(scenario, call_key=call_sid, turns=self.turns)
             log("SUCCESS", f"Loaded scenario: {scenario_name}")
         except Exception as e:
             log("ERROR", "Failed to load scenario", str(e))
+        else:
+            try:
+                self.endpointing = EndpointingController(scenario.get("endpointing"))
+            except ValueError as e:
+                log("WARNING", "Invalid endpointing settings, using defaults", str(e))
+
+        if SPECULATIVE_REPLIES and self.conversation_manager:
+            self.speculator = ReplySpeculator(self.conversation_manager)
 
     # Minimum turns before we allow any "agent is closing" or "natural end" logic.
     # Prevents greeting phrases like "Thanks for calling" from ending the call on turn 1.
@@ -130,6 +241,59 @@ class CallSession:
 
         return False
 
+    def start_prewarm(self) -> None:
+        """Pre-generate opening-turn replies and queue this scenario's fixed replies for audio rendering."""
+        if self.conversation_manager:
+            audio_cache.prewarm(self.conversation_manager.fixed_replies())
+        if not PREWARM_OPENING_TURNS or not self.conversation_manager or self.prewarmer:
+            return
+        self.prewarmer = CallPrewarmer(self.conversation_manager)
+        self.prewarmer.start()
+
+    def record_agent_turn(self, agent_text: str, confidence: float) -> None:
+        """Append an agent turn, update endpointing, and persist the transcript."""
+        turn = self.turns.append(AGENT, agent_text, confidence, speech_timeout=self.endpointing.speech_timeout)
+        live_events.publish("turn", self.call_sid, self.scenario_name, **turn.to_dict())
+        self.endpointing.observe(agent_text, confidence)
+        self.turn_count += 1
+        self.save_transcript()
+
+    def record_patient_turn(self, patient_text: str, **extra: Any) -> None:
+        """Append a patient turn (plus per-turn metrics) and persist the transcript."""
+        turn = self.turns.append(PATIENT, patient_text, **extra)
+        live_events.publish("turn", self.call_sid, self.scenario_name, **turn.to_dict())
+        self.turn_count += 1
+        self.save_transcript()
+
+    @property
+    def transcript(self) -> list[dict[str, Any]]:
+        """Turns in the saved transcript format (rendered from the turn store)."""
+        return self.turns.to_dicts()
+
+    def memory_bytes(self) -> int:
+        """Approximate memory held by this call's turns (the scenario is shared, so not counted)."""
+        return self.turns.nbytes()
+
+    def end_reason(self, agent_text: str) -> str | None:
+        """
+        Decide whether the latest (already recorded) agent turn ends the call.
+
+        Returns:
+            "agent_closing_utterance" (patient stays silent), "goal_achieved" or
+            "max_turns_reached" (patient says goodbye), or None to keep talking.
+        """
+        # Only after MIN_TURNS_BEFORE_CLOSE: greeting phrases like "Thanks for calling" often
+        # appear in the first agent utterance and must not be treated as closing.
+        if self.turn_count >= self.MIN_TURNS_BEFORE_CLOSE and is_closing_utterance(agent_text):
+            self.closed_reason = "agent_closing_utterance"
+        # Goal achieved, max turns, etc. Also gated by min turns.
+        elif self.should_end_call(agent_text):
+            self.closed_reason = "goal_achieved" if self.goal_achieved else "max_turns_reached"
+        else:
+            return None
+        live_events.publish("end", self.call_sid, self.scenario_name, reason=self.closed_reason, turns=self.turn_count)
+        return self.closed_reason
+
     def save_transcript(self) -> None:
         """Save transcript using TranscriptManager."""
         transcript_data: dict[str, Any] = {
@@ -137,64 +301,56 @@ class CallSession:
             "transcript": self.transcript,
             "turn_count": self.turn_count,
             "status": "in_progress" if self.turn_count < 25 and not self.goal_achieved else "completed",
+            "endpointing": self.endpointing.describe(),
+            "end_reason": self.closed_reason,
         }
         if self.conversation_manager:
             transcript_data["scenario_info"] = self.conversation_manager.get_scenario_info()
+            transcript_data["model_usage"] = self.conversation_manager.model_usage()
+        if self.speculator:
+            transcript_data["speculation"] = self.speculator.stats()
 
         filename = transcript_manager.save_transcript(self.call_sid, transcript_data)
         if filename:
             log("INFO", f"Transcript saved: {filename}")
 
 
-def make_call(scenario_name: str = "appointment_scheduling") -> str | None:
-    """
-    Initiate outbound call with specified scenario.
-
-    Args:
-        scenario_name: Scenario key from scenarios.yaml.
-
-    Returns:
-        Call SID on success, None on failure.
-    """
+def _callback_url(path: str) -> str:
+    """Absolute webhook URL under BASE_URL (relative path if BASE_URL is unset)."""
     base_url = os.getenv("BASE_URL", "").strip().rstrip("/")
+    return f"{base_url}{path}"
 
-    if not base_url:
-        log("ERROR", "BASE_URL not set in .env")
-        return None
-
-    if not base_url.startswith("https://"):
-        log("WARNING", "BASE_URL should be HTTPS for Twilio webhooks")
-
-    try:
-        call = twilio_client.calls.create(
-            to=os.getenv("TEST_LINE_NUMBER"),
-            from_=os.getenv("TWILIO_PHONE_NUMBER"),
-            url=f"{base_url}/voice?scenario={scenario_name}",
-            record=True,
-            recording_status_callback=f"{base_url}/recording-complete",
-            status_callback=f"{base_url}/call-status",
-        )
 
-        log("SUCCESS", "Call initiated", f"SID: {call.sid} | Scenario: {scenario_name}")
+def _speak(response: VoiceResponse, text: str) -> None:
+    """Play the pre-rendered audio for a patient utterance, or <Say> it if none is cached."""
+    name = audio_cache.lookup(text)
+    if name:
+        response.play(_callback_url(f"/audio/{name}"))
+    else:
+        response.say(text, voice=PATIENT_VOICE)
 
-        active_calls[call.sid] = CallSession(call.sid, scenario_name)
-        return call.sid
 
-    except Exception as e:
-        log("ERROR", "Call failed", str(e))
-        errors_path = os.path.join(get_project_root(), "data", "errors.log")
-        os.makedirs(os.path.dirname(errors_path), exist_ok=True)
-        with open(errors_path, "a") as f:
-            f.write(f"{datetime.now().isoformat()} - Call initiation failed: {e}\n")
+def _build_gather(session: CallSession, first_turn: bool = False) -> Gather:
+    """
+    Build the speech Gather that listens for the next agent turn.
 
-        error_str = str(e).lower()
-        if "authenticate" in error_str:
-            log("INFO", "Hint: Check TWILIO_ACCOUNT_SID and TWILIO_AUTH_TOKEN in .env")
-        elif "balance" in error_str or "insufficient" in error_str:
-            log("INFO", "Hint: Check Twilio account balance")
-        elif "not a valid phone number" in error_str:
-            log("INFO", "Hint: Phone number format should be E.164 (e.g. +1XXXXXXXXXX)")
-        return None
+    Timeouts come from the session's endpointing controller (scenario YAML or
+    adaptive). With SPECULATIVE_REPLIES=true, partial STT results are also
+    posted to /partial-agent-speech so the patient reply can be drafted early.
+    """
+    kwargs: dict[str, Any] = {}
+    session.gather_seq += 1
+    if SPECULATIVE_REPLIES:
+        kwargs["partial_result_callback"] = _callback_url("/partial-agent-speech")
+        kwargs["partial_result_callback_method"] = "POST"
+    return Gather(
+        input="speech",
+        timeout=session.endpointing.gather_timeout(first_turn),
+        speech_timeout=session.endpointing.speech_timeout,  # Wait for agent to fully finish
+        action=f"/handle-agent-response?gather={session.gather_seq}",
+        method="POST",
+        **kwargs,
+    )
 
 
 @app.route("/voice", methods=["POST"])
@@ -211,23 +367,28 @@ def voice_webhook() -> str:
         scenario_name = request.values.get("scenario", "appointment_scheduling")
         log("INFO", f"Initializing call session for {call_sid} with scenario {scenario_name}")
         active_calls[call_sid] = CallSession(call_sid, scenario_name)
+        active_calls[call_sid].start_prewarm()
 
     response = VoiceResponse()
 
+    if CALL_MODE == "stream":
+        # Audio flows over the WebSocket for the rest of the call; no further TwiML round-trips.
+        base_url = os.getenv("BASE_URL", "").strip().rstrip("/")
+        ws_url = base_url.replace("https://", "wss://", 1).replace("http://", "ws://", 1)
+        connect = Connect()
+        stream = connect.stream(url=f"{ws_url}/media-stream")
+        stream.parameter(name="scenario", value=active_calls[call_sid].scenario_name)
+        response.append(connect)
+        return str(response)
+
     # No initial Pause: connect and listen immediately so clinic greeting plays and we capture it.
-    # We only get one POST per completed utterance (no partial STT chunks); patient does not barge in.
-    gather = Gather(
-        input="speech",
-        timeout=20,
-        speech_timeout=3,  # Wait for agent to fully finish; avoid mid-sentence cutoff
-        action="/handle-agent-response",
-        method="POST",
-    )
-    response.append(gather)
+    # We only get one POST per completed utterance; partial STT chunks (speculative mode) only
+    # pre-draft the reply, the patient still does not barge in.
+    response.append(_build_gather(active_calls[call_sid], first_turn=True))
 
     # Fallback if no speech detected (minimal pause before "Hello?")
     response.pause(length=1)
-    response.say("Hello?", voice="Polly.Matthew-Neural")
+    _speak(response, "Hello?")
     response.hangup()
 
     return str(response)
@@ -237,9 +398,60 @@ def voice_webhook() -> str:
 def handle_agent_response() -> str:
     """
     Process agent's speech and generate patient response.
+
+    Twilio retries of a turn (same Gather and speech, or same idempotency
+    token) get the TwiML of the first request instead of being processed again.
     """
+    turn_started = time.monotonic()
     call_sid = request.form.get("CallSid", "")
     agent_speech = request.form.get("SpeechResult", "")
+
+    # Initialize call session if needed
+    if call_sid not in active_calls:
+        log("WARNING", f"Call {call_sid} not in active_calls, creating now")
+        active_calls[call_sid] = CallSession(call_sid, "appointment_scheduling")
+    session = active_calls[call_sid]
+
+    key = request_key(
+        request.headers.get("I-Twilio-Idempotency-Token"), request.args.get("gather"), agent_speech
+    )
+    if key is None:
+        return _handle_agent_turn(session, turn_started)
+    while True:
+        owner, entry = session.responses.begin(key)
+        if owner:
+            break
+        outcome = "cached" if entry.done.is_set() else "waited"
+        body = session.responses.wait(entry)
+        if body is not None:
+            DUPLICATE_WEBHOOKS.inc("handle-agent-response", outcome)
+            log("WARNING", "Duplicate webhook suppressed", f"{outcome} TwiML for {key}")
+            return body
+        if not entry.done.is_set():
+            if not session.responses.supersede(entry):
+                # The original is already recording its reply: wait for its TwiML
+                continue
+            # Original still running past Twilio's timeout: keep the call listening, record nothing.
+            # Twilio will never play the original's reply, so it is saved flagged and kept out of the prompt.
+            DUPLICATE_WEBHOOKS.inc("handle-agent-response", "timeout")
+            log("WARNING", "Duplicate webhook still in flight, listening again", key)
+            response = VoiceResponse()
+            response.append(_build_gather(session))
+            return str(response)
+        # Original failed and was abandoned: process this retry as the turn
+    try:
+        body = _handle_agent_turn(session, turn_started, entry)
+    except BaseException:
+        session.responses.abandon(key)
+        raise
+    session.responses.complete(key, body)
+    return body
+
+
+def _handle_agent_turn(session: "CallSession", turn_started: float, entry: Any = None) -> str:
+    """Record the agent turn and build the patient's TwiML reply (entry: this request's dedup entry)."""
+    call_sid = session.call_sid
+    agent_speech = request.form.get("SpeechResult", "")
     confidence_str = request.form.get("Confidence", "1.0")
 
     try:
@@ -254,45 +466,33 @@ def handle_agent_response() -> str:
     else:
         log("SUCCESS", f"Agent said (confidence {confidence}): {agent_speech}")
 
-    # Initialize call session if needed
-    if call_sid not in active_calls:
-        log("WARNING", f"Call {call_sid} not in active_calls, creating now")
-        active_calls[call_sid] = CallSession(call_sid, "appointment_scheduling")
-
-    session = active_calls[call_sid]
-
-    # Save agent turn
-    session.transcript.append({
-        "speaker": "agent",
-        "text": agent_speech,
-        "turn": session.turn_count,
-        "timestamp": datetime.now().isoformat(),
-        "confidence": confidence,
-    })
-    session.turn_count += 1
-    session.save_transcript()
+    bind_log_context(scenario=session.scenario_name, turn=session.turn_count)
+    session.record_agent_turn(agent_speech, confidence)
 
     # Early exit: if agent clearly closed the call, do NOT call the LLM.
-    # Only after MIN_TURNS_BEFORE_CLOSE: greeting phrases like "Thanks for calling" often
-    # appear in the first agent utterance and must not be treated as closing.
-    if session.turn_count >= CallSession.MIN_TURNS_BEFORE_CLOSE and is_closing_utterance(agent_speech):
-        log("INFO", "Agent closing detected - patient will not respond", f"closed because: agent_closing_utterance (turn_count={session.turn_count})")
+    reason = session.end_reason(agent_speech)
+    if reason:
+        EARLY_EXITS.inc(reason)
+    if reason == "agent_closing_utterance":
+        log("INFO", "Agent closing detected - patient will not respond", f"closed because: {reason} (turn_count={session.turn_count})")
         response = VoiceResponse()
         return str(response)
 
-    # Check if call should end (goal achieved, max turns, etc.). Also gated by min turns.
-    if session.should_end_call(agent_speech):
-        reason = "goal_achieved" if session.goal_achieved else "max_turns_reached"
+    if reason:
         log("INFO", "Natural call ending detected", f"closed because: {reason} (turn_count={session.turn_count})")
         response = VoiceResponse()
         response.pause(length=1)
-        response.say("Thank you, goodbye.", voice="Polly.Matthew-Neural")
+        _speak(response, "Thank you, goodbye.")
         response.hangup()
         return str(response)
 
     # Generate patient reply only after agent's turn is complete (this handler runs when Gather
-    # returns one full SpeechResult — we do not respond to partial STT chunks; patient does not barge in).
+    # returns one full SpeechResult — partial STT chunks only feed speculation; patient does not barge in).
+    last_partial_at = session.speculator.last_partial_at if session.speculator else None
+    reply_started = time.monotonic()
     patient_reply = generate_gpt_reply(call_sid, agent_speech, confidence)
+    twiml_started = time.monotonic()
+    TURN_PHASE.observe(twiml_started - reply_started, "gather", "reply")
     log("INFO", f"Patient will say: '{patient_reply}'")
 
     # Build TwiML: short pause before patient speaks so we don't sound like we're interrupting.
@@ -301,34 +501,41 @@ def handle_agent_response() -> str:
     if patient_reply:
         # ~1.5s "thinking" pause after agent finishes, before patient speaks
         response.pause(length=1.5)
-        response.say(patient_reply, voice="Polly.Matthew-Neural")
+        _speak(response, patient_reply)
         log("SUCCESS", f"TwiML generated: {patient_reply[:50]}...")
 
         # Listen for next agent turn. Note: Twilio Gather only captures one complete utterance
         # per webhook call - we do not support true barge-in (interrupting mid-sentence).
-        # speech_timeout=3 means wait 3 seconds of silence before considering agent finished.
-        gather = Gather(
-            input="speech",
-            timeout=10,
-            speech_timeout=3,  # Wait for agent to fully finish before considering turn complete
-            action="/handle-agent-response",
-            method="POST",
-        )
-        response.append(gather)
+        # speech_timeout is the seconds of silence before considering agent finished.
+        response.append(_build_gather(session))
     else:
         response.pause(length=1)
-        response.say("Thank you, goodbye.", voice="Polly.Matthew-Neural")
+        _speak(response, "Thank you, goodbye.")
         response.hangup()
 
     # Persist transcript after TwiML is built (does not delay audible response)
-    session.transcript.append({
-        "speaker": "patient",
-        "text": patient_reply or "Thank you, goodbye.",
-        "turn": session.turn_count,
-        "timestamp": datetime.now().isoformat(),
-    })
-    session.turn_count += 1
-    session.save_transcript()
+    persist_started = time.monotonic()
+    TURN_PHASE.observe(persist_started - twiml_started, "gather", "twiml")
+    reply_latency_ms = round((persist_started - turn_started) * 1000, 1)
+    turn_metrics: dict[str, Any] = {"reply_latency_ms": reply_latency_ms}
+    if session.conversation_manager and session.conversation_manager.last_route:
+        # model, route (tier reason and any fallback) and llm_ms
+        turn_metrics.update(session.conversation_manager.last_route)
+    if session.last_prewarmed:
+        turn_metrics["prewarmed"] = True
+    if session.speculator:
+        turn_metrics["speculation"] = session.last_speculation
+        if last_partial_at is not None:
+            # Time from the last partial result to the final one: the endpointing wait
+            turn_metrics["endpoint_wait_ms"] = round((turn_started - last_partial_at) * 1000, 1)
+        log("INFO", f"Turn cycle {reply_latency_ms}ms", f"speculation: {session.last_speculation}")
+    if entry is not None and not session.responses.commit(entry):
+        # A retry already answered with a new Gather; this reply is never heard
+        log("WARNING", "Reply superseded by a retried webhook, not played", patient_reply or "")
+        turn_metrics["superseded"] = True
+        session.turns.drop_pending_reply()
+    session.record_patient_turn(patient_reply or "Thank you, goodbye.", **turn_metrics)
+    TURN_PHASE.observe(time.monotonic() - persist_started, "gather", "persist")
 
     return str(response)
 
@@ -346,13 +553,44 @@ def generate_gpt_reply(call_sid: str, agent_text: str, confidence: float = 1.0)
         Patient reply string.
     """
     if call_sid not in active_calls:
+        FALLBACKS.inc("no_session")
         return "Okay, thank you."
     session = active_calls[call_sid]
+    session.last_speculation = None
+    session.last_prewarmed = False
+    if session.conversation_manager:
+        session.conversation_manager.last_route = None
+    if session.prewarmer:
+        draft = session.prewarmer.take(agent_text, confidence)
+        if draft is not None:
+            session.last_prewarmed = True
+            if session.speculator:
+                session.speculator.discard()
+            patient_reply, from_llm, route = draft
+            if from_llm:
+                session.conversation_manager.record_turn(agent_text, patient_reply)
+                session.conversation_manager.last_route = route
+            return patient_reply
+    if session.speculator:
+        draft = session.speculator.take(agent_text, confidence)
+        session.last_speculation = session.speculator.last_outcome
+        if draft is not None:
+            patient_reply, from_llm, route = draft
+            if from_llm:
+                session.conversation_manager.record_turn(agent_text, patient_reply)
+                session.conversation_manager.last_route = route
+            return patient_reply
     if session.conversation_manager:
         try:
             return session.conversation_manager.generate_reply(agent_text, confidence)
+        except ProviderUnavailable as e:
+            log("WARNING", "LLM unavailable, using rule-based reply", str(e))
+            FALLBACKS.inc("provider_unavailable")
         except Exception as e:
             log("ERROR", "GPT generation failed", str(e))
+            FALLBACKS.inc("error")
+    else:
+        FALLBACKS.inc("no_scenario")
     return generate_simple_reply_fallback(agent_text)
 
 
@@ -368,6 +606,192 @@ def generate_simple_reply_fallback(agent_text: str) -> str:
     return "Okay, thank you."
 
 
+@sock.route("/media-stream")
+def media_stream(ws: Any) -> None:
+    """
+    Media Streams call mode: drive the conversation from raw call audio.
+
+    The local endpointer ends agent turns as soon as the agent stops talking,
+    instead of waiting for Gather's speech_timeout and a webhook round-trip.
+    """
+    stream = MediaStream(ws)
+    try:
+        start = stream.wait_for_start()
+    except ConnectionError as e:
+        log("WARNING", "Media stream ended early", str(e))
+        return
+
+    call_sid = start.get("callSid", "")
+    scenario_name = start.get("customParameters", {}).get("scenario", "appointment_scheduling")
+    if call_sid not in active_calls:
+        log("INFO", f"Initializing stream session for {call_sid} with scenario {scenario_name}")
+        active_calls[call_sid] = CallSession(call_sid, scenario_name)
+    session = active_calls[call_sid]
+    bind_log_context(call_sid=call_sid, scenario=session.scenario_name)
+    log("STATUS", f"Media stream started for call {call_sid}")
+
+    def on_turn(agent_text: str, stt_ms: float) -> tuple[str | None, bool]:
+        turn_started = time.monotonic()
+        session.record_agent_turn(agent_text, 1.0)
+        reason = session.end_reason(agent_text)
+        if reason:
+            EARLY_EXITS.inc(reason)
+        if reason == "agent_closing_utterance":
+            log("INFO", "Agent closing detected - patient will not respond", f"closed because: {reason}")
+            return None, False
+        if reason:
+            log("INFO", "Natural call ending detected", f"closed because: {reason}")
+            return "Thank you, goodbye.", True
+
+        reply_started = time.monotonic()
+        patient_reply = generate_gpt_reply(call_sid, agent_text)
+        TURN_PHASE.observe(time.monotonic() - reply_started, "stream", "reply")
+        session.record_patient_turn(
+            patient_reply or "Thank you, goodbye.",
+            reply_latency_ms=round((time.monotonic() - turn_started) * 1000, 1),
+            stt_ms=stt_ms,
+            **((session.conversation_manager.last_route or {}) if session.conversation_manager else {}),
+        )
+        return patient_reply or "Thank you, goodbye.", not patient_reply
+
+    def on_hangup() -> None:
+        try:
+            get_twilio_client().calls(call_sid).update(status="completed")
+        except Exception as e:
+            log("WARNING", "Could not hang up call", str(e))
+
+    stream.run(on_turn, on_hangup)
+    log("STATUS", f"Media stream closed for call {call_sid}", f"Barge-ins: {stream.barge_ins}")
+
+
+@app.route("/partial-agent-speech", methods=["POST"])
+def partial_agent_speech() -> str:
+    """Gather partial result callback; drafts the patient reply speculatively."""
+    call_sid = request.form.get("CallSid", "")
+    stable_text = request.form.get("StableSpeechResult", "")
+
+    session = active_calls.get(call_sid)
+    if (
+        session
+        and session.speculator
+        and provider_healthy("chat")
+        and not is_closing_utterance(stable_text)
+    ):
+        session.speculator.on_partial(stable_text)
+    return "OK"
+
+
+@app.route("/limits", methods=["GET"])
+def limits() -> dict[str, Any]:
+    """Shared rate limiter and circuit breaker state per provider endpoint."""
+    return limiter_stats()
+
+
+@app.route("/models", methods=["GET"])
+def models() -> dict[str, Any]:
+    """Model router tiers and rolling latency/error health per model."""
+    return router.stats()
+
+
+@app.route("/audio/<path:name>", methods=["GET"])
+def audio(name: str) -> Response:
+    """Pre-rendered patient audio for <Play> (file names are content hashes, so cache forever)."""
+    return send_from_directory(audio_cache.cache_dir, name, max_age=86400 * 365)
+
+
+@app.route("/audio", methods=["GET"])
+def audio_stats() -> dict[str, Any]:
+    """Audio cache backend and rendered/pending file counts."""
+    return audio_cache.stats()
+
+
+@app.route("/sessions", methods=["GET"])
+def sessions() -> dict[str, Any]:
+    """Active calls with turn counts and approximate memory per call (for host sizing)."""
+    calls = {
+        call_sid: {"scenario": session.scenario_name, "turns": len(session.turns), "bytes": session.memory_bytes()}
+        for call_sid, session in list(active_calls.items())
+    }
+    total = sum(call["bytes"] for call in calls.values())
+    return {
+        "active": len(calls),
+        "bytes_total": total,
+        "bytes_per_call": round(total / len(calls)) if calls else 0,
+        "calls": calls,
+    }
+
+
+@app.route("/live", methods=["GET"])
+def live() -> Response:
+    """
+    Live call monitor as server-sent events.
+
+    Streams a snapshot of active calls, then turn, end and status events as they
+    happen. Filter with ?call_sid=CA1,CA2 and/or ?scenario=appointment. A slow
+    client loses its oldest events (announced by a "dropped" event) rather than
+    slowing the webhooks.
+    """
+    call_sids = {sid for value in request.args.getlist("call_sid") for sid in value.split(",") if sid}
+    scenarios = {name for value in request.args.getlist("scenario") for name in value.split(",") if name}
+    subscriber = live_events.subscribe(call_sids, scenarios)
+    snapshot = {
+        "active": [
+            {"call_sid": call_sid, "scenario": session.scenario_name, "turns": len(session.turns)}
+            for call_sid, session in list(active_calls.items())
+            if subscriber.wants({"call_sid": call_sid, "scenario": session.scenario_name})
+        ]
+    }
+    return Response(
+        sse_stream(live_events, subscriber, snapshot),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.route("/lines", methods=["GET"])
+def lines() -> dict[str, Any]:
+    """Caller ID / target line pool utilization."""
+    return get_line_pool().stats()
+
+
+@app.route("/dispatch", methods=["POST"])
+def dispatch() -> tuple[dict[str, Any], int]:
+    """
+    Place one call now on a free line pair from the pool (no retries; see /queue).
+
+    Returns 503 while every line is busy or cooling down and 502 if Twilio
+    refused the call.
+    """
+    scenario_name = request.values.get("scenario", "appointment_scheduling")
+    placed = dispatch_call(scenario_name)
+    if placed is None:
+        return {"error": "no free line", "lines": get_line_pool().stats()}, 503
+    return placed, 200 if placed["call_sid"] else 502
+
+
+@app.route("/queue", methods=["POST"])
+def enqueue_calls() -> tuple[dict[str, Any], int]:
+    """Queue calls (scenario, calls, campaign) for the scheduler; they are retried until done."""
+    scenario_name = request.values.get("scenario", "appointment_scheduling")
+    count = request.values.get("calls", "1")
+    if not count.isdigit() or int(count) < 1:
+        return {"error": "calls must be a positive integer"}, 400
+    ids = get_call_queue().enqueue(scenario_name, int(count), request.values.get("campaign"))
+    return {"queued": ids}, 201
+
+
+@app.route("/queue", methods=["GET"])
+def queue_stats() -> dict[str, Any]:
+    """Queued calls by status and attempts by outcome (?campaign= to filter)."""
+    return get_call_queue().stats(request.args.get("campaign"))
+
+
+@app.route("/metrics", methods=["GET"])
+def metrics() -> Response:
+    """Prometheus scrape endpoint: route/phase latency, LLM, Whisper, fallbacks, limiter state."""
+    return Response(render(), content_type=CONTENT_TYPE)
+
+
 @app.route("/recording-complete", methods=["POST"])
 def recording_complete() -> str:
     """Webhook when call recording is ready; download and optionally transcribe with Whisper."""
@@ -380,19 +804,43 @@ def recording_complete() -> str:
     audio_file = recording_manager.download_recording(call_sid, recording_url)
     if audio_file:
         whisper_transcript = recording_manager.transcribe_with_whisper(audio_file)
-        if whisper_transcript:
-            transcript_manager.enrich_with_whisper(call_sid, whisper_transcript)
+        if whisper_transcript and transcript_manager.enrich_with_whisper(call_sid, whisper_transcript):
+            accuracy = align_transcript(transcript_manager.load_transcript(call_sid) or {})
+            if accuracy:
+                transcript_manager.update_transcript(call_sid, {"stt_accuracy": accuracy})
+                log("INFO", f"Twilio STT word error rate vs Whisper: {accuracy['agent_wer']}")
     return "OK"
 
 
 @app.route("/call-status", methods=["POST"])
 def call_status() -> str:
-    """Track call status and save final transcript when call completes."""
+    """
+    Track call status and save final transcript when call completes.
+
+    Outbound calls from make_call also report initiated/ringing, which is
+    when the session is created and pre-warmed, using the ring time.
+    """
     call_sid = request.form.get("CallSid", "")
     call_status_val = request.form.get("CallStatus", "")
     call_duration = request.form.get("CallDuration", "0")
 
     log("STATUS", f"Call {call_sid} status: {call_status_val}")
+    session = active_calls.get(call_sid)
+    live_events.publish(
+        "status",
+        call_sid,
+        session.scenario_name if session else request.values.get("scenario"),
+        status=call_status_val,
+        duration_seconds=int(call_duration) if str(call_duration).isdigit() else None,
+    )
+    get_line_pool().observe(call_sid, call_status_val, request.form.get("From", ""), request.form.get("To", ""))
+    if call_status_val in TERMINAL_STATUSES:
+        get_call_queue().record_outcome(call_sid, call_status_val)
+
+    if call_status_val in ("initiated", "ringing") and call_sid not in active_calls:
+        scenario_name = request.values.get("scenario", "appointment_scheduling")
+        active_calls[call_sid] = CallSession(call_sid, scenario_name)
+        active_calls[call_sid].start_prewarm()
 
     if call_status_val == "completed" and call_sid in active_calls:
         session = active_calls[call_sid]
@@ -403,21 +851,45 @@ def call_status() -> str:
             "status": "completed",
             "completed_at": datetime.now().isoformat(),
             "duration_seconds": int(call_duration) if str(call_duration).isdigit() else 0,
+            "endpointing": session.endpointing.describe(),
+            "end_reason": session.closed_reason,
         }
         if session.conversation_manager:
             transcript_data["scenario_info"] = session.conversation_manager.get_scenario_info()
+            transcript_data["model_usage"] = session.conversation_manager.model_usage()
+        if session.speculator:
+            transcript_data["speculation"] = session.speculator.stats()
+            log("INFO", "Speculation stats", str(transcript_data["speculation"]))
 
         filename = transcript_manager.save_transcript(call_sid, transcript_data)
         log("SUCCESS", "Call completed", f"Duration: {call_duration}s | Turns: {session.turn_count}")
         log("INFO", f"Transcript: {filename}")
         del active_calls[call_sid]
+    elif call_status_val in TERMINAL_STATUSES:
+        # busy / no-answer / failed / canceled: the call never connected
+        session = active_calls.pop(call_sid, None)
+        if session and session.prewarmer:
+            cancelled = session.prewarmer.cancel()
+            if cancelled:
+                log("INFO", f"Cancelled {cancelled} pre-warmed drafts for unanswered call")
     return "OK"
 
 
 if __name__ == "__main__":
     port = int(os.getenv("FLASK_PORT", "5000"))
     log("INFO", f"Starting Flask server on port {port}")
+    prepare_scenarios()
+    debug = True
+    # With the reloader, only the serving child process resumes and dials the queue
+    if not debug or os.environ.get("WERKZEUG_RUN_MAIN") == "true":
+        call_queue = get_call_queue()
+        call_queue.recover(lambda call_sid: get_twilio_client().calls(call_sid).fetch().status)
+        CallScheduler(call_queue).start()
+        if audio_cache.enabled:
+            log("WARNING", f"Audio cache on ({audio_cache.backend.name}): cached phrases use a different voice "
+                f"than <Say> ({PATIENT_VOICE}), so the patient's voice changes mid-call")
+        audio_cache.prewarm(scenario_phrases())
     log("INFO", "1. Run ngrok: ngrok http 5000")
     log("INFO", "2. Set BASE_URL in .env to your ngrok HTTPS URL")
     log("INFO", "3. Run: python test_call.py to initiate a test call")
-    app.run(host="0.0.0.0", port=port, debug=True)
+    app.run(host="0.0.0.0", port=port, debug=debug)
@@ -0,0 +1,92 @@
+"""
+Warm-up of the first patient turns while an outbound call is ringing.
+
+Twilio ring time is several seconds of idle time. At call creation the system
+prompt is built, the LLM connection is opened, and replies are drafted for the
+clinic's usual opening turns. On turn one the closest draft is served instead
+of generating from scratch.
+
+Two of the openings reach the LLM, so each call that rings costs two chat
+requests whether or not it is answered. Drafts still queued when the call
+ends busy, no-answer, failed or canceled are cancelled (cancel()); a draft
+already being generated runs to completion.
+"""
+
+import os
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any
+
+from src.conversation import ConversationManager
+from src.llm_client import warm_up
+from src.speculation import text_similarity
+from src.utils import log
+
+PREWARM_OPENING_TURNS = os.getenv("PREWARM_OPENING_TURNS", "true").lower() == "true"
+# Opening turns vary more than a partial vs final STT result, so match more loosely
+PREWARM_MATCH_THRESHOLD = float(os.getenv("PREWARM_MATCH_THRESHOLD", "0.75"))
+
+# Typical clinic openings, from saved transcripts. Name and DOB checks are answered
+# by the verification fast path, so only the "how can I help" turns reach the LLM.
+OPENING_TURNS = {
+    "greeting": "Thanks for calling Pivot Point Orthopedics. How can I help you today?",
+    "name_check": "Thanks for calling Pivot Point Orthopedics. Am I speaking with Lucas?",
+    "dob": "Can you please tell me your date of birth to verify your identity?",
+    "how_can_i_help": "Got it. What can I help you with today?",
+}
+
+_executor = ThreadPoolExecutor(max_workers=int(os.getenv("PREWARM_WORKERS", "4")))
+
+
+class CallPrewarmer:
+    """Drafts for the opening turns of one call."""
+
+    def __init__(self, conversation_manager: ConversationManager) -> None:
+        self.conversation_manager = conversation_manager
+        self._drafts: dict[str, tuple[str, Future]] = {}
+        self.served: str | None = None
+
+    def start(self) -> None:
+        """Kick off warm-up in the background; returns immediately."""
+        self.conversation_manager.get_system_prompt()
+        _executor.submit(warm_up)
+        for key, text in OPENING_TURNS.items():
+            self._drafts[key] = (text, _executor.submit(self.conversation_manager.draft_reply, text))
+
+    def cancel(self) -> int:
+        """Drop the drafts of a call that ended; returns how many queued drafts were cancelled."""
+        cancelled = sum(future.cancel() for _, future in self._drafts.values())
+        self._drafts.clear()
+        return cancelled
+
+    def take(self, agent_text: str, confidence: float) -> tuple[str, bool, dict[str, Any] | None] | None:
+        """
+        Serve a pre-generated reply if the agent turn matches an opening turn.
+
+        Drafts were generated with empty history, so they only apply until the
+        first LLM exchange has been recorded.
+
+        Args:
+            agent_text: Final agent utterance.
+            confidence: STT confidence 0-1.
+
+        Returns:
+            (reply, from_llm, route) on a match, None otherwise.
+        """
+        if self.conversation_manager.turn_count:
+            self._drafts.clear()
+        if not self._drafts or confidence < 0.7:
+            return None
+        scores = {key: text_similarity(text, agent_text) for key, (text, _) in self._drafts.items()}
+        key = max(scores, key=scores.__getitem__)
+        if scores[key] < PREWARM_MATCH_THRESHOLD:
+            return None
+        future = self._drafts[key][1]
+        try:
+            draft = future.result()
+        except Exception as e:
+            log("WARNING", "Pre-warmed draft failed", str(e))
+            return None
+        del self._drafts[key]
+        self.served = key
+        log("INFO", f"Serving pre-warmed reply for opening turn: {key}")
+        return draft
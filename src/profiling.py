@@ -0,0 +1,106 @@
+"""
+Opt-in cProfile capture for live webhook requests.
+
+Off unless one of PROFILE_EVERY_N, PROFILE_CALL_SIDS or PROFILE_SCENARIOS is
+set; when off, the request hooks cost a single flag check. A selected request
+runs under cProfile and its stats are written to data/profiles/ as
+<time>--<route>--<scenario>--<call_sid>.prof, which profile_report.py
+aggregates. cProfile only sees the request thread, so work handed to the
+speculation/prewarm pools shows up as the wait on its future.
+"""
+
+import cProfile
+import itertools
+import os
+import re
+from datetime import datetime
+
+from src.utils import get_project_root, log
+
+# Profile one request in every N (0 = never)
+PROFILE_EVERY_N = int(os.getenv("PROFILE_EVERY_N", "0"))
+# Always profile requests for these calls / scenarios (comma-separated)
+PROFILE_CALL_SIDS = frozenset(s.strip() for s in os.getenv("PROFILE_CALL_SIDS", "").split(",") if s.strip())
+PROFILE_SCENARIOS = frozenset(s.strip() for s in os.getenv("PROFILE_SCENARIOS", "").split(",") if s.strip())
+
+PROFILING_ENABLED = bool(PROFILE_EVERY_N > 0 or PROFILE_CALL_SIDS or PROFILE_SCENARIOS)
+PROFILE_DIR = os.path.join(get_project_root(), "data", "profiles")
+# Separates the fields of a profile file name; scenario names contain "_"
+FIELD_SEPARATOR = "--"
+
+_request_counter = itertools.count()
+
+
+def should_profile(call_sid: str | None, scenario: str | None) -> bool:
+    """
+    Decide whether to profile a request.
+
+    Args:
+        call_sid: Request CallSid, if any.
+        scenario: Scenario of the call's session, if known.
+
+    Returns:
+        True if the call or scenario is targeted or the request is the Nth.
+    """
+    if not PROFILING_ENABLED:
+        return False
+    if call_sid in PROFILE_CALL_SIDS or scenario in PROFILE_SCENARIOS:
+        return True
+    return PROFILE_EVERY_N > 0 and next(_request_counter) % PROFILE_EVERY_N == 0
+
+
+def start_profile() -> cProfile.Profile:
+    """Start profiling the current thread."""
+    profiler = cProfile.Profile()
+    profiler.enable()
+    return profiler
+
+
+def _slug(value: str) -> str:
+    return re.sub(r"[^A-Za-z0-9_]+", "-", value).strip("-") or "none"
+
+
+def save_profile(profiler: cProfile.Profile, route: str, scenario: str | None, call_sid: str | None) -> str | None:
+    """
+    Stop a profiler and write its stats to data/profiles/.
+
+    Args:
+        profiler: Profiler from start_profile().
+        route: Flask route rule, e.g. "/handle-agent-response".
+        scenario: Scenario name, if known.
+        call_sid: Call SID, if any.
+
+    Returns:
+        Path of the .prof file, or None if it could not be written.
+    """
+    profiler.disable()
+    name = FIELD_SEPARATOR.join([
+        datetime.now().strftime("%Y%m%dT%H%M%S%f"),
+        _slug(route),
+        _slug(scenario or ""),
+        _slug(call_sid or ""),
+    ])
+    path = os.path.join(PROFILE_DIR, f"{name}.prof")
+    try:
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        profiler.dump_stats(path)
+        return path
+    except OSError as e:
+        log("WARNING", "Could not write request profile", str(e))
+        return None
+
+
+def parse_profile_name(path: str) -> dict[str, str]:
+    """
+    Split a profile file name back into its fields.
+
+    Args:
+        path: Path to a .prof file written by save_profile().
+
+    Returns:
+        Dict with captured_at, route, scenario and call_sid ("" if unknown).
+    """
+    stem = os.path.splitext(os.path.basename(path))[0]
+    parts = stem.split(FIELD_SEPARATOR)
+    parts += [""] * (4 - len(parts))
+    return dict(zip(("captured_at", "route", "scenario", "call_sid"), parts[:4]))
@@ -0,0 +1,374 @@
+"""
+Process-wide rate limiting and circuit breaking for provider API calls.
+
+All active calls share one limiter per provider endpoint ("chat" for patient
+replies, "whisper" for transcription). Limiters are token buckets for
+requests and tokens per minute with round-robin queuing across calls, so one
+busy call cannot starve the others. The request rate backs off on 429s and
+recovers gradually (AIMD). A circuit breaker per endpoint opens after
+repeated failures or slow calls, so callers fall back immediately instead of
+piling onto an unhealthy provider.
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator
+
+from src.metrics import CallbackGauge
+
+OPENAI_RPM = float(os.getenv("OPENAI_RPM", "500"))
+OPENAI_TPM = float(os.getenv("OPENAI_TPM", "200000"))
+WHISPER_RPM = float(os.getenv("WHISPER_RPM", "50"))
+# Longest a live turn waits for a slot before falling back
+LLM_QUEUE_TIMEOUT = float(os.getenv("LLM_QUEUE_TIMEOUT", "5"))
+
+BREAKER_FAILURE_THRESHOLD = int(os.getenv("BREAKER_FAILURE_THRESHOLD", "5"))
+BREAKER_COOLDOWN_SECONDS = float(os.getenv("BREAKER_COOLDOWN_SECONDS", "30"))
+# Calls slower than this count as failures for the breaker
+SLOW_CALL_SECONDS = float(os.getenv("LLM_SLOW_CALL_SECONDS", "10"))
+
+# Multiplicative decrease on 429, additive recovery per success (fraction of configured rate)
+BACKOFF_FACTOR = 0.5
+RECOVERY_STEP = 0.05
+MIN_RATE_FRACTION = 0.1
+
+
+class ProviderUnavailable(Exception):
+    """Raised when a provider call is refused by the breaker or limiter."""
+
+
+class RateLimiter:
+    """Token buckets for requests/min and tokens/min with fair queuing per call."""
+
+    def __init__(self, name: str, requests_per_min: float, tokens_per_min: float | None = None) -> None:
+        self.name = name
+        self.requests_per_min = requests_per_min
+        self.tokens_per_min = tokens_per_min
+        self.rate_fraction = 1.0
+        self._requests = requests_per_min
+        self._tokens = tokens_per_min or 0.0
+        self._refilled_at = time.monotonic()
+        self._blocked_until = 0.0
+        self._cond = threading.Condition()
+        self._queues: OrderedDict[str, deque[object]] = OrderedDict()
+        self.granted = 0
+        self.timeouts = 0
+        self.throttled = 0
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        elapsed = now - self._refilled_at
+        self._refilled_at = now
+        rpm = self.requests_per_min * self.rate_fraction
+        self._requests = min(rpm, self._requests + elapsed * rpm / 60.0)
+        if self.tokens_per_min:
+            self._tokens = min(self.tokens_per_min, self._tokens + elapsed * self.tokens_per_min / 60.0)
+
+    def _wait_hint(self, tokens: float) -> float:
+        """Seconds until the buckets could cover one request of `tokens`."""
+        rpm = self.requests_per_min * self.rate_fraction
+        waits = [max(0.0, self._blocked_until - time.monotonic())]
+        if self._requests < 1:
+            waits.append((1 - self._requests) * 60.0 / rpm)
+        if self.tokens_per_min and self._tokens < tokens:
+            waits.append((tokens - self._tokens) * 60.0 / self.tokens_per_min)
+        return max(0.01, max(waits))
+
+    def acquire(self, key: str, tokens: float = 0.0, timeout: float | None = None) -> bool:
+        """
+        Wait for a request slot, served round-robin across keys (call SIDs).
+
+        Args:
+            key: Queue key; waiters with the same key are served in order.
+            tokens: Estimated tokens for this request.
+            timeout: Max seconds to wait (None waits forever).
+
+        Returns:
+            True when granted, False on timeout.
+        """
+        if self.tokens_per_min:
+            tokens = min(tokens, self.tokens_per_min)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        ticket = object()
+        with self._cond:
+            self._queues.setdefault(key, deque()).append(ticket)
+            while True:
+                self._refill()
+                head_key = next(iter(self._queues))
+                is_next = head_key == key and self._queues[key][0] is ticket
+                has_capacity = (
+                    self._requests >= 1
+                    and time.monotonic() >= self._blocked_until
+                    and (not self.tokens_per_min or self._tokens >= tokens)
+                )
+                if is_next and has_capacity:
+                    self._requests -= 1
+                    self._tokens -= tokens
+                    self._dequeue(key, ticket)
+                    self.granted += 1
+                    self._cond.notify_all()
+                    return True
+                wait = self._wait_hint(tokens) if is_next else None
+                if deadline is not None:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._dequeue(key, ticket)
+                        self.timeouts += 1
+                        self._cond.notify_all()
+                        return False
+                    wait = remaining if wait is None else min(wait, remaining)
+                self._cond.wait(wait)
+
+    def share(self, parts: int) -> None:
+        """Keep 1/parts of the budget: this process is one of `parts` drawing on the same API key."""
+        with self._cond:
+            self.requests_per_min /= parts
+            self._requests = min(self._requests, self.requests_per_min)
+            if self.tokens_per_min:
+                self.tokens_per_min /= parts
+                self._tokens = min(self._tokens, self.tokens_per_min)
+
+    def _dequeue(self, key: str, ticket: object) -> None:
+        """Remove a ticket; rotate its key to the back so other calls go next."""
+        queue = self._queues[key]
+        queue.remove(ticket)
+        if queue:
+            self._queues.move_to_end(key)
+        else:
+            del self._queues[key]
+
+    def settle(self, estimated: float, actual: float) -> None:
+        """Correct the token bucket once actual usage is known."""
+        if not self.tokens_per_min:
+            return
+        with self._cond:
+            self._tokens = min(self.tokens_per_min, self._tokens + estimated - actual)
+
+    def on_rate_limited(self, retry_after: float | None = None) -> None:
+        """Back off after a 429: halve the request rate and honor Retry-After."""
+        with self._cond:
+            self.throttled += 1
+            self.rate_fraction = max(MIN_RATE_FRACTION, self.rate_fraction * BACKOFF_FACTOR)
+            self._requests = min(self._requests, self.requests_per_min * self.rate_fraction)
+            if retry_after:
+                self._blocked_until = max(self._blocked_until, time.monotonic() + retry_after)
+
+    def on_success(self) -> None:
+        """Recover the request rate gradually after a throttle."""
+        if self.rate_fraction < 1.0:
+            with self._cond:
+                self.rate_fraction = min(1.0, self.rate_fraction + RECOVERY_STEP)
+
+    def stats(self) -> dict[str, Any]:
+        """Snapshot of limiter state."""
+        with self._cond:
+            self._refill()
+            return {
+                "requests_per_min": round(self.requests_per_min * self.rate_fraction, 1),
+                "rate_fraction": round(self.rate_fraction, 3),
+                "requests_available": round(self._requests, 2),
+                "tokens_available": round(self._tokens) if self.tokens_per_min else None,
+                "waiting": sum(len(q) for q in self._queues.values()),
+                "waiting_calls": len(self._queues),
+                "granted": self.granted,
+                "timeouts": self.timeouts,
+                "throttled": self.throttled,
+            }
+
+
+class CircuitBreaker:
+    """Closed -> open after consecutive failures -> half-open probe after a cooldown."""
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.state = "closed"
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.times_opened = 0
+        self.rejected = 0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """Whether a call may go to the provider now."""
+        with self._lock:
+            if self.state == "closed":
+                return True
+            if self.state == "open" and time.monotonic() - self.opened_at >= BREAKER_COOLDOWN_SECONDS:
+                self.state = "half_open"
+            if self.state == "half_open" and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            self.rejected += 1
+            return False
+
+    def abandon(self) -> None:
+        """Release a half-open probe slot that never reached the provider."""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def record_success(self) -> None:
+        """Close the breaker after a healthy call."""
+        with self._lock:
+            self.state = "closed"
+            self.consecutive_failures = 0
+            self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        """Count a failed or slow call; open the breaker past the threshold."""
+        with self._lock:
+            self.consecutive_failures += 1
+            self._probe_in_flight = False
+            if self.state == "half_open" or self.consecutive_failures >= BREAKER_FAILURE_THRESHOLD:
+                if self.state != "open":
+                    self.times_opened += 1
+                self.state = "open"
+                self.opened_at = time.monotonic()
+
+    def stats(self) -> dict[str, Any]:
+        """Snapshot of breaker state."""
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "times_opened": self.times_opened,
+            "rejected": self.rejected,
+        }
+
+
+_limiters: dict[str, RateLimiter] = {
+    "chat": RateLimiter("chat", OPENAI_RPM, OPENAI_TPM),
+    "whisper": RateLimiter("whisper", WHISPER_RPM),
+}
+_breakers: dict[str, CircuitBreaker] = {name: CircuitBreaker(name) for name in _limiters}
+
+
+def get_limiter(name: str) -> RateLimiter:
+    """Shared limiter for an endpoint ("chat" or "whisper")."""
+    return _limiters[name]
+
+
+def get_breaker(name: str) -> CircuitBreaker:
+    """Shared circuit breaker for an endpoint ("chat" or "whisper")."""
+    return _breakers[name]
+
+
+def share_limits(parts: int) -> None:
+    """Split every endpoint's budget across `parts` worker processes (each calls this once)."""
+    for limiter in _limiters.values():
+        limiter.share(parts)
+
+
+def provider_healthy(name: str) -> bool:
+    """False while the endpoint's breaker is open (callers should use their fallback)."""
+    return _breakers[name].state != "open"
+
+
+def _retry_after(error: Exception) -> float | None:
+    """Retry-After seconds from an API error response, if present."""
+    response = getattr(error, "response", None)
+    value = getattr(response, "headers", {}).get("retry-after") if response is not None else None
+    try:
+        return float(value) if value else None
+    except ValueError:
+        return None
+
+
+# Exception class names (anywhere in the MRO) for requests that never got a response:
+# openai's APIConnectionError / APITimeoutError and the httpx errors underneath them
+_TRANSPORT_ERRORS = {"APIConnectionError", "APITimeoutError", "TimeoutException", "NetworkError"}
+
+
+def is_provider_failure(error: Exception) -> bool:
+    """
+    Whether an error says the provider is unhealthy (counts toward the breaker).
+
+    429s, 5xx responses, timeouts and connection errors do. Client errors
+    (400/401/404, a malformed prompt, missing credentials) and bugs in our own
+    code do not: they say nothing about the provider, and counting them would
+    let one bad request open the breaker for every live call.
+    """
+    status = getattr(error, "status_code", None)
+    if isinstance(status, int):
+        return status == 429 or status >= 500
+    if isinstance(error, (TimeoutError, ConnectionError)):
+        return True
+    return any(cls.__name__ in _TRANSPORT_ERRORS for cls in type(error).__mro__)
+
+
+@contextmanager
+def provider_call(
+    name: str, key: str = "default", tokens: float = 0.0, timeout: float | None = LLM_QUEUE_TIMEOUT
+) -> Iterator[None]:
+    """
+    Guard one provider request with the endpoint's breaker and limiter.
+
+    Args:
+        name: Endpoint name ("chat" or "whisper").
+        key: Fair-queuing key, usually the call SID.
+        tokens: Estimated tokens for the request.
+        timeout: Max seconds to wait for a slot (None waits forever).
+
+    Raises:
+        ProviderUnavailable: If the breaker is open or no slot frees up in time.
+    """
+    limiter, breaker = _limiters[name], _breakers[name]
+    if not breaker.allow():
+        raise ProviderUnavailable(f"{name} circuit open")
+    if not limiter.acquire(key, tokens, timeout):
+        breaker.abandon()
+        raise ProviderUnavailable(f"{name} rate limit wait exceeded {timeout}s")
+    started = time.monotonic()
+    try:
+        yield
+    except Exception as e:
+        if getattr(e, "status_code", None) == 429:
+            limiter.on_rate_limited(_retry_after(e))
+        if is_provider_failure(e):
+            breaker.record_failure()
+        else:
+            # Not the provider's fault: leave the breaker as it was (free a half-open probe slot)
+            breaker.abandon()
+        raise
+    if time.monotonic() - started > SLOW_CALL_SECONDS:
+        breaker.record_failure()
+    else:
+        breaker.record_success()
+        limiter.on_success()
+
+
+def limiter_stats() -> dict[str, Any]:
+    """Limiter and breaker state for every endpoint."""
+    return {
+        name: {**_limiters[name].stats(), "breaker": _breakers[name].stats()}
+        for name in _limiters
+    }
+
+
+def _limiter_gauge(field: str) -> Callable[[], dict[tuple[str, ...], float]]:
+    """Scrape-time gauge callback reading one limiter_stats() field per endpoint."""
+    return lambda: {(name,): limiter.stats()[field] or 0 for name, limiter in _limiters.items()}
+
+
+# Same state as GET /limits, exposed on GET /metrics
+CallbackGauge(
+    "pgai_limiter_requests_available",
+    "Request tokens left in the bucket",
+    _limiter_gauge("requests_available"),
+    ("endpoint",),
+)
+CallbackGauge(
+    "pgai_limiter_rate_fraction",
+    "Current request rate as a fraction of the configured rate",
+    _limiter_gauge("rate_fraction"),
+    ("endpoint",),
+)
+CallbackGauge("pgai_limiter_waiting", "Requests queued for a slot", _limiter_gauge("waiting"), ("endpoint",))
+CallbackGauge(
+    "pgai_breaker_open",
+    "1 while the endpoint's circuit breaker is open",
+    lambda: {(name,): float(breaker.state == "open") for name, breaker in _breakers.items()},
+    ("endpoint",),
+)
@@ -2,25 +2,23 @@
 Recording download and transcription manager.
 
 Handles Twilio recording URLs and optional Whisper post-processing.
-Used by phone_system when recording-complete webhook is called.
+Used by phone_system when recording-complete webhook is called. Downloads go
+into the content-addressed RecordingStore (src.recording_store).
 """
 
+import hashlib
 import os
-from datetime import datetime
+import time
 from typing import Any
 
 import requests
-from openai import OpenAI
-from twilio.rest import Client
 
+from src.clients import get_openai_client, get_twilio_client
+from src.metrics import WHISPER_JOB
+from src.rate_limiter import provider_call
+from src.recording_store import RecordingStore
 from src.utils import get_project_root, log
 
-_twilio_client = Client(
-    os.getenv("TWILIO_ACCOUNT_SID"),
-    os.getenv("TWILIO_AUTH_TOKEN"),
-)
-_openai_client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-
 
 class RecordingManager:
     """Download and process call recordings."""
@@ -31,10 +29,13 @@ class RecordingManager:
         self.should_download = os.getenv("DOWNLOAD_RECORDINGS", "true").lower() == "true"
         self.use_whisper = os.getenv("USE_WHISPER_TRANSCRIPTION", "false").lower() == "true"
         os.makedirs(self.recordings_dir, exist_ok=True)
+        self.store = RecordingStore(self.recordings_dir)
 
     def download_recording(self, call_sid: str, recording_url: str) -> str | None:
         """
-        Download recording from Twilio.
+        Download recording from Twilio into the recording store.
+
+        Skipped when the store already holds an intact copy for the call.
 
         Args:
             call_sid: Twilio call SID.
@@ -47,6 +48,12 @@ class RecordingManager:
             log("INFO", "Recording download disabled (DOWNLOAD_RECORDINGS=false)")
             return None
 
+        stored = self.store.get(call_sid)
+        if stored:
+            log("INFO", f"Recording already stored for {call_sid}", stored)
+            return stored
+
+        partial = os.path.join(self.recordings_dir, f".{call_sid}.part")
         try:
             if not recording_url.startswith("http"):
                 recording_url = f"https://api.twilio.com{recording_url}.mp3"
@@ -66,21 +73,27 @@ class RecordingManager:
                 log("ERROR", f"Download failed: HTTP {response.status_code}")
                 return None
 
-            filename = os.path.join(self.recordings_dir, f"{call_sid}.mp3")
-            with open(filename, "wb") as f:
+            digest = hashlib.sha256()
+            with open(partial, "wb") as f:
                 for chunk in response.iter_content(chunk_size=8192):
                     f.write(chunk)
+                    digest.update(chunk)
+
+            file_size = os.path.getsize(partial)
+            expected = response.headers.get("Content-Length")
+            if expected and int(expected) != file_size:
+                log("ERROR", f"Recording download truncated for {call_sid}", f"{file_size} of {expected} bytes")
+                os.remove(partial)
+                return None
 
-            file_size = os.path.getsize(filename)
-            log("SUCCESS", f"Recording saved: {filename}", f"{file_size / 1024:.1f} KB")
+            filename = self.store.put(call_sid, partial, source_sha256=digest.hexdigest())
+            log("SUCCESS", f"Recording saved: {filename}", f"{file_size / 1024:.1f} KB downloaded")
             return filename
 
         except Exception as e:
-            log("ERROR", "Recording download failed", str(e))
-            errors_path = os.path.join(get_project_root(), "data", "errors.log")
-            os.makedirs(os.path.dirname(errors_path), exist_ok=True)
-            with open(errors_path, "a") as f:
-                f.write(f"{datetime.now().isoformat()} - Recording download failed for {call_sid}: {e}\n")
+            log("ERROR", f"Recording download failed for {call_sid}", str(e))
+            if os.path.exists(partial):
+                os.remove(partial)
             return None
 
     def transcribe_with_whisper(self, audio_file: str) -> dict[str, Any] | None:
@@ -104,13 +117,21 @@ class RecordingManager:
         try:
             log("STATUS", "Transcribing with Whisper...")
 
-            with open(audio_file, "rb") as f:
-                transcript = _openai_client.audio.transcriptions.create(
-                    model="whisper-1",
-                    file=f,
-                    language="en",
-                    response_format="verbose_json",
-                )
+            call_key = os.path.splitext(os.path.basename(audio_file))[0]
+            # Background job: wait for a Whisper slot rather than giving up
+            with open(audio_file, "rb") as f, provider_call("whisper", call_key, timeout=None):
+                started = time.perf_counter()
+                try:
+                    transcript = get_openai_client().audio.transcriptions.create(
+                        model="whisper-1",
+                        file=f,
+                        language="en",
+                        response_format="verbose_json",
+                    )
+                except Exception:
+                    WHISPER_JOB.observe(time.perf_counter() - started, "recording", "error")
+                    raise
+                WHISPER_JOB.observe(time.perf_counter() - started, "recording", "ok")
 
             duration_seconds = getattr(transcript, "duration", 0) or 0
             cost = (duration_seconds / 60) * 0.006
@@ -124,11 +145,7 @@ class RecordingManager:
             }
 
         except Exception as e:
-            log("ERROR", "Whisper transcription failed", str(e))
-            errors_path = os.path.join(get_project_root(), "data", "errors.log")
-            os.makedirs(os.path.dirname(errors_path), exist_ok=True)
-            with open(errors_path, "a") as f:
-                f.write(f"{datetime.now().isoformat()} - Whisper transcription failed for {audio_file}: {e}\n")
+            log("ERROR", f"Whisper transcription failed for {audio_file}", str(e))
             return None
 
     def get_recording_metadata(self, call_sid: str) -> dict[str, Any] | None:
@@ -142,7 +159,7 @@ class RecordingManager:
             Dict with recording_sid, duration, date_created, uri; or None.
         """
         try:
-            recordings = _twilio_client.recordings.list(call_sid=call_sid, limit=1)
+            recordings = get_twilio_client().recordings.list(call_sid=call_sid, limit=1)
             if not recordings:
                 return None
             recording = recordings[0]
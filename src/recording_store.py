@@ -0,0 +1,283 @@
+"""
+Content-addressed store for call recordings, with retention and a disk quota.
+
+Each distinct recording is stored once as
+data/recordings/store/<sha256[:2]>/<sha256>.<ext>. A JSON manifest
+(data/recordings/manifest.json) maps each call SID to its blob, with size,
+codec and time stored. Lookups read only the manifest: a repeated
+recording-complete webhook finds the call already stored and skips the
+download, and retention runs without scanning the disk.
+
+With RECORDING_FORMAT=opus, new recordings are transcoded by ffmpeg to Opus
+in an Ogg container for long-term storage. Channels are kept, so per-speaker
+analytics still work. The result is roughly a tenth of the MP3 size.
+RECORDING_RETENTION_DAYS and RECORDING_QUOTA_MB evict the oldest recordings
+first after every store (0 disables either limit).
+
+Recordings saved before the store existed (data/recordings/<name>.mp3) are
+still listed, and `python manage_recordings.py --import-legacy` moves them in.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import threading
+from datetime import datetime, timedelta
+from typing import Any
+
+from src.utils import get_project_root, log
+
+# "mp3" keeps Twilio's download as is; "opus" transcodes for long-term storage
+RECORDING_FORMAT = os.getenv("RECORDING_FORMAT", "mp3").lower()
+OPUS_BITRATE = os.getenv("RECORDING_OPUS_BITRATE", "24k")
+# Evict recordings older than this many days / beyond this total size (0 = no limit)
+RETENTION_DAYS = float(os.getenv("RECORDING_RETENTION_DAYS", "0"))
+QUOTA_MB = float(os.getenv("RECORDING_QUOTA_MB", "0"))
+
+_EXTENSIONS = {"mp3": ".mp3", "opus": ".ogg"}
+
+
+def file_sha256(path: str) -> str:
+    """Hex SHA-256 of a file, read in chunks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def transcode_to_opus(source: str, target: str) -> None:
+    """Transcode a recording to Opus/Ogg with ffmpeg, keeping its channels."""
+    subprocess.run(
+        [
+            "ffmpeg", "-v", "error", "-y", "-i", source,
+            "-c:a", "libopus", "-b:a", OPUS_BITRATE, "-application", "voip", "-f", "ogg", target,
+        ],
+        check=True,
+        capture_output=True,
+    )
+
+
+class RecordingStore:
+    """Manifest-indexed, deduplicated recording storage."""
+
+    def __init__(self, recordings_dir: str | None = None) -> None:
+        self.recordings_dir = recordings_dir or os.path.join(get_project_root(), "data", "recordings")
+        self.store_dir = os.path.join(self.recordings_dir, "store")
+        self.manifest_path = os.path.join(self.recordings_dir, "manifest.json")
+        os.makedirs(self.store_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self._manifest: dict[str, dict[str, Any]] = {}
+        self._manifest_mtime: float | None = None
+
+    def _load(self) -> dict[str, dict[str, Any]]:
+        """Manifest entries by call SID, re-read if another process changed the file."""
+        try:
+            mtime = os.path.getmtime(self.manifest_path)
+        except FileNotFoundError:
+            return self._manifest
+        if mtime != self._manifest_mtime:
+            with open(self.manifest_path, "r") as f:
+                self._manifest = json.load(f)
+            self._manifest_mtime = mtime
+        return self._manifest
+
+    def _save(self) -> None:
+        tmp = f"{self.manifest_path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(self._manifest, f, indent=2)
+        os.replace(tmp, self.manifest_path)
+        self._manifest_mtime = os.path.getmtime(self.manifest_path)
+
+    def _blob_path(self, sha256: str, codec: str) -> str:
+        return os.path.join(self.store_dir, sha256[:2], f"{sha256}{_EXTENSIONS[codec]}")
+
+    def _path_of(self, entry: dict[str, Any]) -> str:
+        return os.path.join(self.recordings_dir, entry["file"])
+
+    def _release(self, entry: dict[str, Any]) -> int:
+        """Delete an entry's blob unless another call still references it; returns bytes freed."""
+        if any(other["file"] == entry["file"] for other in self._manifest.values()):
+            return 0
+        try:
+            os.remove(self._path_of(entry))
+            return entry["bytes"]
+        except FileNotFoundError:
+            return 0
+
+    def get(self, call_sid: str, verify: bool = False) -> str | None:
+        """
+        Path of a stored recording, if present and intact.
+
+        Args:
+            call_sid: Twilio call SID.
+            verify: Re-hash the blob instead of only checking its size.
+
+        Returns:
+            Blob path, or None if missing, truncated or (with verify) corrupted.
+        """
+        with self._lock:
+            entry = self._load().get(call_sid)
+        if not entry:
+            return None
+        path = self._path_of(entry)
+        try:
+            if os.path.getsize(path) != entry["bytes"]:
+                return None
+        except FileNotFoundError:
+            return None
+        if verify and file_sha256(path) != entry["sha256"]:
+            log("WARNING", f"Stored recording failed verification: {call_sid}")
+            return None
+        return path
+
+    def put(self, call_sid: str, source: str, source_sha256: str | None = None, codec: str = RECORDING_FORMAT) -> str:
+        """
+        Move a downloaded recording into the store.
+
+        The source file is consumed (moved, transcoded or deleted as a duplicate).
+
+        Args:
+            call_sid: Twilio call SID.
+            source: Path of the downloaded MP3.
+            source_sha256: Hash computed while downloading, if available.
+            codec: "mp3" or "opus".
+
+        Returns:
+            Path of the stored blob.
+        """
+        source_sha256 = source_sha256 or file_sha256(source)
+        stored = source
+        if codec == "opus":
+            stored = f"{source}.ogg"
+            try:
+                transcode_to_opus(source, stored)
+                os.remove(source)
+            except (OSError, subprocess.CalledProcessError) as e:
+                log("WARNING", "Opus transcode failed; storing MP3", str(e))
+                stored, codec = source, "mp3"
+        sha256 = source_sha256 if stored == source else file_sha256(stored)
+        blob = self._blob_path(sha256, codec)
+        os.makedirs(os.path.dirname(blob), exist_ok=True)
+        if os.path.exists(blob):
+            os.remove(stored)  # same content already stored
+        else:
+            shutil.move(stored, blob)
+
+        with self._lock:
+            manifest = self._load()
+            previous = manifest.pop(call_sid, None)
+            manifest[call_sid] = {
+                "sha256": sha256,
+                "source_sha256": source_sha256,
+                "file": os.path.relpath(blob, self.recordings_dir),
+                "bytes": os.path.getsize(blob),
+                "codec": codec,
+                "stored_at": datetime.now().isoformat(),
+            }
+            if previous and previous["file"] != manifest[call_sid]["file"]:
+                self._release(previous)
+            self._save()
+        self.enforce()
+        return blob
+
+    def transcode(self, call_sid: str) -> bool:
+        """
+        Re-store an MP3 entry as Opus (for recordings stored before RECORDING_FORMAT=opus).
+
+        Returns:
+            True if transcoded, False if missing, already Opus or ffmpeg failed.
+        """
+        path = self.get(call_sid)
+        with self._lock:
+            entry = self._load().get(call_sid)
+        if not path or not entry or entry["codec"] == "opus":
+            return False
+        tmp = os.path.join(self.store_dir, f".{call_sid}.ogg")
+        try:
+            transcode_to_opus(path, tmp)
+        except (OSError, subprocess.CalledProcessError) as e:
+            log("WARNING", f"Opus transcode failed for {call_sid}", str(e))
+            return False
+        sha256 = file_sha256(tmp)
+        blob = self._blob_path(sha256, "opus")
+        os.makedirs(os.path.dirname(blob), exist_ok=True)
+        os.replace(tmp, blob)
+        with self._lock:
+            manifest = self._load()
+            manifest[call_sid] = {
+                **entry, "sha256": sha256, "file": os.path.relpath(blob, self.recordings_dir),
+                "bytes": os.path.getsize(blob), "codec": "opus",
+            }
+            self._release(entry)
+            self._save()
+        return True
+
+    def enforce(self, retention_days: float = RETENTION_DAYS, quota_mb: float = QUOTA_MB) -> list[str]:
+        """
+        Evict recordings past the retention age, then the oldest until under the quota.
+
+        Args:
+            retention_days: Maximum age in days (0 = keep forever).
+            quota_mb: Maximum total size of stored blobs in MB (0 = unlimited).
+
+        Returns:
+            Call SIDs whose recordings were evicted.
+        """
+        if not retention_days and not quota_mb:
+            return []
+        evicted: list[str] = []
+        with self._lock:
+            manifest = self._load()
+            oldest_first = sorted(manifest, key=lambda sid: manifest[sid]["stored_at"])
+            sizes = {entry["file"]: entry["bytes"] for entry in manifest.values()}
+            total = sum(sizes.values())
+            cutoff = (datetime.now() - timedelta(days=retention_days)).isoformat() if retention_days else ""
+            for call_sid in oldest_first:
+                expired = manifest[call_sid]["stored_at"] < cutoff
+                over_quota = quota_mb and total > quota_mb * 1024 * 1024
+                if not expired and not over_quota:
+                    break
+                entry = manifest.pop(call_sid)
+                total -= self._release(entry)
+                evicted.append(call_sid)
+            if evicted:
+                self._save()
+        if evicted:
+            log("INFO", f"Evicted {len(evicted)} recordings", ", ".join(evicted))
+        return evicted
+
+    def import_legacy(self, codec: str = RECORDING_FORMAT) -> list[str]:
+        """Move pre-store recordings (data/recordings/<name>.mp3) into the store."""
+        imported = []
+        for name in sorted(os.listdir(self.recordings_dir)):
+            if name.endswith(".mp3"):
+                self.put(name[:-len(".mp3")], os.path.join(self.recordings_dir, name), codec=codec)
+                imported.append(name[:-len(".mp3")])
+        return imported
+
+    def list_recordings(self) -> dict[str, str]:
+        """
+        Every available recording by call SID (store entries and legacy MP3s).
+
+        Returns:
+            {call_sid: path}, sorted by call SID.
+        """
+        with self._lock:
+            paths = {sid: self._path_of(entry) for sid, entry in self._load().items()}
+        for name in os.listdir(self.recordings_dir):
+            if name.endswith(".mp3"):
+                paths.setdefault(name[:-len(".mp3")], os.path.join(self.recordings_dir, name))
+        return dict(sorted(paths.items()))
+
+    def usage(self) -> dict[str, Any]:
+        """Entry count, distinct blobs, bytes on disk and per-codec counts."""
+        with self._lock:
+            manifest = dict(self._load())
+        blobs = {entry["file"]: entry["bytes"] for entry in manifest.values()}
+        codecs: dict[str, int] = {}
+        for entry in manifest.values():
+            codecs[entry["codec"]] = codecs.get(entry["codec"], 0) + 1
+        return {"recordings": len(manifest), "blobs": len(blobs), "bytes": sum(blobs.values()), "codecs": codecs}
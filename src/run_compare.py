@@ -0,0 +1,385 @@
+"""
+Run-over-run comparison of campaign transcripts.
+
+When the clinic agent ships a new version, every scenario is run again. This
+module compares the new run (candidate) with the previous one (baseline) per
+scenario:
+
+- Agent utterances from both runs are clustered into behaviors by
+  near-duplicate detection: word-bigram shingles, MinHash signatures
+  (NUM_PERM hashes) and LSH banding (BANDS x ROWS), so only utterances that
+  share a band bucket are ever compared. Identical normalized utterances are
+  hashed once. The cost grows with the number of distinct utterances, not
+  with pairs of transcripts.
+- A behavior is present in a run when it shows up in at least MIN_SHARE of
+  the scenario's calls. Behaviors present only in the candidate are "new",
+  ones present only in the baseline "vanished", and ones whose share moved by
+  SHIFT_SHARE or more "shifted".
+- Turns are aligned by position and intent: each run's dominant behavior per
+  agent turn index forms a sequence, and the two sequences are aligned
+  (difflib), so an inserted step is reported once as "inserted" rather than
+  as every later turn changing. Turns whose behavior differs are "replaced"
+  (e.g. turn 1 asked for the DOB and now asks for the phone number).
+- Mean turn count (flagged when it moves by TURN_SHIFT or more) and end
+  reason shares (flagged when one moves by SHIFT_SHARE) are compared.
+
+Runs are picked by selectors (select_run): a directory of transcripts, a
+campaign from the call queue, a time range of call starts, or the most recent
+runs found by splitting data/transcripts/ wherever calls are more than
+RUN_GAP_MINUTES apart.
+"""
+
+import os
+import re
+import statistics
+import zlib
+from collections import Counter, defaultdict
+from datetime import datetime
+from difflib import SequenceMatcher
+from typing import Any, Iterable
+
+import numpy as np
+
+from src.transcript_manager import TranscriptManager
+
+RUN_GAP_MINUTES = float(os.getenv("RUN_GAP_MINUTES", "60"))
+NUM_PERM = 64
+# 32 bands of 2 rows: pairs become candidates from a Jaccard similarity of about
+# (1/BANDS) ** (1/ROWS) = 0.18, well below CLUSTER_THRESHOLD, so pairs just above
+# the threshold almost always share a bucket (0.625 -> 99.9%)
+BANDS = 32
+ROWS = NUM_PERM // BANDS
+# Estimated Jaccard similarity for two utterances to be the same behavior
+CLUSTER_THRESHOLD = 0.5
+# Share of a scenario's calls a behavior needs to count as present in a run
+MIN_SHARE = 0.2
+# Change in share reported as a shift for behaviors present in both runs
+SHIFT_SHARE = 0.3
+# Change in mean turn count reported as a shift
+TURN_SHIFT = 2.0
+TURN_CAP = 25
+
+_MASK = np.uint64(0xFFFFFFFF)
+# Shingle x permutation products computed per chunk (bounds peak memory)
+_CHUNK = 1 << 18
+_NON_WORD = re.compile(r"[^a-z# ]+")
+_DIGITS = re.compile(r"\d+")
+
+
+def normalize_utterance(text: str) -> str:
+    """Lowercase, numbers to '#', punctuation dropped, whitespace collapsed."""
+    text = _DIGITS.sub("#", text.lower())
+    return " ".join(_NON_WORD.sub(" ", text).split())
+
+
+def shingles(normalized: str) -> list[int]:
+    """32-bit hashes of the word bigrams (single word: the word itself)."""
+    words = normalized.split()
+    grams = [f"{a} {b}" for a, b in zip(words, words[1:])] or words
+    return sorted({zlib.crc32(gram.encode()) for gram in grams})
+
+
+class MinHasher:
+    """MinHash signatures with NUM_PERM universal hashes (a * x + b) mod 2**32."""
+
+    def __init__(self, num_perm: int = NUM_PERM, seed: int = 1) -> None:
+        rng = np.random.default_rng(seed)
+        self.a = rng.integers(1, 1 << 32, num_perm, dtype=np.uint64) | np.uint64(1)
+        self.b = rng.integers(0, 1 << 32, num_perm, dtype=np.uint64)
+        self.num_perm = num_perm
+
+    def signatures(self, shingle_sets: list[list[int]]) -> np.ndarray:
+        """(len(shingle_sets), num_perm) uint32 signatures; empty sets get all-ones rows."""
+        sigs = np.full((len(shingle_sets), self.num_perm), 0xFFFFFFFF, dtype=np.uint32)
+        start = 0
+        while start < len(shingle_sets):
+            # Take whole utterances until the chunk is full
+            end, size, limit = start, 0, _CHUNK // self.num_perm
+            while end < len(shingle_sets) and (size == 0 or size + len(shingle_sets[end]) <= limit):
+                size += len(shingle_sets[end])
+                end += 1
+            rows = [i for i in range(start, end) if shingle_sets[i]]
+            if rows:
+                values = np.fromiter((h for i in rows for h in shingle_sets[i]), dtype=np.uint64)
+                offsets = np.cumsum([0] + [len(shingle_sets[i]) for i in rows[:-1]])
+                # uint64 wraps mod 2**64, so masking gives the exact product mod 2**32
+                hashed = (values[:, None] * self.a[None, :] + self.b[None, :]) & _MASK
+                sigs[rows] = np.minimum.reduceat(hashed, offsets, axis=0).astype(np.uint32)
+            start = end
+        return sigs
+
+
+def cluster_signatures(sigs: np.ndarray, threshold: float = CLUSTER_THRESHOLD) -> np.ndarray:
+    """
+    Cluster label per signature row via LSH banding and union-find.
+
+    Each row is compared with the first row of every band bucket it falls in
+    (the bucket head), so large buckets cost linear, not quadratic, work.
+    """
+    n = len(sigs)
+    rows = np.arange(n)
+    edges = []
+    for band in range(BANDS):
+        block = np.ascontiguousarray(sigs[:, band * ROWS:(band + 1) * ROWS])
+        keys = block.view(np.dtype((np.void, block.dtype.itemsize * ROWS))).ravel()
+        _, first, inverse = np.unique(keys, return_index=True, return_inverse=True)
+        heads = first[inverse.ravel()]
+        members = rows[heads != rows]
+        if not len(members):
+            continue
+        similar = (sigs[members] == sigs[heads[members]]).mean(axis=1) >= threshold
+        edges.append(np.stack([members[similar], heads[members[similar]]], axis=1))
+
+    parent = list(range(n))
+
+    def find(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    if edges:
+        pairs = np.concatenate(edges).astype(np.int64)
+        for key in np.unique(pairs[:, 0] * n + pairs[:, 1]).tolist():
+            root_a, root_b = find(key // n), find(key % n)
+            if root_a != root_b:
+                parent[root_a] = root_b
+    return np.array([find(i) for i in range(n)])
+
+
+def cluster_utterances(texts: list[str], threshold: float = CLUSTER_THRESHOLD) -> list[int]:
+    """Behavior cluster id per utterance (near-duplicates share an id)."""
+    normalized = [normalize_utterance(text) for text in texts]
+    unique = list(dict.fromkeys(normalized))
+    index = {text: i for i, text in enumerate(unique)}
+    sigs = MinHasher().signatures([shingles(text) for text in unique])
+    labels = cluster_signatures(sigs, threshold)
+    return [int(labels[index[text]]) for text in normalized]
+
+
+def call_started(transcript: dict[str, Any]) -> datetime | None:
+    """When a call started: its first turn, else its completion or save time."""
+    turns = transcript.get("transcript") or []
+    for value in (turns[0].get("timestamp") if turns else None, transcript.get("completed_at"),
+                  transcript.get("timestamp")):
+        if value:
+            try:
+                return datetime.fromisoformat(value)
+            except ValueError:
+                continue
+    return None
+
+
+def end_reason(transcript: dict[str, Any]) -> str:
+    """Why a call ended, from the saved end_reason or inferred for older transcripts."""
+    reason = transcript.get("end_reason") or (transcript.get("dry_run") or {}).get("end_reason")
+    if reason:
+        return reason
+    if transcript.get("turn_count", 0) >= TURN_CAP:
+        return "turn_cap"
+    return "hangup" if transcript.get("status") == "completed" else transcript.get("status", "unknown")
+
+
+def load_transcripts(directory: str | None = None) -> dict[str, dict[str, Any]]:
+    """Every transcript with turns in a directory (default data/transcripts/, both tiers)."""
+    manager = TranscriptManager()
+    if directory:
+        manager.transcripts_dir = directory
+    transcripts = {}
+    for key in manager.list_transcripts():
+        transcript = manager.load_transcript(key)
+        if transcript and transcript.get("transcript"):
+            transcripts[key] = transcript
+    return transcripts
+
+
+def split_runs(
+    transcripts: dict[str, dict[str, Any]], gap_minutes: float = RUN_GAP_MINUTES
+) -> list[dict[str, dict[str, Any]]]:
+    """Group transcripts into runs, oldest first, wherever call starts are more than gap_minutes apart."""
+    dated = sorted(
+        ((started, key) for key, t in transcripts.items() if (started := call_started(t)) is not None)
+    )
+    runs: list[dict[str, dict[str, Any]]] = []
+    previous: datetime | None = None
+    for started, key in dated:
+        if previous is None or (started - previous).total_seconds() > gap_minutes * 60:
+            runs.append({})
+        runs[-1][key] = transcripts[key]
+        previous = started
+    return runs
+
+
+def _parse_time(value: str) -> datetime | None:
+    return datetime.fromisoformat(value) if value else None
+
+
+def select_run(selector: str, transcripts: dict[str, dict[str, Any]] | None = None) -> dict[str, dict[str, Any]]:
+    """
+    Transcripts of one run.
+
+    Args:
+        selector: A directory of transcripts; "campaign:NAME" (calls of a
+            queued campaign); "FROM..TO" ISO times of call start, either side
+            optional; or "last" / "last-N" (Nth most recent run by gap).
+        transcripts: data/transcripts/ contents, loaded once by the caller.
+
+    Returns:
+        Transcripts by key.
+
+    Raises:
+        ValueError: If the selector matches nothing it can read.
+    """
+    if os.path.isdir(selector):
+        return load_transcripts(selector)
+    transcripts = transcripts if transcripts is not None else load_transcripts()
+    if selector.startswith("campaign:"):
+        from src.call_queue import QUEUE_PATH, CallQueue
+
+        if not os.path.exists(QUEUE_PATH):
+            raise ValueError(f"No call queue at {QUEUE_PATH}")
+        sids = set(CallQueue().call_sids(selector.split(":", 1)[1]))
+        return {key: t for key, t in transcripts.items() if t.get("call_sid", key) in sids}
+    if ".." in selector:
+        since, until = (_parse_time(part) for part in selector.split("..", 1))
+        return {
+            key: t for key, t in transcripts.items()
+            if (started := call_started(t)) is not None
+            and (since is None or started >= since) and (until is None or started < until)
+        }
+    if selector == "last" or selector.startswith("last-"):
+        back = int(selector[5:] or 0) if selector != "last" else 0
+        runs = split_runs(transcripts)
+        if back >= len(runs):
+            raise ValueError(f"Found {len(runs)} run(s) in data/transcripts/, cannot select {selector}")
+        return runs[-1 - back]
+    raise ValueError(f"Unknown run selector: {selector}")
+
+
+def _share(counts: Counter, calls: int) -> dict[int, float]:
+    return {cluster: n / calls for cluster, n in counts.items()} if calls else {}
+
+
+def _mean(values: Iterable[float]) -> float | None:
+    values = list(values)
+    return round(statistics.mean(values), 1) if values else None
+
+
+def _dominant_sequence(sequences: list[list[int]], min_share: float) -> list[int]:
+    """Most common behavior per agent turn index; -1 where no behavior reaches min_share."""
+    dominant = []
+    for position in range(max((len(seq) for seq in sequences), default=0)):
+        cluster, n = Counter(seq[position] for seq in sequences if len(seq) > position).most_common(1)[0]
+        dominant.append(cluster if n / len(sequences) >= min_share else -1)
+    return dominant
+
+
+def compare_runs(
+    baseline: dict[str, dict[str, Any]],
+    candidate: dict[str, dict[str, Any]],
+    threshold: float = CLUSTER_THRESHOLD,
+    min_share: float = MIN_SHARE,
+) -> dict[str, Any]:
+    """
+    Compare agent behavior per scenario between two runs.
+
+    Args:
+        baseline: Transcripts of the previous run, by key.
+        candidate: Transcripts of the new run, by key.
+        threshold: Similarity for two utterances to be one behavior.
+        min_share: Share of calls a behavior needs to count as present.
+
+    Returns:
+        {"baseline": {"calls"}, "candidate": {"calls"}, "behaviors": N,
+        "scenarios": {name: {calls, turns, turn_shift, end_reasons,
+        end_reason_shift, new, vanished, shifted, changed}}}.
+    """
+    runs = {"baseline": baseline, "candidate": candidate}
+    # (run, key, scenario, agent turn position, text) of every agent utterance
+    rows: list[tuple[str, str, str, int, str]] = []
+    for run, transcripts in runs.items():
+        for key, t in transcripts.items():
+            agent_turns = [turn.get("text", "") for turn in t["transcript"] if turn.get("speaker") == "agent"]
+            rows += [(run, key, t.get("scenario_name", "unknown"), i, text) for i, text in enumerate(agent_turns)]
+    labels = cluster_utterances([row[4] for row in rows], threshold)
+
+    examples: dict[int, Counter] = defaultdict(Counter)
+    # scenario -> run -> key -> [cluster per position]
+    calls: dict[str, dict[str, dict[str, list[int]]]] = defaultdict(lambda: {run: defaultdict(list) for run in runs})
+    for (run, key, scenario, _, text), label in zip(rows, labels):
+        examples[label][text] += 1
+        calls[scenario][run][key].append(label)
+    for run, transcripts in runs.items():
+        for key, t in transcripts.items():
+            calls[t.get("scenario_name", "unknown")][run].setdefault(key, [])
+
+    def describe(cluster: int) -> str:
+        return examples[cluster].most_common(1)[0][0]
+
+    scenarios: dict[str, Any] = {}
+    for scenario in sorted(calls):
+        by_run = calls[scenario]
+        count = {run: len(by_run[run]) for run in runs}
+        share = {
+            run: _share(Counter(c for seq in by_run[run].values() for c in set(seq)), count[run]) for run in runs
+        }
+        base, cand = share["baseline"], share["candidate"]
+        turns = {run: _mean(runs[run][key].get("turn_count", 0) for key in by_run[run]) for run in runs}
+        reasons = {run: Counter(end_reason(runs[run][key]) for key in by_run[run]) for run in runs}
+        result: dict[str, Any] = {
+            "calls": count,
+            "turns": turns,
+            "turn_shift": False,
+            "end_reasons": {run: dict(reasons[run].most_common()) for run in runs},
+            "end_reason_shift": [],
+            "new": [], "vanished": [], "shifted": [], "changed": [],
+        }
+        if count["baseline"] and count["candidate"]:
+            result["turn_shift"] = abs(turns["candidate"] - turns["baseline"]) >= TURN_SHIFT
+            for reason in reasons["baseline"] | reasons["candidate"]:
+                before = reasons["baseline"][reason] / count["baseline"]
+                after = reasons["candidate"][reason] / count["candidate"]
+                if abs(after - before) >= SHIFT_SHARE:
+                    result["end_reason_shift"].append(
+                        {"end_reason": reason, "baseline": round(before, 2), "candidate": round(after, 2)}
+                    )
+            for cluster in sorted(set(base) | set(cand), key=lambda c: -(cand.get(c, 0) + base.get(c, 0))):
+                before, after = base.get(cluster, 0.0), cand.get(cluster, 0.0)
+                entry = {"behavior": describe(cluster), "baseline": round(before, 2), "candidate": round(after, 2)}
+                if before == 0 and after >= min_share:
+                    result["new"].append(entry)
+                elif after == 0 and before >= min_share:
+                    result["vanished"].append(entry)
+                elif before and after and abs(after - before) >= SHIFT_SHARE:
+                    result["shifted"].append(entry)
+            before = _dominant_sequence(list(by_run["baseline"].values()), min_share)
+            after = _dominant_sequence(list(by_run["candidate"].values()), min_share)
+            ops = {"replace": "replaced", "insert": "inserted", "delete": "removed"}
+            for op, b1, b2, c1, c2 in SequenceMatcher(None, before, after, autojunk=False).get_opcodes():
+                if op == "equal":
+                    continue
+                for offset in range(max(b2 - b1, c2 - c1)):
+                    b, c = b1 + offset, c1 + offset
+                    base_cluster = before[b] if b < b2 else None
+                    cand_cluster = after[c] if c < c2 else None
+                    # Turns with no dominant behavior on either side are noise, not a change
+                    if base_cluster == -1 or cand_cluster == -1:
+                        continue
+                    result["changed"].append({
+                        "change": ops[op] if base_cluster is not None and cand_cluster is not None else (
+                            "inserted" if base_cluster is None else "removed"
+                        ),
+                        "baseline_turn": b if base_cluster is not None else None,
+                        "candidate_turn": c if cand_cluster is not None else None,
+                        "baseline": describe(base_cluster) if base_cluster is not None else None,
+                        "candidate": describe(cand_cluster) if cand_cluster is not None else None,
+                    })
+        scenarios[scenario] = result
+
+    return {
+        "baseline": {"calls": len(baseline)},
+        "candidate": {"calls": len(candidate)},
+        "utterances": len(rows),
+        "behaviors": len(set(labels)),
+        "scenarios": scenarios,
+    }
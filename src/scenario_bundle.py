@@ -0,0 +1,209 @@
+"""
+Precompiled scenario bundle and scenario schema validation.
+
+`python compile_scenarios.py` (scenario_loader.compile_scenarios) validates
+every scenario, normalizes it, and pre-renders its behavior text. It then
+writes them all to one binary file, data/scenarios.bundle.
+
+The server reads that file in a single read at startup. load_scenario then
+serves scenarios from memory instead of parsing YAML on every call.
+
+The bundle records the size and mtime of every source it was built from,
+including the scenario YAML and the loader code. If any of them changed, or
+a scenario file was added or removed, the bundle is stale and is ignored, so
+the YAML files are always authoritative. Each scenario is stored as its own
+pickle, so every caller gets a fresh copy it can mutate.
+"""
+
+import os
+import pickle
+from datetime import datetime
+from typing import Any
+
+from src.utils import get_project_root
+
+BUNDLE_PATH = os.path.join(get_project_root(), "data", "scenarios.bundle")
+# Bump when the bundle layout or normalized scenario shape changes
+BUNDLE_FORMAT = 1
+
+_TEST_TYPES = ("standard", "edge_case")
+_STRING_FIELDS = ("description", "goal", "context", "system_prompt_addendum", "name")
+_CONTEXT_STRINGS = ("name", "claimed_name", "caller_name", "dob", "phone", "goal", "background", "behavior")
+_CONTEXT_LISTS = ("anti_repetition", "question_priority", "tone")
+_ENDPOINTING_INTS = ("timeout", "first_turn_timeout")
+
+_cache: dict[str, Any] = {"mtime": None, "bundle": None}
+
+
+def _check_strings(errors: list[str], data: dict[str, Any], keys: tuple[str, ...], where: str) -> None:
+    for key in keys:
+        if key in data and not isinstance(data[key], str):
+            errors.append(f"{where}{key} must be a string, got {type(data[key]).__name__}")
+
+
+def validate_scenario(data: Any) -> list[str]:
+    """
+    Check a scenario (YAML file contents or scenarios.yaml entry) against the schema.
+
+    Args:
+        data: Parsed YAML for one scenario.
+
+    Returns:
+        Human-readable errors; empty if the scenario is valid.
+    """
+    if not isinstance(data, dict):
+        return [f"scenario must be a mapping, got {type(data).__name__}"]
+    errors: list[str] = []
+    _check_strings(errors, data, _STRING_FIELDS, "")
+    if "test_type" in data and data["test_type"] not in _TEST_TYPES:
+        errors.append(f"test_type must be one of {', '.join(_TEST_TYPES)}, got {data['test_type']!r}")
+    if "patient_context" not in data and not data.get("goal"):
+        errors.append("needs either patient_context or goal")
+
+    context = data.get("patient_context")
+    if context is not None:
+        if not isinstance(context, dict):
+            errors.append("patient_context must be a mapping")
+        else:
+            _check_strings(errors, context, _CONTEXT_STRINGS, "patient_context.")
+            for key in _CONTEXT_LISTS:
+                value = context.get(key)
+                if value is not None and not (isinstance(value, list) and all(isinstance(v, str) for v in value)):
+                    errors.append(f"patient_context.{key} must be a list of strings")
+            if not (context.get("goal") or data.get("goal")):
+                errors.append("patient_context.goal (or top-level goal) is required")
+            stages = context.get("response_stages")
+            if stages is not None and not isinstance(stages, dict):
+                errors.append("patient_context.response_stages must be a mapping")
+            for key, stage in (stages or {}).items() if isinstance(stages, dict) else ():
+                where = f"patient_context.response_stages.{key}"
+                if not isinstance(stage, dict):
+                    errors.append(f"{where} must be a mapping with trigger/examples")
+                    continue
+                if not isinstance(stage.get("trigger"), str) or not stage["trigger"].strip():
+                    errors.append(f"{where}.trigger is required")
+                examples = stage.get("examples", [])
+                if not (isinstance(examples, list) and all(isinstance(e, str) for e in examples)):
+                    errors.append(f"{where}.examples must be a list of strings")
+
+    endpointing = data.get("endpointing")
+    if endpointing is not None:
+        # Imported here so the CLI path (test_call) stays light
+        from src.endpointing import _parse_speech_timeout
+
+        if not isinstance(endpointing, dict):
+            errors.append("endpointing must be a mapping")
+        else:
+            if "speech_timeout" in endpointing:
+                try:
+                    _parse_speech_timeout(endpointing["speech_timeout"])
+                except ValueError as e:
+                    errors.append(f"endpointing.{e}")
+            for key in _ENDPOINTING_INTS:
+                if key in endpointing and not (isinstance(endpointing[key], int) and endpointing[key] > 0):
+                    errors.append(f"endpointing.{key} must be a positive integer")
+    return errors
+
+
+def source_fingerprint() -> list[tuple[str, int, int]]:
+    """
+    (file, mtime_ns, size) of every source a compiled scenario depends on:
+    scenario YAML and the loader code. Any change makes the bundle stale.
+    """
+    root = get_project_root()
+    fingerprint = []
+    with os.scandir(os.path.join(root, "scenarios")) as entries:
+        for entry in entries:
+            if entry.name.endswith(".yaml"):
+                stat = entry.stat()
+                fingerprint.append((f"scenarios/{entry.name}", stat.st_mtime_ns, stat.st_size))
+    fingerprint.sort()
+    for name, path in (
+        ("scenarios.yaml", os.path.join(root, "scenarios.yaml")),
+        ("src/scenario_loader.py", os.path.join(root, "src", "scenario_loader.py")),
+        ("src/scenario_bundle.py", __file__),
+    ):
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            continue
+        fingerprint.append((name, stat.st_mtime_ns, stat.st_size))
+    return fingerprint
+
+
+def write_bundle(
+    scenarios: dict[str, dict[str, Any]],
+    invalid: dict[str, list[str]],
+    fingerprint: list[tuple[str, int, int]],
+    path: str = BUNDLE_PATH,
+) -> str:
+    """
+    Write compiled scenarios to the bundle file (atomically).
+
+    Args:
+        scenarios: Normalized scenarios by name, in listing order.
+        invalid: Validation errors by scenario name (kept so loads fail loudly).
+        fingerprint: source_fingerprint() taken before the sources were read.
+        path: Bundle file.
+
+    Returns:
+        The bundle path.
+    """
+    payload = {
+        "format": BUNDLE_FORMAT,
+        "compiled_at": datetime.now().isoformat(),
+        "fingerprint": fingerprint,
+        "scenarios": {name: pickle.dumps(s, protocol=pickle.HIGHEST_PROTOCOL) for name, s in scenarios.items()},
+        "invalid": invalid,
+    }
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(pickle.dumps(payload, protocol=pickle.HIGHEST_PROTOCOL))
+    os.replace(tmp, path)
+    return path
+
+
+def read_bundle(path: str = BUNDLE_PATH) -> dict[str, Any] | None:
+    """
+    The current bundle if it exists and matches the sources, else None.
+
+    The file is read once and kept in memory until it changes on disk; the
+    source fingerprint is re-checked on every call.
+    """
+    try:
+        mtime = os.path.getmtime(path)
+    except FileNotFoundError:
+        return None
+    if _cache["mtime"] != mtime:
+        with open(path, "rb") as f:
+            bundle = pickle.loads(f.read())
+        _cache.update(mtime=mtime, bundle=bundle if bundle.get("format") == BUNDLE_FORMAT else None)
+    bundle = _cache["bundle"]
+    if bundle is None or [tuple(entry) for entry in bundle["fingerprint"]] != source_fingerprint():
+        return None
+    return bundle
+
+
+def bundled_scenario(name: str) -> dict[str, Any] | None:
+    """
+    A fresh copy of a compiled scenario, or None if the bundle is missing, stale or lacks it.
+
+    Raises:
+        ValueError: If the scenario failed validation when the bundle was compiled.
+    """
+    bundle = read_bundle()
+    if bundle is None:
+        return None
+    if name in bundle["invalid"]:
+        raise ValueError(f"Invalid scenario {name}: " + "; ".join(bundle["invalid"][name]))
+    blob = bundle["scenarios"].get(name)
+    return pickle.loads(blob) if blob is not None else None
+
+
+def bundled_scenarios() -> list[dict[str, Any]] | None:
+    """Every valid compiled scenario in listing order, or None without a fresh bundle."""
+    bundle = read_bundle()
+    if bundle is None:
+        return None
+    return [pickle.loads(blob) for blob in bundle["scenarios"].values()]
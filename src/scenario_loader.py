@@ -4,14 +4,27 @@ Scenario loader and selector.
 Loads test scenarios from YAML. Supports:
 - scenarios.yaml (legacy): list of scenarios with patient_context
 - scenarios/<name>.yaml (new): individual files with description, goal, context
+
+Both are compiled into data/scenarios.bundle (src.scenario_bundle) by
+compile_scenarios(); while the bundle is fresh, scenarios are served from it
+and the YAML is only read when it has changed.
 """
 
 import os
 from pathlib import Path
-from typing import Any
+from types import MappingProxyType
+from typing import Any, Mapping
 
 import yaml
 
+from src.scenario_bundle import (
+    bundled_scenario,
+    bundled_scenarios,
+    read_bundle,
+    source_fingerprint,
+    validate_scenario,
+    write_bundle,
+)
 from src.utils import get_project_root, log
 
 
@@ -79,19 +92,23 @@ def _normalize_scenario_from_file(data: dict[str, Any], name: str) -> dict[str,
     }
     if test_type == "edge_case":
         patient_context["behavior"] = context
-    return {
+    scenario = {
         "name": name,
         "description": data.get("description", ""),
         "test_type": test_type,
         "patient_context": patient_context,
     }
+    if "endpointing" in data:
+        scenario["endpointing"] = data["endpointing"]
+    return scenario
 
 
 def load_scenario(scenario_name: str) -> dict[str, Any]:
     """
     Load a single scenario from file.
 
-    Tries scenarios/<scenario_name>.yaml first, then falls back to scenarios.yaml.
+    Uses the compiled bundle when it is fresh; otherwise tries
+    scenarios/<scenario_name>.yaml first, then falls back to scenarios.yaml.
 
     Args:
         scenario_name: Scenario name (without .yaml extension).
@@ -101,7 +118,11 @@ def load_scenario(scenario_name: str) -> dict[str, Any]:
 
     Raises:
         FileNotFoundError: If scenario not found.
+        ValueError: If the compiled bundle marks the scenario invalid.
     """
+    scenario = bundled_scenario(scenario_name)
+    if scenario is not None:
+        return scenario
     root = get_project_root()
     scenario_path = Path(root) / "scenarios" / f"{scenario_name}.yaml"
     if scenario_path.exists():
@@ -166,18 +187,47 @@ def get_scenario_by_name(name: str, yaml_file: str | None = None) -> dict[str, A
         raise ValueError(f"Scenario not found: {name}")
 
 
-def list_scenarios(yaml_file: str | None = None) -> list[dict[str, Any]]:
+# Read-only scenarios shared by every call session: name -> (source fingerprint, scenario)
+_shared: dict[str, tuple[list[tuple[str, int, int]], Mapping[str, Any]]] = {}
+
+
+def _freeze(value: Any) -> Any:
+    if isinstance(value, dict):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+def shared_scenario(name: str) -> Mapping[str, Any]:
     """
-    Print all available scenarios and return list.
+    Get a scenario as one read-only object shared by every caller.
 
-    Merges scenarios from scenarios.yaml and scenarios/*.yaml files.
+    Live calls only read their scenario, so sessions share this copy instead of
+    each holding its own. Mappings are read-only views and lists are tuples. The
+    copy is reloaded when any scenario source changes. Use get_scenario_by_name
+    for a private, mutable copy.
 
     Args:
-        yaml_file: Optional path to YAML. Defaults to project scenarios.yaml.
+        name: Scenario name key.
 
     Returns:
-        List of scenario dicts.
+        Read-only scenario mapping.
+
+    Raises:
+        ValueError: If scenario name not found.
     """
+    fingerprint = source_fingerprint()
+    cached = _shared.get(name)
+    if cached is not None and cached[0] == fingerprint:
+        return cached[1]
+    scenario = _freeze(get_scenario_by_name(name))
+    _shared[name] = (fingerprint, scenario)
+    return scenario
+
+
+def _read_all_scenarios(yaml_file: str | None = None) -> list[dict[str, Any]]:
+    """Merge scenarios from scenarios.yaml and scenarios/*.yaml (first definition of a name wins)."""
     root = get_project_root()
     scenarios_dir = Path(root) / "scenarios"
     seen_names: set[str] = set()
@@ -206,6 +256,31 @@ def list_scenarios(yaml_file: str | None = None) -> list[dict[str, Any]]:
                     scenarios.append(_normalize_scenario_from_file(data, name))
                 except Exception as e:
                     log("WARNING", f"Could not load {path.name}", str(e))
+    return scenarios
+
+
+def all_scenarios(yaml_file: str | None = None) -> list[dict[str, Any]]:
+    """Every scenario (from the compiled bundle when it is fresh), without printing."""
+    scenarios = bundled_scenarios() if yaml_file is None else None
+    if scenarios is None:
+        scenarios = _read_all_scenarios(yaml_file)
+    return scenarios
+
+
+def list_scenarios(yaml_file: str | None = None) -> list[dict[str, Any]]:
+    """
+    Print all available scenarios and return list.
+
+    Merges scenarios from scenarios.yaml and scenarios/*.yaml files (from the
+    compiled bundle when it is fresh).
+
+    Args:
+        yaml_file: Optional path to YAML. Defaults to project scenarios.yaml.
+
+    Returns:
+        List of scenario dicts.
+    """
+    scenarios = all_scenarios(yaml_file)
 
     log("INFO", f"Loaded {len(scenarios)} scenarios. Available:")
     for scenario in scenarios:
@@ -213,3 +288,72 @@ def list_scenarios(yaml_file: str | None = None) -> list[dict[str, Any]]:
         desc = scenario.get("description", "No description")
         print(f"         - {scenario['name']} ({test_type}): {desc}")
     return scenarios
+
+
+def compile_scenarios(write: bool = True) -> tuple[dict[str, dict[str, Any]], dict[str, list[str]]]:
+    """
+    Validate and normalize every scenario, and write the bundle.
+
+    Scenarios that fail validation are left out of the compiled set and
+    recorded in the bundle as invalid, so loading one raises with the reason.
+
+    Args:
+        write: Write data/scenarios.bundle (False only validates).
+
+    Returns:
+        (compiled scenarios by name, validation errors by name).
+    """
+    fingerprint = source_fingerprint()
+    compiled: dict[str, dict[str, Any]] = {}
+    invalid: dict[str, list[str]] = {}
+
+    def add(name: str, data: Any, from_file: bool) -> None:
+        errors = validate_scenario(data)
+        if not errors:
+            try:
+                compiled[name] = _normalize_scenario_from_file(data, name) if from_file else data
+                invalid.pop(name, None)
+                return
+            except Exception as e:
+                errors = [f"could not normalize: {e}"]
+        compiled.pop(name, None)
+        invalid[name] = errors
+
+    # scenarios/<name>.yaml overrides a scenarios.yaml entry of the same name, as in load_scenario
+    try:
+        for entry in load_scenarios():
+            if isinstance(entry, dict) and entry.get("name"):
+                add(entry["name"], entry, from_file=False)
+    except FileNotFoundError:
+        pass
+    for path in sorted((Path(get_project_root()) / "scenarios").glob("*.yaml")):
+        try:
+            with open(path, "r") as f:
+                data = yaml.safe_load(f) or {}
+        except yaml.YAMLError as e:
+            compiled.pop(path.stem, None)
+            invalid[path.stem] = [f"YAML parse error: {e}"]
+            continue
+        add(path.stem, data, from_file=True)
+
+    if write:
+        write_bundle(compiled, invalid, fingerprint)
+    return compiled, invalid
+
+
+def prepare_scenarios() -> None:
+    """
+    Load the scenario bundle at server startup, recompiling it first if stale.
+
+    Logs every invalid scenario so it is found before a call uses it.
+    """
+    bundle = read_bundle()
+    if bundle is None:
+        compile_scenarios()
+        bundle = read_bundle()
+    if bundle is None:
+        log("WARNING", "Scenario bundle unavailable; loading scenarios from YAML")
+        return
+    for name, errors in bundle["invalid"].items():
+        log("ERROR", f"Invalid scenario: {name}", "; ".join(errors))
+    log("INFO", f"Scenario bundle loaded: {len(bundle['scenarios'])} scenarios", bundle["compiled_at"])
@@ -0,0 +1,143 @@
+"""
+Speculative patient reply generation from Gather partial results.
+
+When SPECULATIVE_REPLIES=true, Gather posts partial STT results to
+/partial-agent-speech while the agent is still talking. Each time the stable
+part of the transcript grows enough, a reply is drafted in the background.
+When the final SpeechResult arrives, the draft is reused if the texts match
+closely enough and discarded otherwise.
+"""
+
+import difflib
+import os
+import re
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any
+
+from src.conversation import ConversationManager
+from src.utils import log
+
+SPECULATIVE_REPLIES = os.getenv("SPECULATIVE_REPLIES", "false").lower() == "true"
+# Minimum word-level similarity between the speculated text and the final result
+SPECULATION_MATCH_THRESHOLD = float(os.getenv("SPECULATION_MATCH_THRESHOLD", "0.9"))
+# Stable partials shorter than this are too ambiguous to speculate on
+SPECULATION_MIN_WORDS = int(os.getenv("SPECULATION_MIN_WORDS", "4"))
+
+_executor = ThreadPoolExecutor(max_workers=int(os.getenv("SPECULATION_WORKERS", "4")))
+
+_WORD_RE = re.compile(r"[a-z0-9']+")
+
+
+def _words(text: str) -> list[str]:
+    """Lowercase word tokens with punctuation removed."""
+    return _WORD_RE.findall(text.lower())
+
+
+def text_similarity(a: str, b: str) -> float:
+    """
+    Word-level similarity ratio between two utterances (0-1).
+
+    Args:
+        a: First utterance.
+        b: Second utterance.
+
+    Returns:
+        1.0 for identical word sequences, lower as they diverge.
+    """
+    wa, wb = _words(a), _words(b)
+    if not wa and not wb:
+        return 1.0
+    return difflib.SequenceMatcher(None, wa, wb, autojunk=False).ratio()
+
+
+class ReplySpeculator:
+    """Per-call speculative draft of the next patient reply."""
+
+    def __init__(self, conversation_manager: ConversationManager) -> None:
+        self.conversation_manager = conversation_manager
+        self._lock = threading.Lock()
+        self._text = ""
+        self._future: Future | None = None
+        self.last_partial_at: float | None = None
+        self.hits = 0
+        self.misses = 0
+        # Outcome of the last take(): "hit", "miss", or None when nothing was speculated
+        self.last_outcome: str | None = None
+
+    def on_partial(self, stable_text: str) -> None:
+        """
+        Handle a partial STT callback; start a new draft if the stable text moved on.
+
+        Args:
+            stable_text: StableSpeechResult from Twilio (may be empty).
+        """
+        self.last_partial_at = time.monotonic()
+        stable_text = stable_text.strip()
+        if len(_words(stable_text)) < SPECULATION_MIN_WORDS:
+            return
+        with self._lock:
+            if self._text and text_similarity(self._text, stable_text) >= SPECULATION_MATCH_THRESHOLD:
+                return
+            if self._future is not None:
+                self._future.cancel()
+            self._text = stable_text
+            self._future = _executor.submit(self.conversation_manager.draft_reply, stable_text)
+
+    def take(self, final_text: str, confidence: float) -> tuple[str, bool, dict[str, Any] | None] | None:
+        """
+        Claim the speculative draft for the final agent utterance.
+
+        Waits for a draft that is still generating, since it started earlier than
+        a fresh generation would. Resets state for the next turn either way.
+
+        Args:
+            final_text: Final SpeechResult.
+            confidence: STT confidence of the final result.
+
+        Returns:
+            (reply, from_llm, route) on a hit, None on a miss or when nothing was speculated.
+        """
+        with self._lock:
+            text, future = self._text, self._future
+            self._text, self._future = "", None
+        self.last_partial_at = None
+        self.last_outcome = None
+        if future is None:
+            return None
+        self.last_outcome = "miss"
+
+        # Low-confidence turns are prompted differently, so a draft never applies
+        if confidence < 0.7 or text_similarity(text, final_text) < SPECULATION_MATCH_THRESHOLD:
+            future.cancel()
+            self.misses += 1
+            return None
+        try:
+            draft = future.result()
+        except Exception as e:
+            log("WARNING", "Speculative draft failed", str(e))
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.last_outcome = "hit"
+        return draft
+
+    def discard(self) -> None:
+        """Drop any draft for the current turn without counting it as a miss."""
+        with self._lock:
+            future = self._future
+            self._text, self._future = "", None
+        if future is not None:
+            future.cancel()
+        self.last_partial_at = None
+        self.last_outcome = None
+
+    def stats(self) -> dict[str, Any]:
+        """Return hit/miss counters for transcripts."""
+        attempts = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / attempts, 3) if attempts else None,
+        }
@@ -0,0 +1,245 @@
+"""
+Align Whisper post-call transcription with the realtime (Twilio STT) turns.
+
+Whisper hears the whole recording, so its words are used as the reference
+and the realtime turns as the hypothesis. Both word sequences (all turns in
+order, all Whisper segments in order) are aligned in one pass with a banded
+edit distance: only cells within a band around the length-scaled diagonal
+are computed, and each row of the band is filled with NumPy (the in-row
+deletion chain is a running minimum), so a call costs O(words x band).
+
+Each realtime turn then gets the Whisper words and segments it aligned to,
+its own word error rate, and whether its STT confidence was low. Agent turns
+measure Twilio STT; patient turns are our own TTS text, so their error rate
+measures Whisper itself and serves as a sanity check on the reference.
+"""
+
+import os
+import re
+from datetime import datetime
+from typing import Any
+
+import numpy as np
+
+# Turns below this STT confidence are treated as "low confidence" (matches the live warning)
+LOW_CONFIDENCE = float(os.getenv("STT_LOW_CONFIDENCE", "0.7"))
+# Turn WER above this counts as a misrecognition
+MISRECOGNITION_WER = float(os.getenv("STT_MISRECOGNITION_WER", "0.25"))
+# Minimum half-width of the alignment band, in words
+MIN_BAND = 25
+
+_WORD = re.compile(r"[a-z0-9']+")
+
+# Backtrace moves
+_DIAGONAL, _UP, _LEFT = 0, 1, 2
+
+
+def normalize_words(text: str) -> list[str]:
+    """Lowercase words without punctuation (apostrophes kept)."""
+    return _WORD.findall(text.lower().replace("’", "'"))
+
+
+def _segment_fields(segment: Any) -> tuple[str, float | None, float | None]:
+    """Text, start and end of a Whisper segment stored as a dict or API object."""
+    if isinstance(segment, dict):
+        return segment.get("text", ""), segment.get("start"), segment.get("end")
+    return getattr(segment, "text", ""), getattr(segment, "start", None), getattr(segment, "end", None)
+
+
+def banded_alignment(hyp: list[str], ref: list[str], band: int | None = None) -> list[tuple[int | None, int | None]]:
+    """
+    Word alignment with minimum edit distance inside a diagonal band.
+
+    Args:
+        hyp: Hypothesis words (realtime STT).
+        ref: Reference words (Whisper).
+        band: Half-width of the band in words (default: scales with the length gap).
+
+    Returns:
+        Alignment as (hyp index, ref index) pairs in order; None on one side
+        marks an insertion (ref None) or deletion (hyp None).
+    """
+    n, m = len(hyp), len(ref)
+    if n == 0 or m == 0:
+        return [(i, None) for i in range(n)] + [(None, j) for j in range(m)]
+    if band is None:
+        band = max(MIN_BAND, abs(n - m) + MIN_BAND // 2)
+
+    # Map words to ints so comparisons are array ops
+    vocab: dict[str, int] = {}
+    hyp_ids = np.array([vocab.setdefault(w, len(vocab)) for w in hyp], dtype=np.int64)
+    ref_ids = np.array([vocab.setdefault(w, len(vocab)) for w in ref], dtype=np.int64)
+
+    inf = np.iinfo(np.int32).max // 2
+    centers = np.round(np.arange(n + 1) * (m / n)).astype(np.int64)
+    lo = np.clip(centers - band, 0, m)
+    hi = np.clip(centers + band, 0, m) + 1  # exclusive
+    # Keep consecutive bands overlapping so a path always exists
+    lo[1:] = np.minimum(lo[1:], hi[:-1] - 1)
+    hi[:-1] = np.maximum(hi[:-1], lo[1:] + 1)
+    hi[-1] = m + 1
+    width = int((hi - lo).max())
+
+    cost = np.full((n + 1, width), inf, dtype=np.int64)
+    move = np.zeros((n + 1, width), dtype=np.int8)
+    cost[0, : hi[0] - lo[0]] = np.arange(lo[0], hi[0])
+    move[0, :] = _LEFT
+    for i in range(1, n + 1):
+        cols = np.arange(lo[i], hi[i])
+        prev_lo, prev_hi = lo[i - 1], hi[i - 1]
+        prev = cost[i - 1]
+
+        def prev_at(js: np.ndarray) -> np.ndarray:
+            inside = (js >= prev_lo) & (js < prev_hi)
+            out = np.full(js.shape, inf, dtype=np.int64)
+            out[inside] = prev[js[inside] - prev_lo]
+            return out
+
+        up = prev_at(cols) + 1  # hyp word with no ref word (insertion)
+        diag = prev_at(cols - 1)
+        valid = cols >= 1
+        diag[valid] += hyp_ids[i - 1] != ref_ids[cols[valid] - 1]
+        diag[~valid] = inf
+        best = np.minimum(diag, up)
+        choice = np.where(diag <= up, _DIAGONAL, _UP).astype(np.int8)
+        # Left moves (ref word with no hyp word) chain along the row: running minimum of best - j, plus j
+        offsets = cols - cols[0]
+        chained = np.minimum.accumulate(best - offsets) + offsets
+        from_left = chained < best
+        cost[i, : cols.size] = chained
+        move[i, : cols.size] = np.where(from_left, _LEFT, choice)
+
+    pairs: list[tuple[int | None, int | None]] = []
+    i, j = n, m
+    while i > 0 or j > 0:
+        step = move[i, j - lo[i]] if i > 0 else _LEFT
+        if step == _DIAGONAL:
+            pairs.append((i - 1, j - 1))
+            i, j = i - 1, j - 1
+        elif step == _UP:
+            pairs.append((i - 1, None))
+            i -= 1
+        else:
+            pairs.append((None, j - 1))
+            j -= 1
+    pairs.reverse()
+    return pairs
+
+
+def align_transcript(transcript: dict[str, Any]) -> dict[str, Any] | None:
+    """
+    Align a transcript's Whisper enrichment with its realtime turns.
+
+    Args:
+        transcript: Saved transcript dict with "transcript" and "whisper_transcription".
+
+    Returns:
+        Accuracy dict (per-turn results, per-call WER, confidence breakdown),
+        or None if the transcript has no Whisper data or no turns.
+    """
+    whisper = transcript.get("whisper_transcription")
+    if not whisper:
+        return None
+    turns = transcript.get("transcript", [])
+    if not turns:
+        return None
+
+    hyp: list[str] = []
+    hyp_turn: list[int] = []
+    for index, turn in enumerate(turns):
+        words = normalize_words(turn.get("text", ""))
+        hyp.extend(words)
+        hyp_turn.extend([index] * len(words))
+
+    ref: list[str] = []
+    ref_segment: list[int] = []
+    segments = [_segment_fields(s) for s in whisper.get("segments") or []]
+    if not segments:
+        segments = [(whisper.get("full_text", ""), None, None)]
+    for index, (text, _, _) in enumerate(segments):
+        words = normalize_words(text)
+        ref.extend(words)
+        ref_segment.extend([index] * len(words))
+
+    # Per turn: [substitutions, deletions, insertions, reference words], and aligned ref word indices
+    counts = np.zeros((len(turns), 4), dtype=np.int64)
+    turn_ref: list[list[int]] = [[] for _ in turns]
+
+    def add_deletion(turn_index: int, r: int) -> None:
+        counts[turn_index, 1] += 1
+        counts[turn_index, 3] += 1
+        turn_ref[turn_index].append(r)
+
+    # Missed words between two turns go to whichever side shares their Whisper segment
+    last_turn, last_segment = 0, None
+    pending: list[int] = []
+    for h, r in banded_alignment(hyp, ref):
+        if h is None:
+            pending.append(r)  # type: ignore[arg-type]
+            continue
+        turn_index = hyp_turn[h]
+        next_segment = ref_segment[r] if r is not None else None
+        for missed in pending:
+            joins_next = ref_segment[missed] == next_segment and ref_segment[missed] != last_segment
+            add_deletion(turn_index if joins_next else last_turn, missed)
+        pending.clear()
+        last_turn = turn_index
+        if r is None:
+            counts[turn_index, 2] += 1
+            continue
+        counts[turn_index, 0] += hyp[h] != ref[r]
+        counts[turn_index, 3] += 1
+        turn_ref[turn_index].append(r)
+        last_segment = ref_segment[r]
+    for missed in pending:
+        add_deletion(last_turn, missed)
+    for refs in turn_ref:
+        refs.sort()
+
+    results: list[dict[str, Any]] = []
+    for index, turn in enumerate(turns):
+        subs, dels, ins, n_ref = (int(x) for x in counts[index])
+        seg_ids = sorted({ref_segment[r] for r in turn_ref[index]})
+        starts = [segments[s][1] for s in seg_ids if segments[s][1] is not None]
+        ends = [segments[s][2] for s in seg_ids if segments[s][2] is not None]
+        confidence = turn.get("confidence")
+        wer = (subs + dels + ins) / n_ref if n_ref else (1.0 if ins else 0.0)
+        results.append({
+            "turn": turn.get("turn", index),
+            "speaker": turn.get("speaker", "unknown"),
+            "whisper_text": " ".join(ref[r] for r in turn_ref[index]),
+            "whisper_segments": seg_ids,
+            "whisper_start": min(starts) if starts else None,
+            "whisper_end": max(ends) if ends else None,
+            "substitutions": subs,
+            "deletions": dels,
+            "insertions": ins,
+            "reference_words": n_ref,
+            "wer": round(wer, 3),
+            "confidence": confidence,
+            "low_confidence": confidence is not None and confidence < LOW_CONFIDENCE,
+            "misrecognized": wer > MISRECOGNITION_WER,
+        })
+
+    def wer_of(speaker: str) -> float | None:
+        rows = [(counts[i, :3].sum(), counts[i, 3]) for i, t in enumerate(turns) if t.get("speaker") == speaker]
+        total_ref = sum(r for _, r in rows)
+        return round(float(sum(e for e, _ in rows)) / total_ref, 3) if total_ref else None
+
+    agent_rows = [row for row in results if row["speaker"] == "agent" and row["confidence"] is not None]
+    confidence_matrix = {
+        f"{'low' if low else 'high'}_confidence": {
+            "misrecognized": sum(1 for row in agent_rows if row["low_confidence"] == low and row["misrecognized"]),
+            "ok": sum(1 for row in agent_rows if row["low_confidence"] == low and not row["misrecognized"]),
+        }
+        for low in (True, False)
+    }
+    return {
+        "aligned_at": datetime.now().isoformat(),
+        "agent_wer": wer_of("agent"),
+        "patient_wer": wer_of("patient"),
+        "whisper_words": len(ref),
+        "realtime_words": len(hyp),
+        "confidence_vs_errors": confidence_matrix,
+        "turns": results,
+    }
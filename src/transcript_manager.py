@@ -3,15 +3,30 @@ Transcript manager with dual-source support.
 
 Combines real-time Twilio STT with optional Whisper post-processing.
 Used by phone_system for saving and enriching transcripts.
+
+Transcripts live in two tiers: in-progress and recent calls as pretty-printed
+JSON in data/transcripts/, and completed calls older than
+TRANSCRIPT_ARCHIVE_DAYS as compact gzip-compressed JSON in
+data/transcripts/archive/ (moved there by archive_transcripts()). Loading,
+listing and updating work the same on either tier.
 """
 
+import gzip
 import json
 import os
+import time
 from datetime import datetime
 from typing import Any
 
+from src.metrics import TRANSCRIPT_WRITE
 from src.utils import get_project_root, log
 
+# Completed transcripts untouched for this many days move to the compressed tier
+ARCHIVE_AFTER_DAYS = float(os.getenv("TRANSCRIPT_ARCHIVE_DAYS", "30"))
+ARCHIVE_SUFFIX = ".json.gz"
+# Transcripts of simulated calls (src.dry_run), kept apart from real calls
+DRY_RUN_DIR = os.path.join(get_project_root(), "data", "transcripts", "dry_run")
+
 
 class TranscriptManager:
     """Manage transcript saving and enrichment."""
@@ -21,6 +36,46 @@ class TranscriptManager:
         self.transcripts_dir = os.path.join(root, "data", "transcripts")
         os.makedirs(self.transcripts_dir, exist_ok=True)
 
+    @property
+    def archive_dir(self) -> str:
+        """Directory of the compressed tier (inside transcripts_dir)."""
+        return os.path.join(self.transcripts_dir, "archive")
+
+    def _hot_path(self, call_sid: str) -> str:
+        return os.path.join(self.transcripts_dir, f"{call_sid}.json")
+
+    def _archive_path(self, call_sid: str) -> str:
+        return os.path.join(self.archive_dir, f"{call_sid}{ARCHIVE_SUFFIX}")
+
+    def _read(self, call_sid: str) -> dict[str, Any] | None:
+        """Read a transcript from whichever tier holds it (the hot tier wins)."""
+        hot = self._hot_path(call_sid)
+        if os.path.exists(hot):
+            with open(hot, "r") as f:
+                return json.load(f)
+        archived = self._archive_path(call_sid)
+        if os.path.exists(archived):
+            with gzip.open(archived, "rt", encoding="utf-8") as f:
+                return json.load(f)
+        return None
+
+    def _write_archived(self, call_sid: str, data: dict[str, Any]) -> None:
+        """Write compact compressed JSON to the archive tier (atomically)."""
+        os.makedirs(self.archive_dir, exist_ok=True)
+        path = self._archive_path(call_sid)
+        tmp = f"{path}.tmp"
+        with gzip.open(tmp, "wt", encoding="utf-8") as f:
+            json.dump(data, f, separators=(",", ":"))
+        os.replace(tmp, path)
+
+    def _write(self, call_sid: str, data: dict[str, Any]) -> None:
+        """Rewrite an existing transcript in the tier it lives in."""
+        if not os.path.exists(self._hot_path(call_sid)) and os.path.exists(self._archive_path(call_sid)):
+            self._write_archived(call_sid, data)
+            return
+        with open(self._hot_path(call_sid), "w") as f:
+            json.dump(data, f, indent=2)
+
     def save_transcript(self, call_sid: str, transcript_data: dict[str, Any]) -> str | None:
         """
         Save transcript with metadata.
@@ -32,7 +87,7 @@ class TranscriptManager:
         Returns:
             Filename if saved, None otherwise.
         """
-        filename = os.path.join(self.transcripts_dir, f"{call_sid}.json")
+        filename = self._hot_path(call_sid)
         full_data = {
             "call_sid": call_sid,
             "timestamp": datetime.now().isoformat(),
@@ -40,8 +95,10 @@ class TranscriptManager:
             **transcript_data,
         }
         try:
+            started = time.perf_counter()
             with open(filename, "w") as f:
                 json.dump(full_data, f, indent=2)
+            TRANSCRIPT_WRITE.observe(time.perf_counter() - started)
             return filename
         except Exception as e:
             log("ERROR", "Failed to save transcript", str(e))
@@ -58,13 +115,11 @@ class TranscriptManager:
         Returns:
             True if enriched, False otherwise.
         """
-        filename = os.path.join(self.transcripts_dir, f"{call_sid}.json")
-        if not os.path.exists(filename):
-            log("WARNING", f"Transcript not found: {filename}")
-            return False
         try:
-            with open(filename, "r") as f:
-                data = json.load(f)
+            data = self._read(call_sid)
+            if data is None:
+                log("WARNING", f"Transcript not found: {call_sid}")
+                return False
             data["whisper_transcription"] = {
                 "full_text": whisper_transcript["text"],
                 "duration": whisper_transcript.get("duration"),
@@ -72,17 +127,42 @@ class TranscriptManager:
                 "language": whisper_transcript.get("language", "en"),
                 "transcribed_at": datetime.now().isoformat(),
             }
-            with open(filename, "w") as f:
-                json.dump(data, f, indent=2)
+            self._write(call_sid, data)
             log("SUCCESS", "Transcript enriched with Whisper data")
             return True
         except Exception as e:
             log("ERROR", "Failed to enrich transcript", str(e))
             return False
 
+    def update_transcript(self, call_sid: str, fields: dict[str, Any]) -> bool:
+        """
+        Merge top-level fields (analysis results) into an existing transcript.
+
+        Args:
+            call_sid: Call SID.
+            fields: Keys to set, e.g. {"audio_analysis": {...}}.
+
+        Returns:
+            True if stored, False if the transcript is missing or unwritable.
+        """
+        try:
+            data = self._read(call_sid)
+            if data is None:
+                return False
+            data.update(fields)
+            self._write(call_sid, data)
+            return True
+        except Exception as e:
+            log("ERROR", f"Failed to update transcript {call_sid}", str(e))
+            return False
+
+    def add_audio_analysis(self, call_sid: str, analysis: dict[str, Any]) -> bool:
+        """Store recording analytics (src.audio_analytics) in an existing transcript."""
+        return self.update_transcript(call_sid, {"audio_analysis": analysis})
+
     def load_transcript(self, call_sid: str) -> dict[str, Any] | None:
         """
-        Load transcript from file.
+        Load transcript from file (hot or archive tier).
 
         Args:
             call_sid: Call SID.
@@ -90,11 +170,68 @@ class TranscriptManager:
         Returns:
             Transcript dict or None if not found.
         """
-        filename = os.path.join(self.transcripts_dir, f"{call_sid}.json")
-        if not os.path.exists(filename):
-            return None
-        with open(filename, "r") as f:
-            return json.load(f)
+        return self._read(call_sid)
+
+    def list_transcripts(self, tier: str = "all") -> list[str]:
+        """
+        List saved transcript keys (file stems usable with load_transcript).
+
+        Args:
+            tier: "all", "hot" (uncompressed) or "archive" (compressed).
+
+        Returns:
+            Sorted list of transcript keys.
+        """
+        keys: set[str] = set()
+        if tier in ("all", "hot"):
+            keys.update(name[:-len(".json")] for name in os.listdir(self.transcripts_dir) if name.endswith(".json"))
+        if tier in ("all", "archive") and os.path.isdir(self.archive_dir):
+            keys.update(
+                name[:-len(ARCHIVE_SUFFIX)] for name in os.listdir(self.archive_dir) if name.endswith(ARCHIVE_SUFFIX)
+            )
+        return sorted(keys)
+
+    def archive_transcripts(self, older_than_days: float = ARCHIVE_AFTER_DAYS, dry_run: bool = False) -> dict[str, Any]:
+        """
+        Move completed transcripts not modified for `older_than_days` into the archive tier.
+
+        Each transcript is written compressed, then its JSON file is removed;
+        in-progress transcripts are never moved.
+
+        Args:
+            older_than_days: Minimum age (by file modification time).
+            dry_run: Only report what would be archived.
+
+        Returns:
+            Dict with archived keys, skipped count and bytes before/after.
+        """
+        cutoff = time.time() - older_than_days * 86400
+        archived: list[str] = []
+        skipped = bytes_before = bytes_after = 0
+        for key in self.list_transcripts(tier="hot"):
+            hot = self._hot_path(key)
+            try:
+                if os.path.getmtime(hot) > cutoff:
+                    skipped += 1
+                    continue
+                with open(hot, "r") as f:
+                    data = json.load(f)
+                if data.get("status") != "completed":
+                    skipped += 1
+                    continue
+                size = os.path.getsize(hot)
+                if not dry_run:
+                    self._write_archived(key, data)
+                    os.remove(hot)
+                    bytes_after += os.path.getsize(self._archive_path(key))
+                bytes_before += size
+                archived.append(key)
+            except Exception as e:
+                log("ERROR", f"Failed to archive transcript {key}", str(e))
+                skipped += 1
+        if archived and not dry_run:
+            log("INFO", f"Archived {len(archived)} transcripts", f"{bytes_before} -> {bytes_after} bytes")
+        return {"archived": archived, "skipped": skipped, "bytes_before": bytes_before, "bytes_after": bytes_after}
 
     def get_conversation_text(self, call_sid: str, source: str = "realtime") -> str | None:
         """
@@ -0,0 +1,60 @@
+"""
+Text-to-speech for call modes that stream audio themselves.
+
+Gather mode lets Twilio speak via <Say>. Media Streams mode has to send raw
+8 kHz mu-law audio back over the WebSocket, so replies are synthesized here
+with ElevenLabs, which can output that format directly. The audio cache
+(src/audio_cache.py) also uses it to pre-render MP3s for <Play>.
+"""
+
+import os
+
+import requests
+
+ELEVENLABS_API_KEY = os.getenv("ELEVENLABS_API_KEY")
+ELEVENLABS_VOICE_ID = os.getenv("ELEVENLABS_VOICE_ID", "TxGEqnHWrfWFTfGW9XjX")
+ELEVENLABS_MODEL = os.getenv("ELEVENLABS_MODEL", "eleven_turbo_v2_5")
+
+
+def synthesize_ulaw(text: str) -> bytes:
+    """
+    Synthesize speech as raw 8 kHz mu-law (Twilio Media Streams format).
+
+    Args:
+        text: Text to speak.
+
+    Returns:
+        Raw mu-law bytes.
+
+    Raises:
+        RuntimeError: If ELEVENLABS_API_KEY is unset or the request fails.
+    """
+    return synthesize(text, "ulaw_8000")
+
+
+def synthesize(text: str, output_format: str) -> bytes:
+    """
+    Synthesize speech with ElevenLabs.
+
+    Args:
+        text: Text to speak.
+        output_format: ElevenLabs output format, e.g. "ulaw_8000" or "mp3_22050_32".
+
+    Returns:
+        Encoded audio bytes.
+
+    Raises:
+        RuntimeError: If ELEVENLABS_API_KEY is unset or the request fails.
+    """
+    if not ELEVENLABS_API_KEY:
+        raise RuntimeError("ELEVENLABS_API_KEY not set in .env")
+    response = requests.post(
+        f"https://api.elevenlabs.io/v1/text-to-speech/{ELEVENLABS_VOICE_ID}",
+        params={"output_format": output_format},
+        headers={"xi-api-key": ELEVENLABS_API_KEY},
+        json={"text": text, "model_id": ELEVENLABS_MODEL},
+        timeout=30,
+    )
+    if response.status_code != 200:
+        raise RuntimeError(f"TTS failed: HTTP {response.status_code}")
+    return response.content
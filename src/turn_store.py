@@ -0,0 +1,156 @@
+"""
+Compact per-call turn store shared by the transcript and the LLM prompt.
+
+A call used to keep every turn twice: as a transcript dict with an ISO
+timestamp string on CallSession, and as a prefixed "Agent: ..." message dict
+in ConversationManager.conversation_history. Both lived for the whole call.
+
+Now each turn is one Turn object (__slots__, float timestamp, interned
+speaker, per-turn metrics only when present) in a TurnStore owned by the
+session and shared with its ConversationManager:
+- the transcript is rendered from it (to_dicts) only when it is persisted
+- the prompt history is rendered from it (messages) only when the LLM is called
+
+Only exchanges whose patient reply came from the LLM go into the prompt, as
+before: turns answered by fast paths (identity answers, closings, fallbacks)
+are flagged out of it rather than stored separately.
+
+nbytes() is an estimate of the memory one store holds, reported per active
+call at GET /sessions and benchmarked by benchmarks/bench_memory.py.
+"""
+
+import sys
+import time
+from datetime import datetime
+from typing import Any, Iterator
+
+AGENT = sys.intern("agent")
+PATIENT = sys.intern("patient")
+
+
+class Turn:
+    """One utterance: speaker, text, turn number, epoch timestamp, optional metrics."""
+
+    __slots__ = ("speaker", "text", "turn", "ts", "confidence", "prompt", "extra")
+
+    def __init__(
+        self,
+        speaker: str,
+        text: str,
+        turn: int,
+        confidence: float | None = None,
+        prompt: bool = False,
+        extra: dict[str, Any] | None = None,
+        ts: float | None = None,
+    ) -> None:
+        self.speaker = sys.intern(speaker)
+        self.text = text
+        self.turn = turn
+        self.ts = time.time() if ts is None else ts
+        self.confidence = confidence
+        # Part of the LLM prompt history
+        self.prompt = prompt
+        # Per-turn metrics (speech_timeout, reply_latency_ms, model, ...); None when empty
+        self.extra = extra or None
+
+    def to_dict(self) -> dict[str, Any]:
+        """The transcript JSON shape of this turn."""
+        data: dict[str, Any] = {
+            "speaker": self.speaker,
+            "text": self.text,
+            "turn": self.turn,
+            "timestamp": datetime.fromtimestamp(self.ts).isoformat(),
+        }
+        if self.confidence is not None:
+            data["confidence"] = self.confidence
+        if self.extra:
+            data.update(self.extra)
+        return data
+
+    def nbytes(self) -> int:
+        size = sys.getsizeof(self) + sys.getsizeof(self.text) + sys.getsizeof(self.ts)
+        if self.confidence is not None:
+            size += sys.getsizeof(self.confidence)
+        if self.extra:
+            size += sys.getsizeof(self.extra) + sum(sys.getsizeof(v) for v in self.extra.values())
+        return size
+
+
+class TurnStore:
+    """Ordered turns of one call; the source of both the transcript and the prompt history."""
+
+    __slots__ = ("_turns", "_pending_reply")
+
+    def __init__(self) -> None:
+        self._turns: list[Turn] = []
+        # LLM reply recorded by the conversation before the session appends its patient turn
+        self._pending_reply: str | None = None
+
+    def __len__(self) -> int:
+        return len(self._turns)
+
+    def __iter__(self) -> Iterator[Turn]:
+        return iter(self._turns)
+
+    def append(self, speaker: str, text: str, confidence: float | None = None, **extra: Any) -> Turn:
+        """
+        Record one turn.
+
+        Args:
+            speaker: "agent" or "patient".
+            text: What was said.
+            confidence: STT confidence (agent turns).
+            **extra: Per-turn metrics written to the transcript as-is.
+
+        Returns:
+            The new Turn.
+        """
+        prompt = False
+        if speaker == PATIENT and self._pending_reply is not None:
+            prompt = text == self._pending_reply
+            self._pending_reply = None
+        turn = Turn(speaker, text, len(self._turns), confidence, prompt, extra)
+        self._turns.append(turn)
+        return turn
+
+    def record_exchange(self, agent_text: str, reply: str) -> None:
+        """
+        Add an agent turn and its LLM reply to the prompt history.
+
+        When the session has already recorded the agent turn, that turn is
+        flagged and the reply is matched to the patient turn it appends next;
+        otherwise (a ConversationManager used on its own) both are appended.
+        """
+        last = self._turns[-1] if self._turns else None
+        if last is not None and last.speaker is AGENT and last.text == agent_text and not last.prompt:
+            last.prompt = True
+            self._pending_reply = reply
+            return
+        self._turns.append(Turn(AGENT, agent_text, len(self._turns), prompt=True))
+        self._turns.append(Turn(PATIENT, reply, len(self._turns), prompt=True))
+
+    def drop_pending_reply(self) -> None:
+        """Keep the next patient turn out of the prompt history (its reply was never played)."""
+        self._pending_reply = None
+
+    def messages(self) -> list[dict[str, str]]:
+        """Prompt history as OpenAI chat messages."""
+        return [
+            {"role": "user", "content": f"Agent: {t.text}"}
+            if t.speaker is AGENT
+            else {"role": "assistant", "content": t.text}
+            for t in self._turns
+            if t.prompt
+        ]
+
+    def prompt_text(self) -> str:
+        """Prompt history as one string (goal keyword checks)."""
+        return " ".join(f"Agent: {t.text}" if t.speaker is AGENT else t.text for t in self._turns if t.prompt)
+
+    def to_dicts(self) -> list[dict[str, Any]]:
+        """Transcript turns in the saved JSON shape."""
+        return [t.to_dict() for t in self._turns]
+
+    def nbytes(self) -> int:
+        """Approximate memory held by the store and its turns."""
+        return sys.getsizeof(self) + sys.getsizeof(self._turns) + sum(t.nbytes() for t in self._turns)
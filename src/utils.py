@@ -3,28 +3,47 @@ Utility functions for logging and path resolution.
 
 Used by phone_system, scenario_loader, recording_manager,
 transcript_manager, and conversation for consistent log format.
+
+log() keeps its simple signature but builds a structured record carrying the
+per-call context (call_sid, scenario, turn) bound with bind_log_context().
+Records go to the console (text or LOG_FORMAT=json) and ERROR records also
+go to the single error sink, data/errors.log. The webhook server switches
+to enable_async_logging(), which hands records to a background thread
+through a bounded queue so logging never blocks a turn; CLI tools log
+synchronously so output stays ordered with their prints.
 """
 
+import atexit
+import contextvars
+import json
+import logging
 import os
+import queue
+import random
+import sys
+import threading
 from datetime import datetime
-from typing import Literal
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Literal
 
 LogLevel = Literal["SUCCESS", "ERROR", "WARNING", "INFO", "STATUS", "COST"]
 
+_LEVEL_NUMBERS: dict[str, int] = {
+    "INFO": logging.INFO,
+    "STATUS": logging.INFO,
+    "COST": logging.INFO,
+    "SUCCESS": logging.INFO + 5,
+    "WARNING": logging.WARNING,
+    "ERROR": logging.ERROR,
+}
 
-def log(level: LogLevel, message: str, details: str = "") -> None:
-    """
-    Print formatted log message.
+LOG_FORMAT = os.getenv("LOG_FORMAT", "text").lower()
+LOG_LEVEL = _LEVEL_NUMBERS.get(os.getenv("LOG_LEVEL", "INFO").upper(), logging.INFO)
+# Fraction of plain INFO lines kept (per-turn chatter); other levels are never sampled
+LOG_INFO_SAMPLE_RATE = float(os.getenv("LOG_INFO_SAMPLE_RATE", "1.0"))
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
 
-    Args:
-        level: Log level (SUCCESS, ERROR, WARNING, INFO, STATUS, COST)
-        message: Main message
-        details: Optional details (printed on next line with indent)
-    """
-    timestamp = datetime.now().strftime("%H:%M:%S")
-    print(f"[{timestamp}] [{level}] {message}")
-    if details:
-        print(f"         {details}")
+_log_context: contextvars.ContextVar[dict[str, Any]] = contextvars.ContextVar("log_context", default={})
 
 
 def get_project_root() -> str:
@@ -35,3 +54,149 @@ def get_project_root() -> str:
         Absolute path to project root.
     """
     return os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def bind_log_context(**fields: Any) -> contextvars.Token:
+    """
+    Attach call context (call_sid, scenario, turn) to subsequent log lines.
+
+    Merges with the current context. Returns a token for clear_log_context().
+    """
+    return _log_context.set({**_log_context.get(), **{k: v for k, v in fields.items() if v is not None}})
+
+
+def clear_log_context(token: contextvars.Token | None = None) -> None:
+    """Restore the context from before bind_log_context() (or drop it all)."""
+    if token is not None:
+        _log_context.reset(token)
+    else:
+        _log_context.set({})
+
+
+class _TextFormatter(logging.Formatter):
+    """Console format: [HH:MM:SS] [LEVEL] [call] message, details on the next line."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        timestamp = datetime.fromtimestamp(record.created).strftime("%H:%M:%S")
+        call_sid = record.context.get("call_sid")
+        prefix = f"[{call_sid[-8:]}] " if call_sid else ""
+        line = f"[{timestamp}] [{record.levelname}] {prefix}{record.msg}"
+        if record.details:
+            line += f"\n         {record.details}"
+        return line
+
+
+class _JsonFormatter(logging.Formatter):
+    """One JSON object per line with the call context as top-level fields."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry: dict[str, Any] = {
+            "ts": datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "msg": record.msg,
+        }
+        if record.details:
+            entry["details"] = record.details
+        entry.update(record.context)
+        return json.dumps(entry, default=str)
+
+
+class _ErrorSinkFormatter(logging.Formatter):
+    """data/errors.log format: ISO timestamp - message: details [context]."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        line = f"{datetime.fromtimestamp(record.created).isoformat()} - {record.msg}"
+        if record.details:
+            line += f": {record.details}"
+        if record.context:
+            line += " [" + " ".join(f"{k}={v}" for k, v in record.context.items()) + "]"
+        return line
+
+
+class _DroppingQueueHandler(QueueHandler):
+    """Never blocks: records are dropped (and counted) when the queue is full."""
+
+    dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Formatting happens on the listener thread, not the caller's
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            _DroppingQueueHandler.dropped += 1
+
+
+def _build_handlers() -> list[logging.Handler]:
+    """Console handler plus the ERROR-only data/errors.log sink."""
+    console = logging.StreamHandler(sys.stdout)
+    console.setFormatter(_JsonFormatter() if LOG_FORMAT == "json" else _TextFormatter())
+    errors_path = os.path.join(get_project_root(), "data", "errors.log")
+    os.makedirs(os.path.dirname(errors_path), exist_ok=True)
+    error_sink = logging.FileHandler(errors_path, delay=True)
+    error_sink.setLevel(logging.ERROR)
+    error_sink.setFormatter(_ErrorSinkFormatter())
+    return [console, error_sink]
+
+
+_handlers = _build_handlers()
+_queue_handler: _DroppingQueueHandler | None = None
+_listener: QueueListener | None = None
+_listener_lock = threading.Lock()
+
+
+def enable_async_logging() -> None:
+    """Route log records through a background thread (idempotent)."""
+    global _queue_handler, _listener
+    with _listener_lock:
+        if _listener is not None:
+            return
+        log_queue: queue.Queue = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+        _queue_handler = _DroppingQueueHandler(log_queue)
+        _listener = QueueListener(log_queue, *_handlers, respect_handler_level=True)
+        _listener.start()
+    atexit.register(flush_logs)
+
+
+def flush_logs() -> None:
+    """Stop the background logger after draining queued records."""
+    global _queue_handler, _listener
+    with _listener_lock:
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
+            _queue_handler = None
+
+
+def dropped_log_records() -> int:
+    """Number of records dropped because the async queue was full."""
+    return _DroppingQueueHandler.dropped
+
+
+def log(level: LogLevel, message: str, details: str = "") -> None:
+    """
+    Emit a log record.
+
+    Args:
+        level: Log level (SUCCESS, ERROR, WARNING, INFO, STATUS, COST)
+        message: Main message
+        details: Optional details (printed on next line with indent)
+    """
+    levelno = _LEVEL_NUMBERS[level]
+    if levelno < LOG_LEVEL:
+        return
+    if level == "INFO" and LOG_INFO_SAMPLE_RATE < 1.0 and random.random() >= LOG_INFO_SAMPLE_RATE:
+        return
+    record = logging.LogRecord("pgai", levelno, "", 0, message, None, None)
+    record.levelname = level
+    record.details = details
+    record.context = _log_context.get()
+    queue_handler = _queue_handler
+    if queue_handler is not None:
+        queue_handler.enqueue(record)
+        return
+    for handler in _handlers:
+        if levelno >= handler.level:
+            handler.handle(record)
@@ -0,0 +1,145 @@
+"""
+Energy-based voice activity detection on 8 kHz telephony audio.
+
+Vectorized with NumPy: mu-law decoding is a table lookup and frame energies
+are computed for a whole chunk at once. Used by the Media Streams call mode
+to detect when the clinic agent stops talking.
+"""
+
+import os
+from typing import Any
+
+import numpy as np
+
+SAMPLE_RATE = 8000
+FRAME_MS = 20
+FRAME_SAMPLES = SAMPLE_RATE * FRAME_MS // 1000
+
+# Speech must exceed the noise floor by this margin and the absolute minimum below
+SPEECH_MARGIN_DB = float(os.getenv("VAD_SPEECH_MARGIN_DB", "12"))
+MIN_SPEECH_DB = float(os.getenv("VAD_MIN_SPEECH_DB", "-45"))
+# Trailing silence that ends an utterance, and shortest run counted as speech
+END_SILENCE_MS = int(os.getenv("VAD_END_SILENCE_MS", "700"))
+MIN_SPEECH_MS = int(os.getenv("VAD_MIN_SPEECH_MS", "200"))
+
+
+def _build_ulaw_table() -> np.ndarray:
+    """G.711 mu-law byte -> int16 sample lookup table."""
+    u = ~np.arange(256, dtype=np.uint8)
+    sign = u & 0x80
+    exponent = ((u >> 4) & 0x07).astype(np.int32)
+    mantissa = (u & 0x0F).astype(np.int32)
+    magnitude = (((mantissa << 3) + 0x84) << exponent) - 0x84
+    return np.where(sign, -magnitude, magnitude).astype(np.int16)
+
+
+_ULAW_TABLE = _build_ulaw_table()
+
+
+def ulaw_to_pcm(data: bytes) -> np.ndarray:
+    """
+    Decode mu-law bytes to 16-bit PCM.
+
+    Args:
+        data: Raw mu-law audio (one byte per sample).
+
+    Returns:
+        int16 sample array.
+    """
+    return _ULAW_TABLE[np.frombuffer(data, dtype=np.uint8)]
+
+
+def frame_energy_db(samples: np.ndarray, frame_samples: int = FRAME_SAMPLES) -> np.ndarray:
+    """
+    RMS energy per frame in dBFS; a trailing partial frame is dropped.
+
+    Args:
+        samples: int16 PCM samples.
+        frame_samples: Samples per frame.
+
+    Returns:
+        float array with one value per complete frame.
+    """
+    n_frames = len(samples) // frame_samples
+    if n_frames == 0:
+        return np.empty(0, dtype=np.float64)
+    frames = samples[: n_frames * frame_samples].reshape(n_frames, frame_samples).astype(np.float64)
+    rms = np.sqrt(np.mean(frames * frames, axis=1)) / 32768.0
+    return 20.0 * np.log10(np.maximum(rms, 1e-6))
+
+
+class Endpointer:
+    """
+    Streaming utterance endpointer over mu-law frames.
+
+    feed() returns events as they happen: ("speech_start", None) when speech
+    begins and ("speech_end", samples) with the whole utterance once
+    END_SILENCE_MS of silence follows at least MIN_SPEECH_MS of speech.
+    """
+
+    def __init__(self, end_silence_ms: int = END_SILENCE_MS, min_speech_ms: int = MIN_SPEECH_MS) -> None:
+        self.end_silence_frames = max(1, end_silence_ms // FRAME_MS)
+        self.min_speech_frames = max(1, min_speech_ms // FRAME_MS)
+        self.noise_floor_db = -60.0
+        self._pending = np.empty(0, dtype=np.int16)
+        self._utterance: list[np.ndarray] = []
+        self._speech_frames = 0
+        self._silence_frames = 0
+        self.in_speech = False
+
+    def feed(self, data: bytes) -> list[tuple[str, Any]]:
+        """
+        Consume a chunk of mu-law audio.
+
+        Args:
+            data: Raw mu-law bytes (any length).
+
+        Returns:
+            List of (event, payload) tuples produced by this chunk.
+        """
+        samples = np.concatenate([self._pending, ulaw_to_pcm(data)])
+        n_frames = len(samples) // FRAME_SAMPLES
+        self._pending = samples[n_frames * FRAME_SAMPLES:]
+        if n_frames == 0:
+            return []
+
+        energies = frame_energy_db(samples[: n_frames * FRAME_SAMPLES])
+        threshold = max(self.noise_floor_db + SPEECH_MARGIN_DB, MIN_SPEECH_DB)
+        is_speech = energies > threshold
+
+        # Track the noise floor from non-speech frames (slow rise, fast fall)
+        quiet = energies[~is_speech]
+        if quiet.size:
+            level = float(quiet.mean())
+            rate = 0.05 if level > self.noise_floor_db else 0.5
+            self.noise_floor_db += rate * (level - self.noise_floor_db)
+
+        events: list[tuple[str, Any]] = []
+        frames = samples[: n_frames * FRAME_SAMPLES].reshape(n_frames, FRAME_SAMPLES)
+        for frame, speech in zip(frames, is_speech):
+            if speech:
+                self._speech_frames += 1
+                self._silence_frames = 0
+                self._utterance.append(frame)
+                if not self.in_speech and self._speech_frames >= self.min_speech_frames:
+                    self.in_speech = True
+                    events.append(("speech_start", None))
+                continue
+            if not self.in_speech:
+                # Short blips below MIN_SPEECH_MS are noise, not an utterance
+                self._speech_frames = 0
+                self._utterance.clear()
+                continue
+            self._silence_frames += 1
+            self._utterance.append(frame)
+            if self._silence_frames >= self.end_silence_frames:
+                events.append(("speech_end", np.concatenate(self._utterance)))
+                self.reset()
+        return events
+
+    def reset(self) -> None:
+        """Drop any partial utterance."""
+        self._utterance = []
+        self._speech_frames = 0
+        self._silence_frames = 0
+        self.in_speech = False
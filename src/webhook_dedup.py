@@ -0,0 +1,121 @@
+"""
+Idempotent webhook handling: replay the TwiML of a turn Twilio retried.
+
+When /handle-agent-response is slow, Twilio retries the same request. Without
+deduplication each retry would record the agent turn again, bump turn_count,
+rewrite the transcript and pay for another LLM reply.
+
+Each Gather we emit posts to an action URL carrying its own sequence number
+(?gather=N), so a retry can be told apart from a new turn that happens to have
+the same words. A request is identified by Twilio's I-Twilio-Idempotency-Token
+header when present, otherwise by (gather, SpeechResult). The first request
+for a key computes the response; a retry gets the cached TwiML, or waits for
+the first request if it is still generating. Requests without either
+identifier (not from one of our Gathers) are never deduplicated.
+
+If the first request is still running when the retry has waited
+IN_FLIGHT_WAIT_SECONDS, the retry tries to supersede it (supersede()) and
+answers with a fresh Gather: Twilio never plays the first request's TwiML,
+so its patient reply is saved with "superseded": true and kept out of the
+prompt history. The first request commits its reply (commit()) before
+recording it. Both are decided under the cache lock, so exactly one wins: a
+retry that loses waits for the committed TwiML instead.
+
+Each call keeps a small response cache (TurnResponseCache on CallSession),
+dropped with the session.
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+
+from src.metrics import Counter
+
+# Responses kept per call; retries only ever target the latest turns
+RESPONSE_CACHE_SIZE = 8
+# Longest a retry waits for the original request (Twilio's webhook timeout is 15s)
+IN_FLIGHT_WAIT_SECONDS = 15.0
+
+DUPLICATE_WEBHOOKS = Counter(
+    "pgai_webhook_duplicates_total", "Retried webhook requests answered without reprocessing", ("route", "outcome")
+)
+
+
+def request_key(idempotency_token: str | None, gather_id: str | None, speech: str) -> str | None:
+    """Dedup key of a turn request, or None if it cannot be identified."""
+    if idempotency_token:
+        return f"token:{idempotency_token}"
+    if gather_id:
+        return f"gather:{gather_id}:{hashlib.sha1(speech.encode()).hexdigest()}"
+    return None
+
+
+class _Entry:
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.body: str | None = None
+        # A retry answered instead; this request's TwiML will never be played
+        self.superseded = False
+        # The request is recording its reply; a retry can no longer supersede it
+        self.committed = False
+
+
+class TurnResponseCache:
+    """Per-call map of request key -> TwiML, with waiting on in-flight requests."""
+
+    def __init__(self, size: int = RESPONSE_CACHE_SIZE) -> None:
+        self.size = size
+        self._entries: OrderedDict[str, _Entry] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def begin(self, key: str) -> tuple[bool, _Entry]:
+        """
+        Claim a key.
+
+        Returns:
+            (True, entry) if this request must compute the response and then
+            call complete() or abandon(); (False, entry) for a duplicate.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                return False, entry
+            entry = self._entries[key] = _Entry()
+            while len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+            return True, entry
+
+    def complete(self, key: str, body: str) -> None:
+        """Store the response and release any waiting retries."""
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is not None:
+            entry.body = body
+            entry.done.set()
+
+    def abandon(self, key: str) -> None:
+        """Forget a key whose request failed, so the next retry recomputes it."""
+        with self._lock:
+            entry = self._entries.pop(key, None)
+        if entry is not None:
+            entry.done.set()
+
+    def commit(self, entry: _Entry) -> bool:
+        """Claim the turn for the original request; False if a retry superseded it first."""
+        with self._lock:
+            if not entry.superseded:
+                entry.committed = True
+            return entry.committed
+
+    def supersede(self, entry: _Entry) -> bool:
+        """Take the turn over from a slow original request; False if it already committed."""
+        with self._lock:
+            if not entry.committed:
+                entry.superseded = True
+            return entry.superseded
+
+    @staticmethod
+    def wait(entry: _Entry, timeout: float = IN_FLIGHT_WAIT_SECONDS) -> str | None:
+        """The original request's TwiML, or None if it failed or is still running after timeout."""
+        entry.done.wait(timeout)
+        return entry.body
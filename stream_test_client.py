@@ -0,0 +1,139 @@
+"""
+Local Media Streams test client: replays a recording into /media-stream.
+
+Plays the role of Twilio for CALL_MODE=stream without placing a call. The MP3
+is decoded to 8 kHz mono mu-law with ffmpeg and sent in 20ms media frames at
+real-time pace; patient replies streamed back are timed and their marks are
+acknowledged as if playback finished.
+
+Usage:
+  python stream_test_client.py data/recordings/appointment.mp3
+  python stream_test_client.py data/recordings/appointment.mp3 --scenario appointment --speed 2
+  python stream_test_client.py --all
+"""
+
+import argparse
+import base64
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+import uuid
+
+from simple_websocket import Client, ConnectionClosed
+
+from src.recording_store import RecordingStore
+
+FRAME_BYTES = 160  # 20ms of 8 kHz mu-law
+
+
+def decode_to_ulaw(path: str) -> bytes:
+    """Decode an audio file to raw 8 kHz mono mu-law using ffmpeg."""
+    result = subprocess.run(
+        ["ffmpeg", "-v", "error", "-i", path, "-f", "mulaw", "-ar", "8000", "-ac", "1", "-"],
+        capture_output=True,
+        check=True,
+    )
+    return result.stdout
+
+
+def replay(url: str, path: str, scenario: str, speed: float) -> None:
+    """Stream one recording to the server and report when replies arrive."""
+    audio = decode_to_ulaw(path)
+    call_sid = f"CALOCAL{uuid.uuid4().hex[:26]}"
+    stream_sid = f"MZLOCAL{uuid.uuid4().hex[:26]}"
+    ws = Client.connect(url)
+    started = time.monotonic()
+    replies: list[float] = []
+
+    def receive() -> None:
+        in_reply = False
+        try:
+            while True:
+                message = json.loads(ws.receive())
+                event = message.get("event")
+                elapsed = time.monotonic() - started
+                if event == "media" and not in_reply:
+                    in_reply = True
+                    replies.append(elapsed)
+                    print(f"  [{elapsed:7.2f}s] patient reply audio started")
+                elif event == "mark":
+                    in_reply = False
+                    # Twilio echoes the mark once queued audio has played
+                    ws.send(json.dumps({"event": "mark", "streamSid": stream_sid, "mark": message["mark"]}))
+                elif event == "clear":
+                    in_reply = False
+                    print(f"  [{elapsed:7.2f}s] playback cleared (barge-in)")
+        except (ConnectionClosed, TypeError):
+            return
+
+    receiver = threading.Thread(target=receive, daemon=True)
+    receiver.start()
+
+    ws.send(json.dumps({"event": "connected", "protocol": "Call", "version": "1.0.0"}))
+    ws.send(json.dumps({
+        "event": "start",
+        "streamSid": stream_sid,
+        "start": {
+            "streamSid": stream_sid,
+            "callSid": call_sid,
+            "tracks": ["inbound"],
+            "customParameters": {"scenario": scenario},
+            "mediaFormat": {"encoding": "audio/x-mulaw", "sampleRate": 8000, "channels": 1},
+        },
+    }))
+
+    frame_interval = 0.02 / speed
+    next_send = time.monotonic()
+    for chunk_index, i in enumerate(range(0, len(audio), FRAME_BYTES)):
+        ws.send(json.dumps({
+            "event": "media",
+            "streamSid": stream_sid,
+            "media": {
+                "track": "inbound",
+                "chunk": str(chunk_index + 1),
+                "timestamp": str(chunk_index * 20),
+                "payload": base64.b64encode(audio[i:i + FRAME_BYTES]).decode("ascii"),
+            },
+        }))
+        next_send += frame_interval
+        delay = next_send - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+    ws.send(json.dumps({"event": "stop", "streamSid": stream_sid, "stop": {"callSid": call_sid}}))
+    time.sleep(1)
+    try:
+        ws.close()
+    except ConnectionClosed:
+        pass
+    print(f"  {os.path.basename(path)}: {len(audio) / 8000:.1f}s audio, {len(replies)} patient replies")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Replay recordings into the Media Streams endpoint")
+    parser.add_argument("recording", nargs="?", help="Audio file to replay")
+    parser.add_argument("--all", action="store_true", help="Replay every stored recording")
+    parser.add_argument("--scenario", help="Scenario name (default: recording file name)")
+    parser.add_argument("--speed", type=float, default=1.0, help="Playback speed multiplier")
+    parser.add_argument("--url", default=f"ws://localhost:{os.getenv('FLASK_PORT', '5000')}/media-stream")
+    args = parser.parse_args()
+
+    if args.all:
+        recordings = RecordingStore().list_recordings()
+    elif args.recording:
+        recordings = {os.path.splitext(os.path.basename(args.recording))[0]: args.recording}
+    else:
+        parser.print_usage()
+        sys.exit(1)
+
+    for name, path in recordings.items():
+        scenario = args.scenario or name
+        print(f"[INFO] Replaying {path} as scenario {scenario}")
+        replay(args.url, path, scenario, args.speed)
+
+
+if __name__ == "__main__":
+    main()
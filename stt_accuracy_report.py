@@ -0,0 +1,97 @@
+"""
+Measure live (Twilio) STT accuracy against Whisper across saved transcripts.
+
+Aligns every Whisper-enriched transcript (src.stt_alignment), stores the
+result as "stt_accuracy" in the transcript, and reports word error rate per
+call and overall, plus how well low STT confidence predicted real
+misrecognitions.
+
+Usage:
+  python stt_accuracy_report.py
+  python stt_accuracy_report.py --force --worst 10
+  python stt_accuracy_report.py --no-write
+"""
+
+import argparse
+import time
+from typing import Any
+
+from src.stt_alignment import LOW_CONFIDENCE, MISRECOGNITION_WER, align_transcript
+from src.transcript_manager import TranscriptManager
+
+
+def _rate(part: int, whole: int) -> str:
+    return f"{part / whole:.0%}" if whole else "n/a"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Twilio STT word error rate vs Whisper")
+    parser.add_argument("--force", action="store_true", help="Re-align transcripts that already have results")
+    parser.add_argument("--no-write", action="store_true", help="Do not store results in the transcripts")
+    parser.add_argument("--worst", type=int, default=0, help="Show the N worst agent turns")
+    args = parser.parse_args()
+
+    transcript_manager = TranscriptManager()
+    started = time.perf_counter()
+    calls: list[tuple[str, dict[str, Any], dict[str, Any]]] = []
+    for key in transcript_manager.list_transcripts():
+        transcript = transcript_manager.load_transcript(key)
+        if not transcript or "whisper_transcription" not in transcript:
+            continue
+        accuracy = None if args.force else transcript.get("stt_accuracy")
+        if accuracy is None:
+            accuracy = align_transcript(transcript)
+            if accuracy is None:
+                continue
+            if not args.no_write:
+                transcript_manager.update_transcript(key, {"stt_accuracy": accuracy})
+        calls.append((key, transcript, accuracy))
+    elapsed = time.perf_counter() - started
+
+    if not calls:
+        print("[INFO] No transcripts with Whisper transcription (set USE_WHISPER_TRANSCRIPTION=true)")
+        return
+
+    print(f"\n{'Call':<36} {'Scenario':<24} {'Agent turns':>11} {'Agent WER':>10} {'Whisper check':>13}")
+    print("-" * 98)
+    errors = ref_words = 0
+    matrix = {"low_confidence": {"misrecognized": 0, "ok": 0}, "high_confidence": {"misrecognized": 0, "ok": 0}}
+    agent_turns: list[tuple[str, dict[str, Any], dict[str, Any]]] = []
+    for key, transcript, accuracy in calls:
+        turns = [t for t in accuracy["turns"] if t["speaker"] == "agent"]
+        for row in turns:
+            errors += row["substitutions"] + row["deletions"] + row["insertions"]
+            ref_words += row["reference_words"]
+        for bucket, counts in accuracy["confidence_vs_errors"].items():
+            for outcome, n in counts.items():
+                matrix[bucket][outcome] += n
+        realtime = transcript.get("transcript", [])
+        agent_turns.extend((key, row, realtime[i]) for i, row in enumerate(accuracy["turns"]) if row["speaker"] == "agent")
+        agent_wer = "n/a" if accuracy["agent_wer"] is None else f"{accuracy['agent_wer']:.1%}"
+        whisper_check = "n/a" if accuracy["patient_wer"] is None else f"{accuracy['patient_wer']:.1%}"
+        print(f"{key:<36} {transcript.get('scenario_name', 'unknown'):<24} {len(turns):>11} {agent_wer:>10} {whisper_check:>13}")
+
+    overall = f"{errors / ref_words:.1%}" if ref_words else "n/a"
+    print(f"\nOverall agent WER: {overall} over {ref_words} words in {len(calls)} calls")
+    print("(\"Whisper check\" is the error rate on patient turns, whose true text is known)")
+    low, high = matrix["low_confidence"], matrix["high_confidence"]
+    print(f"\nConfidence < {LOW_CONFIDENCE} vs misrecognition (turn WER > {MISRECOGNITION_WER:.0%}):")
+    print(f"  low confidence:  {low['misrecognized']:>4} misrecognized / {low['ok']:>4} ok "
+          f"({_rate(low['misrecognized'], low['misrecognized'] + low['ok'])} misrecognized)")
+    print(f"  high confidence: {high['misrecognized']:>4} misrecognized / {high['ok']:>4} ok "
+          f"({_rate(high['misrecognized'], high['misrecognized'] + high['ok'])} misrecognized)")
+    caught = low["misrecognized"]
+    missed = high["misrecognized"]
+    print(f"  misrecognitions flagged by low confidence: {_rate(caught, caught + missed)}")
+
+    if args.worst:
+        print(f"\nWorst {args.worst} agent turns:")
+        for key, row, turn in sorted(agent_turns, key=lambda item: item[1]["wer"], reverse=True)[:args.worst]:
+            print(f"  {key} turn {row['turn']} WER {row['wer']:.0%} (confidence {row['confidence']})")
+            print(f"    Twilio:  {turn.get('text', '')}")
+            print(f"    Whisper: {row['whisper_text']}")
+    print(f"\n[INFO] Aligned {len(calls)} calls in {elapsed:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
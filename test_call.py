@@ -10,7 +10,7 @@ Usage:
 import sys
 import time
 
-from src.phone_system import make_call
+from src.dialer import dispatch_call
 from src.scenario_loader import list_scenarios
 
 
@@ -22,10 +22,10 @@ def main() -> None:
     scenario_name = sys.argv[1] if len(sys.argv) > 1 else "appointment_scheduling"
 
     print(f"[INFO] Initiating test call with scenario: {scenario_name}")
-    call_sid = make_call(scenario_name)
+    call = dispatch_call(scenario_name)
 
-    if call_sid:
-        print(f"[SUCCESS] Call SID: {call_sid}")
+    if call and call["call_sid"]:
+        print(f"[SUCCESS] Call SID: {call['call_sid']} ({call['from']} -> {call['to']})")
         print("[INFO] Check Flask console for conversation logs")
         print("[INFO] Press Ctrl+C to exit")
         try:
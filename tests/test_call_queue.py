@@ -0,0 +1,36 @@
+"""CallQueue outcomes that reach /call-status before the dial returns."""
+
+from src.call_queue import CallQueue
+
+
+def test_outcome_before_mark_placed_is_applied(tmp_path) -> None:
+    queue = CallQueue(str(tmp_path / "queue.db"))
+    [call_id] = queue.enqueue("appointment", max_attempts=1)
+    assert queue.claim_next()["id"] == call_id
+
+    assert queue.record_outcome("CA1", "failed") is None
+    assert queue.mark_placed(call_id, "CA1") == "failed"
+
+    stats = queue.stats()
+    assert stats["calls"]["failed"] == 1 and stats["calls"]["dialing"] == 0
+    assert stats["attempts"] == {"failed": 1}
+    assert queue.recover() == {"requeued": 0, "settled": 0, "lost": 0}
+
+
+def test_busy_before_mark_placed_is_retried(tmp_path) -> None:
+    queue = CallQueue(str(tmp_path / "queue.db"))
+    [call_id] = queue.enqueue("appointment", max_attempts=3)
+    queue.claim_next()
+
+    queue.record_outcome("CA2", "busy")
+    assert queue.mark_placed(call_id, "CA2") == "pending"
+    assert queue.stats()["calls"]["pending"] == 1
+
+
+def test_outcome_after_mark_placed(tmp_path) -> None:
+    queue = CallQueue(str(tmp_path / "queue.db"))
+    [call_id] = queue.enqueue("appointment")
+    queue.claim_next()
+
+    assert queue.mark_placed(call_id, "CA3") == "in_progress"
+    assert queue.record_outcome("CA3", "completed") == "completed"
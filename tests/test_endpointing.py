@@ -0,0 +1,23 @@
+"""Cut-off detection behind the adaptive speech_timeout."""
+
+from src.endpointing import EndpointingController, looks_cut_off
+
+
+def test_fragment_ending_in_period_is_cut_off() -> None:
+    assert looks_cut_off("Can I have your date of.", 0.9)
+
+
+def test_complete_sentence_ending_in_period() -> None:
+    assert not looks_cut_off("Your appointment is on Tuesday at 2 PM.", 0.9)
+    assert not looks_cut_off("Okay, I can help you with that.", 0.9)
+
+
+def test_question_is_complete() -> None:
+    assert not looks_cut_off("Would you like me to do that?", 0.9)
+
+
+def test_adaptive_timeout_rises_after_fragment() -> None:
+    controller = EndpointingController({"speech_timeout": "adaptive"})
+    before = controller.speech_timeout
+    controller.observe("Can I have your date of.", 0.9)
+    assert controller.speech_timeout == before + 1
@@ -0,0 +1,50 @@
+"""LinePool bookkeeping when /call-status callbacks race place_call()."""
+
+from src.line_pool import LinePool
+
+CALLER = "+15550001111"
+TARGET = "+18054398008"
+
+
+def _pool() -> LinePool:
+    return LinePool([(CALLER, 1)], [(TARGET, 1)], cooldown_seconds=0, calls_per_second=0)
+
+
+def test_terminal_status_before_assign_frees_lines() -> None:
+    pool = _pool()
+    token, from_number, to_number = pool.acquire()
+    pool.observe("CA1", "initiated", from_number, to_number)
+    pool.observe("CA1", "failed", from_number, to_number)
+    pool.assign(token, "CA1")
+
+    stats = pool.stats()
+    assert stats["active_calls"] == 0
+    assert [line["active"] for line in stats["callers"] + stats["targets"]] == [0, 0]
+    assert [line["placed"] for line in stats["callers"] + stats["targets"]] == [1, 1]
+    assert pool.acquire() is not None
+
+
+def test_terminal_status_before_assign_without_from_to() -> None:
+    pool = _pool()
+    token, _, _ = pool.acquire()
+    pool.observe("CA2", "busy")
+    pool.assign(token, "CA2")
+
+    stats = pool.stats()
+    assert stats["active_calls"] == 0
+    assert [line["failed"] for line in stats["callers"] + stats["targets"]] == [1, 1]
+    assert pool.acquire() is not None
+
+
+def test_assign_then_release_in_order() -> None:
+    pool = _pool()
+    token, from_number, to_number = pool.acquire()
+    pool.assign(token, "CA3")
+    pool.observe("CA3", "ringing", from_number, to_number)
+    assert pool.acquire() is None
+    pool.observe("CA3", "completed", from_number, to_number)
+
+    stats = pool.stats()
+    assert stats["active_calls"] == 0
+    assert [line["completed"] for line in stats["callers"] + stats["targets"]] == [1, 1]
+    assert pool.acquire() is not None
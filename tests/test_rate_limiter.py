@@ -0,0 +1,41 @@
+"""Which provider errors count toward the shared circuit breaker."""
+
+import pytest
+
+from src.rate_limiter import BREAKER_FAILURE_THRESHOLD, get_breaker, is_provider_failure, provider_call
+
+
+class APIStatusError(Exception):
+    def __init__(self, status_code: int) -> None:
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+
+
+class APIConnectionError(Exception):
+    pass
+
+
+@pytest.mark.parametrize("status", [429, 500, 503])
+def test_throttling_and_server_errors_are_provider_failures(status: int) -> None:
+    assert is_provider_failure(APIStatusError(status))
+
+
+@pytest.mark.parametrize("status", [400, 401, 404])
+def test_client_errors_are_not(status: int) -> None:
+    assert not is_provider_failure(APIStatusError(status))
+
+
+def test_transport_errors_are_provider_failures() -> None:
+    assert is_provider_failure(APIConnectionError("connection reset"))
+    assert is_provider_failure(TimeoutError())
+    assert not is_provider_failure(ValueError("Missing credentials"))
+
+
+def test_client_errors_do_not_open_the_breaker() -> None:
+    breaker = get_breaker("whisper")
+    for _ in range(BREAKER_FAILURE_THRESHOLD + 1):
+        with pytest.raises(APIStatusError):
+            with provider_call("whisper", timeout=1):
+                raise APIStatusError(400)
+    assert breaker.state == "closed"
+    assert breaker.consecutive_failures == 0
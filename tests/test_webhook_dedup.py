@@ -0,0 +1,18 @@
+"""A slow original request and its timed-out retry cannot both own a turn."""
+
+from src.webhook_dedup import TurnResponseCache
+
+
+def test_retry_supersedes_before_commit() -> None:
+    cache = TurnResponseCache()
+    _, entry = cache.begin("gather:1:abc")
+    assert cache.supersede(entry)
+    assert not cache.commit(entry)
+
+
+def test_commit_blocks_later_supersede() -> None:
+    cache = TurnResponseCache()
+    _, entry = cache.begin("gather:1:abc")
+    assert cache.commit(entry)
+    assert not cache.supersede(entry)
+    assert not entry.superseded